@@ -1,4 +1,5 @@
 import datetime
+import enum
 import functools
 import json
 import sys
@@ -7,8 +8,9 @@ import traceback
 import typing
 import weakref
 from contextlib import contextmanager, nullcontext
-from io import StringIO
+from io import BytesIO, StringIO
 from pathlib import Path
+from types import TracebackType
 from typing import (
     IO,
     Any,
@@ -26,11 +28,22 @@ from typing import (
     overload,
 )
 
-from ._logger_instances import _get_logger_instances
+from . import _profile
+from ._logger_instances import (
+    _get_logger_instances,
+    _has_logger_instances,
+    _update_logger_instances,
+)
 from ._suppress_helper import SuppressHelper as _SuppressHelper
-from .protocols import IReadLines, LogHTMLStyle, OptExcInfo, Status
-import enum
-from types import TracebackType
+from .protocols import (
+    AsyncOverflowPolicy,
+    IReadBytes,
+    IReadLines,
+    LogHTMLStyle,
+    LogOutputFormat,
+    OptExcInfo,
+    Status,
+)
 
 if typing.TYPE_CHECKING:
     from ._robo_logger import _RoboLogger
@@ -45,6 +58,8 @@ from . import _config
 
 Filter = _config.Filter
 FilterKind = _config.FilterKind
+LoopLogPolicy = _config.LoopLogPolicy
+AssignLogPolicy = _config.AssignLogPolicy
 
 # Note: clients are not meant to instance this class, it's just meant to be
 # available for typing.
@@ -59,11 +74,19 @@ DefaultAutoLogConfig = _config.DefaultAutoLogConfig
 
 
 def _log(level, message: Sequence[Any], html: bool = False) -> None:
-    accept_in_log = _config._general_log_config.accept_log_level(level)
-    accept_in_output = _config._general_log_config.accept_output_log_level(level)
+    config = _config._general_log_config
+    if level not in config._accept_any:
+        # Fast path: rejected in both, the log and the output (note that
+        # nothing is computed in this case -- not even the message is
+        # converted to a string).
+        return
+
+    accept_in_log = level in config._accept and _has_logger_instances()
+    accept_in_output = not html and level in config._accept_output
     if not accept_in_log and not accept_in_output:
         return
 
+    # The message is only formatted when it'll be actually used.
     m = " ".join(str(x) for x in message)
 
     if accept_in_log:
@@ -74,33 +97,30 @@ def _log(level, message: Sequence[Any], html: bool = False) -> None:
         lineno = back_frame.f_lineno
         libname = str(back_frame.f_globals.get("__package__", ""))
 
-        name, libname, source, lineno
-
         robo_logger: _RoboLogger
         with _get_logger_instances() as logger_instances:
             for robo_logger in logger_instances:
                 robo_logger.log_message(level, m, html, name, libname, source, lineno)
 
-    if not html:  # html messages are never put in the output.
-        if accept_in_output:
-            s = _config._general_log_config.get_output_stream_name(level)
-            try:
-                writing = _ConsoleMessagesLock.tlocal._writing
-            except Exception:
-                writing = _ConsoleMessagesLock.tlocal._writing = False
-
-            if writing:
-                return
-            _ConsoleMessagesLock.tlocal._writing = True
-            try:
-                if s == "stdout":
-                    print(m)
-                elif s == "stderr":
-                    print(m, file=sys.stderr)
-                else:
-                    raise RuntimeError(f"Unexpected output stream name: {s}")
-            finally:
-                _ConsoleMessagesLock.tlocal._writing = False
+    if accept_in_output:  # Note: html messages are never put in the output.
+        s = config.get_output_stream_name(level)
+        try:
+            writing = _ConsoleMessagesLock.tlocal._writing
+        except Exception:
+            writing = _ConsoleMessagesLock.tlocal._writing = False
+
+        if writing:
+            return
+        _ConsoleMessagesLock.tlocal._writing = True
+        try:
+            if s == "stdout":
+                print(m)
+            elif s == "stderr":
+                print(m, file=sys.stderr)
+            else:
+                raise RuntimeError(f"Unexpected output stream name: {s}")
+        finally:
+            _ConsoleMessagesLock.tlocal._writing = False
 
 
 def critical(*message: Any) -> None:
@@ -209,6 +229,52 @@ def debug(*message: Any) -> None:
     _log(Status.DEBUG, message)
 
 
+def is_enabled(level: Union["FilterLogLevel", "FilterLogLevelLiterals"]) -> bool:
+    """
+    Provides whether a message with the given level would be added to some
+    log output or shown in the console output.
+
+    Args:
+        level: The level to check ("debug", "info", "warn" or "critical").
+
+    Example:
+        if log.is_enabled("debug"):
+            log.debug('Current state', compute_expensive_state())
+
+    Note:
+        The `log.debug/info/warn/critical` calls already check the level before
+        doing any work (the message is only converted to `str` if it's actually
+        accepted), so, this is only needed if computing the arguments passed
+        to the logging call is expensive.
+    """
+    if not isinstance(level, str):
+        level = level.value  # Received enum.
+
+    try:
+        internal_level = _FILTER_LEVEL_TO_STATUS[level]
+    except KeyError:
+        if level == "none":
+            return False
+        raise ValueError(f"Unexpected log level: {level}")
+
+    config = _config._general_log_config
+    if internal_level not in config._accept_any:
+        return False
+
+    if internal_level in config._accept_output:
+        return True
+
+    return _has_logger_instances()
+
+
+_FILTER_LEVEL_TO_STATUS: Dict[str, str] = {
+    "debug": Status.DEBUG,
+    "info": Status.INFO,
+    "warn": Status.WARN,
+    "critical": Status.ERROR,
+}
+
+
 def exception(*message: Any):
     """
     Adds to the logging the exceptions that's currently raised.
@@ -259,7 +325,7 @@ def process_snapshot() -> None:
     A process snapshot can include details on the python process and subprocesses
     and should add a thread dump with the stack of all running threads.
     """
-    with _get_logger_instances(only_from_main_thread=False) as logger_instances:
+    with _get_logger_instances() as logger_instances:
         for robo_logger in logger_instances:
             robo_logger.process_snapshot()
 
@@ -624,6 +690,9 @@ def start_task(
         for robo_logger in logger_instances:
             robo_logger.start_task(name, libname, source, lineno, doc)
 
+    for profiler in _profile._profilers:
+        profiler.start_task(name, libname)
+
 
 def end_task(name: str, libname: str, status: str, message: str) -> None:
     """
@@ -641,6 +710,9 @@ def end_task(name: str, libname: str, status: str, message: str) -> None:
         for robo_logger in logger_instances:
             robo_logger.end_task(name, libname, status, message)
 
+    for profiler in _profile._profilers:
+        profiler.end_task(name, libname, status)
+
 
 # ---- APIs to decode existing log files
 
@@ -674,6 +746,129 @@ def iter_decoded_log_format_from_stream(stream: IReadLines) -> Iterator[dict]:
     return iter_decoded_log_format(stream)
 
 
+def iter_decoded_log_format_in_batches(
+    stream: IReadLines, lines_per_batch: int = 10000
+) -> Iterator[Dict[str, Dict[str, list]]]:
+    """
+    Iterates stream contents and decodes those in batches where the decoded
+    contents are provided in a columnar way (which is much faster than
+    decoding each message to a dict when a lot of messages must be analyzed).
+
+    Args:
+        stream: The stream which should be iterated in (anything with a
+            `readlines()` method which should provide the messages encoded
+            in the internal format). If the stream can be iterated (such as
+            a file), the lines are read as needed for each batch (so, the
+            whole stream isn't loaded in memory).
+        lines_per_batch: The number of lines decoded in each batch.
+
+    Returns:
+        An iterator which provides for each batch a dict with the message
+        type pointing to the columns for that message type (the column names
+        are the same keys provided in the messages from
+        `iter_decoded_log_format_from_stream` and the `line_index` column
+        has the index of the line of the message in the batch).
+
+        Example of a batch provided:
+
+        {
+            'SE': {
+                'line_index': [10, 15],
+                'name': ['my_method', 'other_method'],
+                'libname': ['my_module', 'my_module'],
+                'source': ['/path/to/my_module.py', '/path/to/my_module.py'],
+                'doc': ['', ''],
+                'lineno': [12, 30],
+                'type': ['METHOD', 'METHOD'],
+                'time_delta_in_seconds': [0.3, 0.4],
+                'thread_id': [None, None],
+            },
+            ...
+        }
+
+        Note: the exact format of the messages provided is not stable across
+        releases.
+    """
+    from ._decoder import iter_decoded_log_format_in_batches as _iter_in_batches
+
+    return _iter_in_batches(stream, lines_per_batch)
+
+
+def iter_decoded_log_format_from_binary_stream(stream: IReadBytes) -> Iterator[dict]:
+    """
+    Iterates stream contents in the binary format (i.e.: written with
+    `add_log_output(output_format="binary")`) and decodes those as dicts.
+
+    Args:
+        stream: The stream which should be iterated in (anything with a
+            `read(size)` method which provides the bytes in the binary format).
+
+    Returns:
+        An iterator which will decode the messages and provides a dictionary for
+        each message found (the same messages provided by
+        `iter_decoded_log_format_from_stream`).
+    """
+    from ._decoder import iter_decoded_binary_log_format
+
+    return iter_decoded_binary_log_format(stream)
+
+
+def load_log_index(output_dir: Union[str, Path]) -> List[dict]:
+    """
+    Loads the sidecar index files written alongside the `.robolog` files
+    (when `add_log_output(write_index=True)` is used an index is written for
+    each `.robolog` file when it's finished, i.e.: when the output is rotated
+    or closed).
+
+    Args:
+        output_dir: The directory where the `.robolog` files were written.
+
+    Returns:
+        A list with the index of each `.robolog` file (sorted by the part of
+        the run). Each index has the time delta range of the file
+        (`start_time_delta` and `end_time_delta`), the byte offsets of the tasks
+        (`tasks`) and of the elements close to the task level (`elements`).
+
+        Note: the exact format of the index is not stable across releases.
+    """
+    from ._log_index import load_log_index as _load_log_index
+
+    return _load_log_index(output_dir)
+
+
+def iter_decoded_log_format_from_index(
+    output_dir: Union[str, Path],
+    *,
+    task_name: Optional[str] = None,
+    start_time_delta: Optional[float] = None,
+    end_time_delta: Optional[float] = None,
+) -> Iterator[dict]:
+    """
+    Uses the sidecar index of the `.robolog` files to decode just the messages
+    related to a given task or time window (without decoding everything).
+
+    Args:
+        output_dir: The directory where the `.robolog` files were written.
+        task_name: If given only the messages of the task(s) with the given
+            name are provided.
+        start_time_delta: If given the decoding starts at the last task/element
+            which started before this time delta (in seconds from the start
+            of the run).
+        end_time_delta: If given the decoding stops when a message after this
+            time delta is found.
+
+    Returns:
+        An iterator which will decode the messages and provides a dictionary for
+        each message found (the same messages provided by
+        `iter_decoded_log_format_from_stream`).
+    """
+    from ._log_index import iter_decoded_from_index
+
+    return iter_decoded_from_index(
+        output_dir, task_name, start_time_delta, end_time_delta
+    )
+
+
 def iter_decoded_log_format_from_log_html(log_html: Path) -> Iterator[dict]:
     """
     Reads the data saved in the log html and provides decoded messages (dicts).
@@ -714,15 +909,27 @@ def iter_decoded_log_format_from_log_html(log_html: Path) -> Iterator[dict]:
 
     sub = txt[i + len("let chunks = ") : j + 1]
     # We have something as:
-    # ['base64strZippedStr', 'base64strZippedStr']
-    # so, at this point decode it and unzip it
+    # [['base64strZippedStr', 'base64strZippedStr'], ['base64strZippedStr']]
+    # where each inner list is a single zlib stream (older versions had a flat
+    # list where each item was a separate zlib stream), so, at this point decode
+    # it and unzip it.
     lst = literal_eval(sub)
 
-    stream = StringIO()
-    for s in lst:
-        decoded = zlib.decompress(base64.b64decode(s))
-        stream.write(decoded.decode("utf-8"))
+    contents = BytesIO()
+    decompressor = zlib.decompressobj()
+    for entry in lst:
+        parts = [entry] if isinstance(entry, str) else entry
+        for s in parts:
+            data = base64.b64decode(s)
+            while data:
+                contents.write(decompressor.decompress(data))
+                if not decompressor.eof:
+                    break
+                # The stream finished: anything else is part of a new stream.
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj()
 
+    stream = StringIO(contents.getvalue().decode("utf-8"))
     stream.seek(0)
     # Uncomment to see contents loaded.
     # print(stream.getvalue())
@@ -1110,6 +1317,47 @@ def setup_auto_logging(
     return register_auto_logging_callbacks(use_config, add_rewrite_hook)
 
 
+def prewarm_rewrite_cache(
+    config: Optional[AutoLogConfigBase] = None,
+    paths: Optional[Sequence[str]] = None,
+    on_error: Optional[Callable[[Path, Exception], None]] = None,
+) -> int:
+    """
+    Rewrites the modules which would be automatically logged and stores the
+    rewritten code in the shared cache (so that modules in read-only
+    directories, such as a read-only `site-packages`, don't need to be
+    rewritten again on each run).
+
+    The cache directory may be customized with the `RC_LOG_REWRITE_CACHE_DIR`
+    environment variable and its max size with `RC_LOG_REWRITE_CACHE_MAX_SIZE`
+    (i.e.: "200MB" -- "0" disables the cache).
+
+    Args:
+        config: The configuration specifying how modules should be automatically
+            logged (it must be the same used when running so that the cache
+            is used).
+        paths: The paths where the modules are searched (if not given,
+            `sys.path` is used).
+        on_error: Called when some module could not be rewritten.
+
+    Returns:
+        The number of modules which have the rewritten code in the cache.
+    """
+    from ._rewrite_cache import get_default_rewrite_cache, prewarm
+
+    rewrite_cache = get_default_rewrite_cache()
+    if rewrite_cache is None:
+        return 0
+
+    if config is None:
+        config = DefaultAutoLogConfig()
+
+    if paths is None:
+        paths = sys.path
+
+    return prewarm(rewrite_cache, config, paths, on_error)
+
+
 def add_log_output(
     output_dir: Union[str, Path],
     max_file_size: str = "1MB",
@@ -1117,6 +1365,17 @@ def add_log_output(
     log_html: Optional[Union[str, Path]] = None,
     log_html_style: LogHTMLStyle = "standalone",
     min_messages_per_file: int = 50,
+    flush_threshold: str = "0",
+    flush_interval: float = 0,
+    async_writer: bool = False,
+    async_max_queue_size: int = 10000,
+    async_overflow_policy: AsyncOverflowPolicy = "block",
+    output_format: LogOutputFormat = "text",
+    log_html_refresh_interval: Optional[float] = None,
+    max_value_memo_size: Optional[int] = 10000,
+    log_html_compression_level: int = -1,
+    log_html_chunk_size: str = "64kb",
+    write_index: bool = False,
 ):
     """
     Adds a log output which will write the contents to the given output directory.
@@ -1143,6 +1402,53 @@ def add_log_output(
             this may make the max_file_size be surpassed). This is needed to
             prevent a case where a whole new file could be created after just
             a single message if the message was too big for the max file size.
+        flush_threshold: By default the contents are flushed to the disk after
+            each message. If this is given (as a string with the value and the
+            unit -- accepted units are the same ones from `max_file_size`), the
+            contents are buffered and only flushed when the pending contents
+            reach this size (a flush is always done when a task finishes, when
+            an exception is logged and when the output is closed).
+        flush_interval: If given (in seconds), any pending buffered contents
+            are flushed at the given interval (done in a background thread).
+        async_writer: If True, the thread doing the logging only adds the
+            messages to a queue and a separate thread is responsible for
+            actually converting and writing those to the output.
+        async_max_queue_size: The maximum number of messages which may be
+            pending in the queue when `async_writer=True`.
+        async_overflow_policy: What to do when the queue is full when
+            `async_writer=True`: "block" means that the thread doing the logging
+            waits until there's space in the queue and "drop" means that
+            messages which don't change the log structure (log messages,
+            assigns, returns, console output) are dropped (a warning with
+            the number of dropped messages is added to the log afterwards).
+        output_format: The format of the `.robolog` files: "text" or "binary"
+            (the binary format is more compact, so, more history fits in
+            the same `max_file_size`). Note: to read the binary format use
+            `iter_decoded_log_format_from_binary_stream`.
+        log_html_refresh_interval: By default the `log_html` is only written
+            when the log output is closed. If this is given, the `log_html` is
+            also updated during the run (when a task finishes or a log file is
+            rotated) if at least this amount of seconds elapsed since the last
+            update. When > 0 it's also updated at this interval by a background
+            thread (so, a log.html is available even if the process is killed
+            in the middle of a task).
+        max_value_memo_size: Values (log messages, console output and the repr
+            of variables) are written once and then referenced by an id while
+            they're kept in memory. This is the maximum number of values which
+            are kept (when the limit is reached the least recently used value
+            is forgotten and written again if it's logged again). Big values
+            are never kept. If None all the values are kept in memory (note
+            that in long runs this may use a lot of memory).
+        log_html_compression_level: The zlib compression level used for the
+            contents embedded in the `log_html` (from 0 to 9 or -1 for the
+            zlib default).
+        log_html_chunk_size: The size of the chunks read from the `.robolog`
+            files when creating the `log_html` (as a string with the value and
+            the unit -- accepted units are the same ones from `max_file_size`).
+            The memory used to create the `log_html` is bounded by this value.
+        write_index: If True a sidecar index (`<name>.robolog.index`) is
+            written for each `.robolog` file when it's finished (see:
+            `load_log_index` and `iter_decoded_log_format_from_index`).
 
     Note:
         It's Ok to add more than one log output, but if 2 log outputs point
@@ -1162,14 +1468,25 @@ def add_log_output(
         log_html,
         log_html_style=log_html_style,
         min_messages_per_file=min_messages_per_file,
+        flush_threshold=flush_threshold,
+        flush_interval=flush_interval,
+        async_writer=async_writer,
+        async_max_queue_size=async_max_queue_size,
+        async_overflow_policy=async_overflow_policy,
+        output_format=output_format,
+        log_html_refresh_interval=log_html_refresh_interval,
+        max_value_memo_size=max_value_memo_size,
+        log_html_compression_level=log_html_compression_level,
+        log_html_chunk_size=log_html_chunk_size,
+        write_index=write_index,
     )
-    with _get_logger_instances() as logger_instances:
+    with _update_logger_instances() as logger_instances:
         logger_instances[logger] = 1
 
     def _exit():
-        with _get_logger_instances() as logger_instances:
+        with _update_logger_instances() as logger_instances:
             logger_instances.pop(logger, None)
-            logger.close()
+        logger.close()
 
     return OnExitContextManager(_exit)
 
@@ -1182,13 +1499,44 @@ def close_log_outputs():
     to actually write the output.
     """
     while True:
-        with _get_logger_instances() as logger_instances:
-            if logger_instances:
-                logger = next(iter(logger_instances))
-                logger_instances.pop(logger, None)
-                logger.close()
-            else:
+        with _update_logger_instances() as logger_instances:
+            if not logger_instances:
                 break
+            logger = next(iter(logger_instances))
+            logger_instances.pop(logger, None)
+        logger.close()
+
+
+def create_log_html(
+    log_html: Union[str, Path],
+    robolog_files: Sequence[Union[str, Path]],
+    output_format: LogOutputFormat = "text",
+) -> None:
+    """
+    Creates a log.html with the contents of the given `.robolog` files
+    (i.e.: to combine in a single log.html the outputs of runs done in
+    different processes).
+
+    Args:
+        log_html: The target log.html.
+        robolog_files: The `.robolog` files to be added to the log.html (in the
+            order in which they should be shown).
+        output_format: The format in which the `.robolog` files were written
+            ("text" or "binary").
+    """
+    from ._log_html import IncrementalFileCompressor, write_log_html
+
+    if output_format not in ("text", "binary"):
+        raise ValueError(f"Unexpected output format: {output_format}")
+
+    compressed_files = []
+    for robolog in robolog_files:
+        compressor = IncrementalFileCompressor(
+            Path(robolog), binary_format=output_format == "binary"
+        )
+        compressed_files.append(compressor.finish())
+
+    write_log_html(str(log_html), compressed_files)
 
 
 def add_in_memory_log_output(write: Callable[[str], Any]):
@@ -1208,17 +1556,68 @@ def add_in_memory_log_output(write: Callable[[str], Any]):
 
     logger = _RoboLogger(__write__=write)
 
-    with _get_logger_instances() as logger_instances:
+    with _update_logger_instances() as logger_instances:
         logger_instances[logger] = 1
 
     def _exit():
-        with _get_logger_instances() as logger_instances:
+        with _update_logger_instances() as logger_instances:
             logger_instances.pop(logger, None)
-            logger.close()
+        logger.close()
 
     return OnExitContextManager(_exit)
 
 
+def add_profile_output(
+    output_dir: Union[str, Path],
+    max_slowest_calls: int = 10,
+    max_depth: int = 30,
+):
+    """
+    Adds an output which collects the time spent in the functions which are
+    auto-logged and writes a summary for each task when it finishes.
+
+    The summary is written as a json file named
+    `<output_dir>/<task libname>.<task name>.profile.json` with:
+
+    - `functions`: the calls count, the total (cumulative) time and the self
+      time of each function (sorted by the self time).
+    - `call_tree`: the same information for each call path.
+    - `slowest_calls`: the slowest calls (along with the repr of their
+      arguments).
+
+    Args:
+        output_dir: The directory where the summary of each task is written.
+        max_slowest_calls: The number of slowest calls to be kept.
+        max_depth: The maximum depth of the call tree (calls which are deeper
+            are accounted in the node at the max depth).
+
+    Returns:
+        A context manager which can be used to automatically remove the
+        related profiler.
+
+    Note:
+        Only functions which are auto-logged are profiled (so,
+        `setup_auto_logging` must be used -- robocorp-tasks does that
+        automatically).
+    """
+    from ._auto_logging_setup import OnExitContextManager
+
+    if not output_dir:
+        raise RuntimeError("The output directory must be specified.")
+
+    path = Path(output_dir)
+
+    def on_task_profile(summary: dict) -> None:
+        _profile.write_task_profile(path, summary)
+
+    profiler = _profile.ProfileAggregator(
+        on_task_profile, max_slowest_calls=max_slowest_calls, max_depth=max_depth
+    )
+    profiler.register()
+
+    return OnExitContextManager(profiler.unregister)
+
+
 # --- Private APIs
 
 # Not part of the API, used to determine whether a file is a project file
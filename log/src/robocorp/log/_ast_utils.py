@@ -1,5 +1,6 @@
 import ast
 import ast as ast_module
+import copy
 import itertools
 import sys
 import types
@@ -210,9 +211,15 @@ class ASTRewriter:
         self._cursor_stack: List[_RewriteCursor] = []
         self._next_var_id: "partial[int]" = partial(next, itertools.count())
         self._is_generator_cache: dict = {}
+        self._has_yield_in_expression_cache: dict = {}
+        self._original_body_cache: dict = {}
         self._funcdef_memo_stack: List[FuncdefMemoStack] = [FuncdefMemoStack()]
         self._on_context_id_generated = Callback()
 
+        # Statements to be added at the module level (right after the imports
+        # added by the rewrite), i.e.: the `MethodLocation` of each function.
+        self.module_level_stmts: List[ast.stmt] = []
+
     def iter_and_replace_nodes(
         self,
     ) -> Generator[
@@ -267,12 +274,13 @@ class ASTRewriter:
     ) -> Generator[
         Tuple[ASTRewriteEv, List[AST], AST], Optional[types.GeneratorType], None
     ]:
-        if isinstance(node, ast.FunctionDef):
+        is_funcdef = isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        if is_funcdef:
             self._funcdef_memo_stack.append(FuncdefMemoStack())
         try:
             yield from self._inner_iter_and_replace_nodes(node)
         finally:
-            if isinstance(node, ast.FunctionDef):
+            if is_funcdef:
                 self._funcdef_memo_stack.pop(-1)
 
     def _inner_iter_and_replace_nodes(
@@ -378,14 +386,60 @@ class ASTRewriter:
         stack_repr = "\n".join(str(x.node) for x in self._cursor_stack)
         raise RuntimeError(f"Did not find stmts cursor.\nStack:\n{stack_repr}")
 
+    def add_module_level_assign(
+        self, factory: "NodeFactory", prefix: str, value: ast.expr
+    ) -> str:
+        """
+        Adds an assign to a new module level variable.
+
+        Returns:
+            The name of the variable.
+        """
+        name = f"@{prefix}_{len(self.module_level_stmts)}"
+        self.module_level_stmts.append(factory.Assign([factory.NameStore(name)], value))
+        return name
+
     def NodeFactory(self, lineno: int, col_offset: int) -> "NodeFactory":
         return NodeFactory(lineno, col_offset, self._next_var_id)
 
+    def save_original_body(self, function: ast.FunctionDef) -> None:
+        # Note: must be called before the function body is changed.
+        self._original_body_cache[function] = copy.deepcopy(function.body)
+
+    def pop_original_body(self, function: ast.FunctionDef) -> Optional[List[ast.stmt]]:
+        return self._original_body_cache.pop(function, None)
+
     def is_generator(self, function: ast.FunctionDef):
         # Note: caching is important as it must be called once before the function
         # is changed.
         return _compute_is_generator(self._is_generator_cache, function)
 
+    def has_yield_in_expression(self, function: ast.AsyncFunctionDef) -> bool:
+        """
+        Returns:
+            True if some `yield` in the function is not directly in a statement
+            (i.e.: `call((yield a))` instead of `yield a` or `b = yield a`).
+        """
+        # Note: must be called before the function body is changed.
+        try:
+            return self._has_yield_in_expression_cache[function]
+        except KeyError:
+            pass
+
+        found = False
+        for node in iter_nodes(function, dont_accept_class_nor_funcdef):
+            if isinstance(node, ast.stmt):
+                continue
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, ast.Yield):
+                    found = True
+                    break
+            if found:
+                break
+
+        self._has_yield_in_expression_cache[function] = found
+        return found
+
 
 def _compute_is_generator(cache, function):
     try:
@@ -402,7 +456,7 @@ def _compute_is_generator(cache, function):
 
 
 def dont_accept_class_nor_funcdef(node):
-    return not isinstance(node, (ast.FunctionDef, ast.ClassDef))
+    return not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
 
 
 def copy_line_and_col(from_node, to_node):
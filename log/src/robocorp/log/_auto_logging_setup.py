@@ -1,36 +1,140 @@
+import os
 import sys
-import threading
-from typing import Any, List, Optional, Sequence, Tuple
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from robocorp.log import critical, is_sensitive_variable_name
 
-from ._config import AutoLogConfigBase
+from ._config import AssignLogPolicy, AutoLogConfigBase, LoopLogPolicy
+from ._lifecycle_hooks import MethodLocation
 from ._logger_instances import _get_logger_instances
 from ._obj_info_repr import get_obj_type_and_repr
 from ._on_exit_context_manager import OnExitContextManager
+from ._stack_id import get_current_stack_id
 from .protocols import LogElementType, OptExcInfo, Status
 
 
-def _get_obj_type_and_repr_and_hide_if_needed(key, val):
-    obj_type, obj_repr = get_obj_type_and_repr(val)
+def _get_obj_type_and_repr_and_hide_if_needed(key, val, repr_cache=None):
+    obj_type, obj_repr = get_obj_type_and_repr(val, repr_cache)
 
     if is_sensitive_variable_name(key):
-        with _get_logger_instances() as logger_instances:
-            for robo_logger in logger_instances:
-                robo_logger.hide_from_output(obj_repr)
-                if isinstance(val, str):
-                    robo_logger.hide_from_output(val)
+        _hide_from_output(val, obj_repr)
     return obj_type, obj_repr
 
 
+def _hide_from_output(val, obj_repr):
+    with _get_logger_instances() as logger_instances:
+        for robo_logger in logger_instances:
+            robo_logger.hide_from_output(obj_repr)
+            if isinstance(val, str):
+                robo_logger.hide_from_output(val)
+
+
+class _LoopState:
+    __slots__ = [
+        "policy",
+        "iteration",
+        "size",
+        "skipped",
+        "skipped_time",
+        "step_type",
+        "filename",
+        "lineno",
+    ]
+
+    def __init__(self, policy: LoopLogPolicy):
+        self.policy = policy
+        self.iteration = 0
+        # The number of iterations (if known in advance).
+        self.size: Optional[int] = None
+
+        # Information on the iterations which were not logged.
+        self.skipped = 0
+        self.skipped_time = 0.0
+        self.step_type: LogElementType = "FOR_STEP"
+        self.filename = ""
+        self.lineno = 0
+
+
+class _SkippedStep:
+    __slots__ = "method_type filename lineno targets start_time".split()
+
+    def __init__(self, method_type, filename, lineno, targets):
+        self.method_type = method_type
+        self.filename = filename
+        self.lineno = lineno
+        self.targets = targets
+        self.start_time = time.monotonic()
+
+
+class _AssignsState:
+    __slots__ = "policy logged omitted last_reprs filename lineno".split()
+
+    def __init__(self, policy: AssignLogPolicy):
+        self.policy = policy
+        self.logged = 0
+        self.omitted = 0
+
+        # assign name -> repr of the last value logged (if only_on_change).
+        self.last_reprs: Dict[str, str] = {}
+
+        # Location of the last assign omitted.
+        self.filename = ""
+        self.lineno = 0
+
+
+class _AssignsRate:
+    __slots__ = "window_start logged".split()
+
+    def __init__(self):
+        self.window_start = time.monotonic()
+        self.logged = 0
+
+    def accept(self, max_per_second: int) -> bool:
+        now = time.monotonic()
+        if now - self.window_start >= 1.0:
+            self.window_start = now
+            self.logged = 0
+
+        if self.logged >= max_per_second:
+            return False
+        self.logged += 1
+        return True
+
+
 class _StackEntry:
-    __slots__ = "mod_name name status".split()
+    __slots__ = (
+        "mod_name name status repr_cache hidden loop skipped_step assigns".split()
+    )
 
-    def __init__(self, mod_name, name, status):
+    def __init__(self, mod_name, name, status, hidden=False):
         self.mod_name = mod_name
         self.name = name
         self.status = status
 
+        # Cache for the repr of (immutable) values logged in this frame
+        # (created on demand).
+        self.repr_cache = None
+
+        # Elements inside an iteration which is not logged are hidden (they're
+        # tracked in the stack but not sent to the logger).
+        self.hidden = hidden
+
+        # Set in loops which have a log policy.
+        self.loop: Optional[_LoopState] = None
+
+        # Set in an iteration which is not logged.
+        self.skipped_step: Optional[_SkippedStep] = None
+
+        # Set in functions which have an assign log policy (elements inside
+        # the function, such as loops, share the state of the function).
+        self.assigns: Optional[_AssignsState] = None
+
+
+# Elements which are a new call of a function.
+_FUNCTION_ELEMENT_TYPES = frozenset(("METHOD", "GENERATOR"))
+
 
 class _AutoLogging:
     """
@@ -41,21 +145,115 @@ class _AutoLogging:
     def __init__(self, rewrite_hook_config: AutoLogConfigBase) -> None:
         from ._rewrite_importhook import RewriteHook
 
-        self.tid = threading.get_ident()
-        self.status_stack: List[_StackEntry] = []
+        # Each thread (or asyncio task) has its own status stack (the stack id
+        # is kept along with the stack because a new task starts with a copy
+        # of the context of the task which created it).
+        self._status_stack_var: ContextVar[Optional[Tuple[int, List[_StackEntry]]]]
+        self._status_stack_var = ContextVar("robocorp_log_status_stack", default=None)
         self._rewrite_hook_config = rewrite_hook_config
         self._hook: Optional[RewriteHook] = None
 
+        # (mod_name, function name) -> rate of assigns logged (for assign log
+        # policies with max_per_second).
+        self._assigns_rate: Dict[Tuple[str, str], _AssignsRate] = {}
+
+    @property
+    def status_stack(self) -> List[_StackEntry]:
+        stack_id = get_current_stack_id()
+        stack_id_and_status_stack = self._status_stack_var.get()
+        if (
+            stack_id_and_status_stack is not None
+            and stack_id_and_status_stack[0] == stack_id
+        ):
+            return stack_id_and_status_stack[1]
+
+        status_stack: List[_StackEntry] = []
+        self._status_stack_var.set((stack_id, status_stack))
+        return status_stack
+
+    def _push_stack_entry(
+        self, mod_name: str, name: str, hidden: bool, new_call: bool
+    ) -> None:
+        status_stack = self.status_stack
+        entry = _StackEntry(mod_name, name, "PASS", hidden)
+        if not hidden:
+            if new_call:
+                policy = self._rewrite_hook_config.get_assign_log_policy(mod_name, name)
+                if policy is not None:
+                    entry.assigns = _AssignsState(policy)
+            elif status_stack:
+                entry.assigns = status_stack[-1].assigns
+        status_stack.append(entry)
+
+    def _is_hidden(self) -> bool:
+        status_stack = self.status_stack
+        return bool(status_stack) and status_stack[-1].hidden
+
+    def _get_args(self, items) -> List[Tuple[str, str, str]]:
+        args: List[Tuple[str, str, str]] = []
+        if self._is_hidden():
+            # Nothing is logged, but sensitive values must still be hidden.
+            for key, val in items:
+                if is_sensitive_variable_name(key):
+                    _get_obj_type_and_repr_and_hide_if_needed(key, val)
+            return args
+
+        repr_cache = self._get_repr_cache()
+        for key, val in items:
+            obj_type, obj_repr = _get_obj_type_and_repr_and_hide_if_needed(
+                key, val, repr_cache
+            )
+            args.append((f"{key}", obj_type, obj_repr))
+        return args
+
+    def _get_location_args(
+        self, location: MethodLocation, arg_values: Tuple[Any, ...]
+    ) -> List[Tuple[str, str, str]]:
+        # Same as `_get_args`, but the sensitive names are precomputed in
+        # the location.
+        args: List[Tuple[str, str, str]] = []
+        sensitive_args = location.get_sensitive_args()
+        if self._is_hidden():
+            # Nothing is logged, but sensitive values must still be hidden.
+            for val, sensitive in zip(arg_values, sensitive_args):
+                if sensitive:
+                    _hide_from_output(val, get_obj_type_and_repr(val)[1])
+            return args
+
+        repr_cache = self._get_repr_cache()
+        for key, val, sensitive in zip(location.arg_names, arg_values, sensitive_args):
+            obj_type, obj_repr = get_obj_type_and_repr(val, repr_cache)
+            if sensitive:
+                _hide_from_output(val, obj_repr)
+            args.append((key, obj_type, obj_repr))
+        return args
+
+    def _get_repr_cache(self) -> Optional[dict]:
+        status_stack = self.status_stack
+        if not status_stack:
+            return None
+        entry = status_stack[-1]
+        repr_cache = entry.repr_cache
+        if repr_cache is None:
+            repr_cache = entry.repr_cache = {}
+        return repr_cache
+
     def register(self, add_rewrite_hook: bool = True) -> None:
         from robocorp.log import _lifecycle_hooks
 
         for name, callback in _lifecycle_hooks.iter_all_name_and_callback():
             callback.register(getattr(self, f"call_{name}"))
 
+        # Nothing is logged when there's no logger, so, skip the hooks then.
+        _lifecycle_hooks.set_enable_only_with_logger_instances(True)
+
         if add_rewrite_hook:
+            from ._rewrite_cache import get_default_rewrite_cache
             from ._rewrite_importhook import RewriteHook
 
-            self._hook = hook = RewriteHook(self._rewrite_hook_config)
+            self._hook = hook = RewriteHook(
+                self._rewrite_hook_config, get_default_rewrite_cache()
+            )
             sys.meta_path.insert(0, hook)
 
     def unregister(self, add_rewrite_hook: bool = True) -> None:
@@ -64,9 +262,13 @@ class _AutoLogging:
         for name, callback in _lifecycle_hooks.iter_all_name_and_callback():
             callback.unregister(getattr(self, f"call_{name}"))
 
+        _lifecycle_hooks.set_enable_only_with_logger_instances(False)
+
         if add_rewrite_hook:
             assert self._hook
             sys.meta_path.remove(self._hook)
+            if os.environ.get("RC_LOG_REWRITE_STATS", "").lower() in ("1", "t", "true"):
+                sys.stderr.write(self._hook.stats.get_report() + "\n")
             self._hook = None
 
     def _call_before_element(
@@ -77,14 +279,17 @@ class _AutoLogging:
         name: str,
         lineno: int,
         args: List[Tuple[str, str, str]],
+        loc_index: int = -1,
     ) -> None:
-        if self.tid != threading.get_ident():
-            return
-
         if method_type != "UNTRACKED_GENERATOR":
             # We don't change the stack for untracked generators
             # because we don't know when they may yield.
-            self.status_stack.append(_StackEntry(mod_name, name, "PASS"))
+            hidden = self._is_hidden()
+            self._push_stack_entry(
+                mod_name, name, hidden, method_type in _FUNCTION_ELEMENT_TYPES
+            )
+            if hidden:
+                return
 
         with _get_logger_instances() as logger_instances:
             for robo_logger in logger_instances:
@@ -96,52 +301,82 @@ class _AutoLogging:
                     method_type,
                     "",
                     args,
+                    loc_index,
                 )
 
     def call_before_method(
+        self, location: MethodLocation, arg_values: Tuple[Any, ...]
+    ) -> None:
+        args = self._get_location_args(location, arg_values)
+        self._call_before_element(
+            location.log_element_type,
+            location.mod_name,
+            location.filename,
+            location.name,
+            location.lineno,
+            args,
+            location.loc_index,
+        )
+
+    def call_before_iterate_step(
         self,
         method_type: LogElementType,
         mod_name: str,
         filename: str,
         name: str,
         lineno: int,
-        args_dict: dict,
+        targets: Sequence[Tuple[str, Any]],
     ) -> None:
-        if self.tid != threading.get_ident():
-            return
+        status_stack = self.status_stack
+        loop = status_stack[-1].loop if status_stack else None
+        if loop is not None:
+            iteration = loop.iteration
+            loop.iteration += 1
+            if not loop.policy.accept_iteration(iteration, loop.size):
+                # The contents of this iteration are hidden (if it fails it's
+                # logged afterwards).
+                entry = _StackEntry(mod_name, name, "PASS", hidden=True)
+                entry.skipped_step = _SkippedStep(
+                    method_type, filename, lineno, targets
+                )
+                status_stack.append(entry)
+                return
+
         args: List[Tuple[str, str, str]] = []
-        for key, val in args_dict.items():
-            obj_type, obj_repr = _get_obj_type_and_repr_and_hide_if_needed(key, val)
-            args.append((f"{key}", obj_type, obj_repr))
+        if targets is not None:
+            args = self._get_args(targets)
         self._call_before_element(method_type, mod_name, filename, name, lineno, args)
 
-    def call_before_iterate_step(
+    def call_before_iterate(
         self,
         method_type: LogElementType,
         mod_name: str,
         filename: str,
         name: str,
         lineno: int,
-        targets: Sequence[Tuple[str, Any]],
     ) -> None:
-        if self.tid != threading.get_ident():
-            return
-        args: List[Tuple[str, str, str]] = []
-        if targets is not None:
-            for key, val in targets:
-                obj_type, obj_repr = _get_obj_type_and_repr_and_hide_if_needed(key, val)
-                args.append((f"{key}", obj_type, obj_repr))
-        self._call_before_element(method_type, mod_name, filename, name, lineno, args)
+        self._call_before_element(method_type, mod_name, filename, name, lineno, [])
 
-    def call_before_iterate(
+        entry = self.status_stack[-1]
+        if not entry.hidden:
+            policy = self._rewrite_hook_config.get_loop_log_policy(mod_name, name)
+            if policy is not None:
+                entry.loop = _LoopState(policy)
+
+    def call_iterate_size(
         self,
         method_type: LogElementType,
         mod_name: str,
         filename: str,
         name: str,
         lineno: int,
+        size: int,
     ) -> None:
-        self._call_before_element(method_type, mod_name, filename, name, lineno, [])
+        status_stack = self.status_stack
+        if status_stack:
+            loop = status_stack[-1].loop
+            if loop is not None:
+                loop.size = size
 
     def _call_after_element(
         self,
@@ -151,9 +386,6 @@ class _AutoLogging:
         name: str,
         lineno: int,
     ) -> None:
-        if self.tid != threading.get_ident():
-            return
-
         status = "PASS"
         if method_type != "UNTRACKED_GENERATOR":
             try:
@@ -170,10 +402,70 @@ class _AutoLogging:
                     return
             status = pop_stack_entry.status
 
+            if pop_stack_entry.hidden:
+                skipped_step = pop_stack_entry.skipped_step
+                if skipped_step is not None and self.status_stack:
+                    loop = self.status_stack[-1].loop
+                    if loop is not None:
+                        loop.skipped += 1
+                        loop.skipped_time += time.monotonic() - skipped_step.start_time
+                        loop.step_type = skipped_step.method_type
+                        loop.filename = skipped_step.filename
+                        loop.lineno = skipped_step.lineno
+                return
+
+            loop = pop_stack_entry.loop
+            if loop is not None and loop.skipped:
+                self._log_skipped_iterations(mod_name, name, loop)
+
+            if method_type in _FUNCTION_ELEMENT_TYPES:
+                self._log_omitted_assigns(mod_name, name, pop_stack_entry)
+
         with _get_logger_instances() as logger_instances:
             for robo_logger in logger_instances:
                 robo_logger.end_method(method_type, name, mod_name, status)
 
+    def _log_skipped_iterations(
+        self, mod_name: str, name: str, loop: _LoopState
+    ) -> None:
+        # All the iterations which were not logged are summarized in a single
+        # step at the end of the loop.
+        args = [
+            ("skipped_iterations", "int", str(loop.skipped)),
+            ("skipped_time", "str", f"{loop.skipped_time:.3f}s"),
+        ]
+        with _get_logger_instances() as logger_instances:
+            for robo_logger in logger_instances:
+                robo_logger.start_element(
+                    name,
+                    mod_name,
+                    loop.filename,
+                    loop.lineno,
+                    loop.step_type,
+                    "",
+                    args,
+                )
+                robo_logger.end_method(loop.step_type, name, mod_name, "PASS")
+
+    def _log_omitted_assigns(
+        self, mod_name: str, name: str, entry: _StackEntry
+    ) -> None:
+        assigns = entry.assigns
+        if assigns is None or not assigns.omitted:
+            return
+
+        with _get_logger_instances() as logger_instances:
+            for robo_logger in logger_instances:
+                robo_logger.after_assign(
+                    name,
+                    mod_name,
+                    assigns.filename,
+                    assigns.lineno,
+                    "<omitted assigns>",
+                    "int",
+                    str(assigns.omitted),
+                )
+
     call_after_method = _call_after_element
     call_after_iterate = _call_after_element
     call_after_iterate_step = _call_after_element
@@ -186,9 +478,6 @@ class _AutoLogging:
         lineno: int,
         yielded_value: Any,
     ) -> None:
-        if self.tid != threading.get_ident():
-            return
-
         try:
             pop_stack_entry = self.status_stack.pop(-1)
         except IndexError:
@@ -202,6 +491,11 @@ class _AutoLogging:
                 )
                 return
 
+        if pop_stack_entry.hidden:
+            return
+
+        self._log_omitted_assigns(mod_name, name, pop_stack_entry)
+
         yielded_value_type, yielded_value_repr = get_obj_type_and_repr(yielded_value)
 
         with _get_logger_instances() as logger_instances:
@@ -222,11 +516,11 @@ class _AutoLogging:
         name: str,
         lineno: int,
     ) -> None:
-        if self.tid != threading.get_ident():
+        hidden = self._is_hidden()
+        self._push_stack_entry(mod_name, name, hidden, True)
+        if hidden:
             return
 
-        self.status_stack.append(_StackEntry(mod_name, name, "PASS"))
-
         with _get_logger_instances() as logger_instances:
             for robo_logger in logger_instances:
                 robo_logger.yield_resume(name, mod_name, filename, lineno)
@@ -239,14 +533,12 @@ class _AutoLogging:
         lineno: int,
         variables: Sequence[Tuple[str, Any]],
     ) -> None:
-        if self.tid != threading.get_ident():
-            return
-
-        variables_name_type_repr = []
+        variables_name_type_repr: List[Tuple[str, str, str]] = []
         if variables is not None:
-            for key, val in variables:
-                obj_type, obj_repr = _get_obj_type_and_repr_and_hide_if_needed(key, val)
-                variables_name_type_repr.append((f"{key}", obj_type, obj_repr))
+            variables_name_type_repr = self._get_args(variables)
+
+        if self._is_hidden():
+            return
 
         with _get_logger_instances() as logger_instances:
             for robo_logger in logger_instances:
@@ -268,14 +560,12 @@ class _AutoLogging:
         lineno: int,
         variables: Sequence[Tuple[str, Any]],
     ) -> None:
-        if self.tid != threading.get_ident():
-            return
-
-        variables_name_type_repr = []
+        variables_name_type_repr: List[Tuple[str, str, str]] = []
         if variables is not None:
-            for key, val in variables:
-                obj_type, obj_repr = _get_obj_type_and_repr_and_hide_if_needed(key, val)
-                variables_name_type_repr.append((f"{key}", obj_type, obj_repr))
+            variables_name_type_repr = self._get_args(variables)
+
+        if self._is_hidden():
+            return
 
         with _get_logger_instances() as logger_instances:
             for robo_logger in logger_instances:
@@ -296,9 +586,6 @@ class _AutoLogging:
         name: str,
         lineno: int,
     ) -> None:
-        if self.tid != threading.get_ident():
-            return
-
         try:
             pop_stack_entry = self.status_stack.pop(-1)
         except IndexError:
@@ -312,6 +599,11 @@ class _AutoLogging:
                 )
                 return
 
+        if pop_stack_entry.hidden:
+            return
+
+        self._log_omitted_assigns(mod_name, name, pop_stack_entry)
+
         with _get_logger_instances() as logger_instances:
             for robo_logger in logger_instances:
                 robo_logger.yield_from_suspend(name, mod_name, filename, lineno)
@@ -323,15 +615,19 @@ class _AutoLogging:
         name: str,
         lineno: int,
     ) -> None:
-        if self.tid != threading.get_ident():
+        hidden = self._is_hidden()
+        self._push_stack_entry(mod_name, name, hidden, True)
+        if hidden:
             return
 
-        self.status_stack.append(_StackEntry(mod_name, name, "PASS"))
-
         with _get_logger_instances() as logger_instances:
             for robo_logger in logger_instances:
                 robo_logger.yield_from_resume(name, mod_name, filename, lineno)
 
+    # An `await` in a coroutine is logged as a `yield from` in a generator.
+    call_before_await = call_before_yield_from
+    call_after_await = call_after_yield_from
+
     def call_after_assign(
         self,
         mod_name: str,
@@ -341,12 +637,24 @@ class _AutoLogging:
         assign_name: str,
         assign_value: Any,
     ) -> None:
-        if self.tid != threading.get_ident():
+        if self._is_hidden():
+            if is_sensitive_variable_name(assign_name):
+                _get_obj_type_and_repr_and_hide_if_needed(assign_name, assign_value)
             return
 
-        assign_type, assign_repr = _get_obj_type_and_repr_and_hide_if_needed(
-            assign_name, assign_value
-        )
+        status_stack = self.status_stack
+        assigns = status_stack[-1].assigns if status_stack else None
+        if assigns is None:
+            assign_type, assign_repr = _get_obj_type_and_repr_and_hide_if_needed(
+                assign_name, assign_value, self._get_repr_cache()
+            )
+        else:
+            type_and_repr = self._get_assign_in_budget(
+                assigns, mod_name, filename, name, lineno, assign_name, assign_value
+            )
+            if type_and_repr is None:
+                return
+            assign_type, assign_repr = type_and_repr
 
         with _get_logger_instances() as logger_instances:
             for robo_logger in logger_instances:
@@ -360,6 +668,57 @@ class _AutoLogging:
                     assign_repr,
                 )
 
+    def _get_assign_in_budget(
+        self,
+        assigns: _AssignsState,
+        mod_name: str,
+        filename: str,
+        name: str,
+        lineno: int,
+        assign_name: str,
+        assign_value: Any,
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Returns:
+            The type and repr of the assigned value or None if the assign
+            should not be logged (because the budget of the function was
+            exceeded or the value didn't change).
+        """
+        policy = assigns.policy
+        accept = policy.max_per_call is None or assigns.logged < policy.max_per_call
+
+        type_and_repr = None
+        if accept and policy.only_on_change:
+            type_and_repr = _get_obj_type_and_repr_and_hide_if_needed(
+                assign_name, assign_value, self._get_repr_cache()
+            )
+            accept = assigns.last_reprs.get(assign_name) != type_and_repr[1]
+
+        if accept and policy.max_per_second is not None:
+            key = (mod_name, name)
+            rate = self._assigns_rate.get(key)
+            if rate is None:
+                rate = self._assigns_rate[key] = _AssignsRate()
+            accept = rate.accept(policy.max_per_second)
+
+        if not accept:
+            if type_and_repr is None and is_sensitive_variable_name(assign_name):
+                # Not logged, but sensitive values must still be hidden.
+                _get_obj_type_and_repr_and_hide_if_needed(assign_name, assign_value)
+            assigns.omitted += 1
+            assigns.filename = filename
+            assigns.lineno = lineno
+            return None
+
+        if type_and_repr is None:
+            type_and_repr = _get_obj_type_and_repr_and_hide_if_needed(
+                assign_name, assign_value, self._get_repr_cache()
+            )
+        if policy.only_on_change:
+            assigns.last_reprs[assign_name] = type_and_repr[1]
+        assigns.logged += 1
+        return type_and_repr
+
     def call_method_return(
         self,
         mod_name: str,
@@ -368,11 +727,11 @@ class _AutoLogging:
         lineno: int,
         return_value: Any,
     ):
-        if self.tid != threading.get_ident():
+        if self._is_hidden():
             return
 
         return_type, return_repr = _get_obj_type_and_repr_and_hide_if_needed(
-            "", return_value
+            "", return_value, self._get_repr_cache()
         )
 
         with _get_logger_instances() as logger_instances:
@@ -395,22 +754,43 @@ class _AutoLogging:
         lineno: int,
         exc_info: OptExcInfo,
     ) -> None:
-        if self.tid != threading.get_ident():
-            return
-
         if method_type == "UNTRACKED_GENERATOR":
             # TODO: Investigate: in this case maybe we should create a dummy
             # stack entry? -- Must verify how it'd look in the UI.
             pass
 
         try:
-            _stack_entry = self.status_stack[-1]
+            stack_entry = self.status_stack[-1]
         except IndexError:
             # oops, something bad happened, the stack is unsynchronized
             critical("On method except the status_stack was empty.")
             return
 
-        self.status_stack[-1].status = Status.ERROR
+        stack_entry.status = Status.ERROR
+
+        if stack_entry.hidden:
+            skipped_step = stack_entry.skipped_step
+            if skipped_step is None:
+                return
+
+            # An iteration which was not being logged failed: log it now.
+            stack_entry.hidden = False
+            stack_entry.skipped_step = None
+            args: List[Tuple[str, str, str]] = []
+            if skipped_step.targets is not None:
+                args = self._get_args(skipped_step.targets)
+
+            with _get_logger_instances() as logger_instances:
+                for robo_logger in logger_instances:
+                    robo_logger.start_element(
+                        name,
+                        mod_name,
+                        filename,
+                        lineno,
+                        method_type,
+                        "",
+                        args,
+                    )
 
         # We just want to report it once. On other cases it should just be
         # marked as failed.
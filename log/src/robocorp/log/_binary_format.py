@@ -0,0 +1,471 @@
+"""
+Binary framing for the `.robolog` format.
+
+The binary format is a compact (lossless) encoding of the text format: each
+text line is converted to a frame (so, converting from one format to the
+other and back gives the same contents).
+
+A binary file starts with the `V 0.0.2-bin` header line and afterwards has
+a sequence of frames:
+
+    [varint: payload length][varint: message type code][payload]
+
+The payload is encoded based on the types in the spec (see: `_decoder_spec.py`):
+
+- `oid`, `loc_id`, `loc_and_doc_id`: the base62 id as an int (varint).
+- `int`: zigzag varint (tagged so that non-canonical strings can be kept).
+- `float`: zigzag varint with the value in milliseconds (also tagged so that
+  a value which can't be represented exactly is kept as a string).
+- `str`, `json.loads`, `dateisoformat`: length-prefixed utf-8 string.
+- `memorize` (`M`): id (varint) + length-prefixed utf-8 string (the actual
+  string and not its json representation).
+- `memorize_path` (`P`): id + name, libname, source, doc ids (varint) + lineno.
+
+Fields which are not in the spec (if any) are added as length-prefixed strings
+at the end of the payload.
+"""
+import json
+import string
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from ._decoder import DOC_VERSION
+
+BINARY_DOC_VERSION = f"{DOC_VERSION}-bin"
+BINARY_HEADER = f"V {BINARY_DOC_VERSION}\n".encode("ascii")
+
+# Note: the order here is the code used in the frame, so, new message types
+# must always be added at the end (and existing ones must never be removed).
+# Code 0 is reserved for a message type which is not known (in which case the
+# full line is saved as a string).
+_MESSAGE_TYPES = (
+    "V",
+    "I",
+    "ID",
+    "T",
+    "M",
+    "P",
+    "L",
+    "C",
+    "LH",
+    "SR",
+    "ER",
+    "ST",
+    "ET",
+    "SE",
+    "YR",
+    "YFR",
+    "EE",
+    "R",
+    "YS",
+    "YFS",
+    "AS",
+    "EA",
+    "S",
+    "STB",
+    "TBE",
+    "TBV",
+    "ETB",
+    "SPS",
+    "EPS",
+    "STD",
+    "ETD",
+    "RR",
+    "RT",
+    "RE",
+    "RTB",
+    "RYR",
+    "RYFR",
+    "RPS",
+    "RTD",
+)
+
+_MESSAGE_TYPE_TO_CODE: Dict[str, int] = dict(
+    (message_type, i + 1) for i, message_type in enumerate(_MESSAGE_TYPES)
+)
+_CODE_TO_MESSAGE_TYPE: Dict[int, str] = dict(
+    (code, message_type) for (message_type, code) in _MESSAGE_TYPE_TO_CODE.items()
+)
+
+_UNKNOWN_MESSAGE_TYPE_CODE = 0
+
+# Tags used for numbers (int/float).
+_TAG_FLOAT = 0
+_TAG_INT = 1
+_TAG_STR = 2
+
+# ---- id <-> int conversion (ids are generated by `_robo_output_impl._gen_id`).
+
+_valid_chars = string.ascii_letters + string.digits
+_char_to_index = dict((c, i) for i, c in enumerate(_valid_chars))
+_BASE = len(_valid_chars)
+
+
+def id_to_int(oid: str) -> int:
+    """
+    Converts an id such as `a`, `9`, `aa`, `ab` to an int (`a` = 0,
+    `9` = 61, `aa` = 62, ...).
+    """
+    offset = 0
+    level_size = 1
+    for _ in range(len(oid) - 1):
+        level_size *= _BASE
+        offset += level_size
+
+    index = 0
+    for c in oid:
+        index = index * _BASE + _char_to_index[c]
+    return offset + index
+
+
+def int_to_id(value: int) -> str:
+    level = 1
+    level_size = _BASE
+    while value >= level_size:
+        value -= level_size
+        level += 1
+        level_size *= _BASE
+
+    chars: List[str] = []
+    for _ in range(level):
+        value, i = divmod(value, _BASE)
+        chars.append(_valid_chars[i])
+    return "".join(reversed(chars))
+
+
+# ---- varint / string encoding
+
+
+def _write_varint(buf: bytearray, value: int) -> None:
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def _unzigzag(value: int) -> int:
+    if value & 1:
+        return -((value + 1) >> 1)
+    return value >> 1
+
+
+def _write_str(buf: bytearray, value: str) -> None:
+    b = value.encode("utf-8", "surrogatepass")
+    _write_varint(buf, len(b))
+    buf.extend(b)
+
+
+def _read_varint(data, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_str(data, pos: int) -> Tuple[str, int]:
+    size, pos = _read_varint(data, pos)
+    end = pos + size
+    return bytes(data[pos:end]).decode("utf-8", "surrogatepass"), end
+
+
+# ---- Field encoders/decoders (based on the spec type)
+
+
+def _encode_id(buf: bytearray, value: str) -> None:
+    _write_varint(buf, id_to_int(value))
+
+
+def _decode_id(data, pos: int) -> Tuple[str, int]:
+    value, pos = _read_varint(data, pos)
+    return int_to_id(value), pos
+
+
+def _encode_number(buf: bytearray, value: str) -> None:
+    # The tag is saved in the lower 2 bits.
+    try:
+        as_int = int(value)
+    except ValueError:
+        try:
+            millis = round(float(value) * 1000)
+        except (ValueError, OverflowError):
+            pass
+        else:
+            if str(millis / 1000) == value:
+                _write_varint(buf, _TAG_FLOAT | (_zigzag(millis) << 2))
+                return
+    else:
+        if str(as_int) == value:
+            # Note: ints are saved as ints (even in a float field).
+            _write_varint(buf, _TAG_INT | (_zigzag(as_int) << 2))
+            return
+
+    # Not a canonical representation: keep it as a string.
+    _write_varint(buf, _TAG_STR)
+    _write_str(buf, value)
+
+
+def _decode_number(data, pos: int) -> Tuple[str, int]:
+    value, pos = _read_varint(data, pos)
+    tag = value & 0b11
+    if tag == _TAG_STR:
+        return _read_str(data, pos)
+
+    value = _unzigzag(value >> 2)
+    if tag == _TAG_INT:
+        return str(value), pos
+    return str(value / 1000), pos
+
+
+_FieldEncoder = Callable[[bytearray, str], None]
+_FieldDecoder = Callable[..., Tuple[str, int]]
+
+_KIND_TO_CODEC: Dict[str, Tuple[_FieldEncoder, _FieldDecoder]] = {
+    "oid": (_encode_id, _decode_id),
+    "loc_id": (_encode_id, _decode_id),
+    "loc_and_doc_id": (_encode_id, _decode_id),
+    "int": (_encode_number, _decode_number),
+    "float": (_encode_number, _decode_number),
+    "str": (_write_str, _read_str),
+    "json.loads": (_write_str, _read_str),
+    "dateisoformat": (_write_str, _read_str),
+}
+
+# "M" and "P" are special-cased.
+_MESSAGE_TYPE_TO_FIELD_CODECS: Dict[str, List[Tuple[_FieldEncoder, _FieldDecoder]]] = {}
+
+
+def _build_codecs() -> None:
+    from ._decoder_spec import SPEC
+
+    for line in SPEC.splitlines(keepends=False):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        if ":" not in line:
+            key, val = line.split("=", 1)
+            _MESSAGE_TYPE_TO_FIELD_CODECS[key.strip()] = _MESSAGE_TYPE_TO_FIELD_CODECS[
+                val.strip()
+            ]
+            continue
+
+        key, val = line.split(":", 1)
+        key = key.strip()
+        val = val.strip()
+        if val in ("memorize", "memorize_path"):
+            continue
+
+        codecs = []
+        for field in val.split(","):
+            _name, kind = field.strip().split(":", 1)
+            codecs.append(_KIND_TO_CODEC[kind])
+        _MESSAGE_TYPE_TO_FIELD_CODECS[key] = codecs
+
+
+_build_codecs()
+
+
+def encode_line(line: str) -> bytes:
+    """
+    Converts a line in the text format (with or without the ending new line)
+    to a binary frame.
+    """
+    if line.endswith("\n"):
+        line = line[:-1]
+
+    message_type, _, message = line.partition(" ")
+    code = _MESSAGE_TYPE_TO_CODE.get(message_type, _UNKNOWN_MESSAGE_TYPE_CODE)
+
+    body = bytearray()
+    _write_varint(body, code)
+    try:
+        _encode_payload(body, message_type, message, code)
+    except Exception:
+        # Something unexpected: keep the line as is.
+        body = bytearray()
+        _write_varint(body, _UNKNOWN_MESSAGE_TYPE_CODE)
+        _write_str(body, line)
+
+    frame = bytearray()
+    _write_varint(frame, len(body))
+    frame.extend(body)
+    return bytes(frame)
+
+
+def _encode_payload(buf: bytearray, message_type: str, message: str, code: int):
+    if code == _UNKNOWN_MESSAGE_TYPE_CODE:
+        _write_str(buf, f"{message_type} {message}")
+
+    elif message_type == "M":
+        memo_id, memo_value = message.split(":", 1)
+        value = json.loads(memo_value)
+        if not isinstance(value, str) or json.dumps(value) != memo_value:
+            raise ValueError("Unable to encode memo in binary format.")
+        _encode_id(buf, memo_id)
+        _write_str(buf, value)
+
+    elif message_type == "P":
+        memo_id, memo_references = message.split(":", 1)
+        _encode_id(buf, memo_id)
+        name_id, libname_id, source_id, doc_id, lineno = memo_references.split("|", 4)
+        for oid in (name_id, libname_id, source_id, doc_id):
+            _encode_id(buf, oid)
+        _encode_number(buf, lineno)
+
+    else:
+        codecs = _MESSAGE_TYPE_TO_FIELD_CODECS[message_type]
+        # Note: if there are more fields than the ones in the spec (or if a
+        # string has a '|'), the additional parts are added as strings at the
+        # end (when decoding everything is joined with '|' again).
+        for i, field in enumerate(message.split("|")):
+            if i < len(codecs):
+                codecs[i][0](buf, field)
+            else:
+                _write_str(buf, field)
+
+
+def decode_frame(data, pos: int, end: int) -> str:
+    """
+    Decodes a frame payload (without the length) in `data[pos:end]` to a
+    line in the text format (without the ending new line).
+    """
+    code, pos = _read_varint(data, pos)
+    message_type = _CODE_TO_MESSAGE_TYPE.get(code)
+    if message_type is None:
+        line, pos = _read_str(data, pos)
+        return line
+
+    if message_type == "M":
+        memo_id, pos = _decode_id(data, pos)
+        value, pos = _read_str(data, pos)
+        return f"M {memo_id}:{json.dumps(value)}"
+
+    if message_type == "P":
+        memo_id, pos = _decode_id(data, pos)
+        ids = []
+        for _ in range(4):
+            oid, pos = _decode_id(data, pos)
+            ids.append(oid)
+        lineno, pos = _decode_number(data, pos)
+        return f"P {memo_id}:{'|'.join(ids)}|{lineno}"
+
+    fields = []
+    for _encoder, decoder in _MESSAGE_TYPE_TO_FIELD_CODECS[message_type]:
+        if pos >= end:
+            break
+        field, pos = decoder(data, pos)
+        fields.append(field)
+
+    while pos < end:
+        field, pos = _read_str(data, pos)
+        fields.append(field)
+
+    return f"{message_type} {'|'.join(fields)}"
+
+
+class BinaryToTextConverter:
+    """
+    Incremental converter from the binary format to the text format.
+
+    Usage:
+
+        converter = BinaryToTextConverter()
+        for data in iter_bytes:
+            for line in converter.feed(data):
+                ...
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._header_checked = False
+
+    def feed(self, data: bytes) -> Iterator[str]:
+        """
+        Provides the data to be decoded and returns an iterator with the lines
+        (in the text format and with the ending new line) for all the
+        frames which were completed.
+
+        Note: incomplete frames are kept until more data is provided.
+        """
+        buf = self._buffer
+        buf.extend(data)
+
+        if not self._header_checked:
+            if len(buf) < len(BINARY_HEADER):
+                return
+            if not buf.startswith(BINARY_HEADER):
+                raise ValueError("The contents are not in the robolog binary format.")
+            del buf[: len(BINARY_HEADER)]
+            self._header_checked = True
+
+        pos = 0
+        total = len(buf)
+        try:
+            while pos < total:
+                try:
+                    size, start = _read_varint(buf, pos)
+                except IndexError:
+                    break  # Incomplete length.
+                end = start + size
+                if end > total:
+                    break  # Incomplete frame.
+                line = decode_frame(buf, start, end)
+                pos = end
+                yield f"{line}\n"
+        finally:
+            del buf[:pos]
+
+    @property
+    def has_pending_data(self) -> bool:
+        return bool(self._buffer)
+
+
+def is_binary_format(initial_bytes: bytes) -> bool:
+    return initial_bytes.startswith(BINARY_HEADER)
+
+
+def iter_text_from_binary_stream(stream, chunk_size: int = 1024 * 64) -> Iterator[str]:
+    """
+    Provides the lines in the text format from a stream with contents in
+    the binary format.
+    """
+    converter = BinaryToTextConverter()
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        yield from converter.feed(data)
+
+
+def convert_text_to_binary(text_stream, binary_stream) -> None:
+    """
+    Args:
+        text_stream: A stream with the contents in the text format (opened
+            in text mode).
+        binary_stream: A stream where the binary contents should be written
+            (opened in binary mode).
+    """
+    binary_stream.write(BINARY_HEADER)
+    for line in text_stream:
+        if line.strip():
+            binary_stream.write(encode_line(line))
+
+
+def convert_binary_to_text(binary_stream, text_stream) -> None:
+    """
+    Args:
+        binary_stream: A stream with the contents in the binary format (opened
+            in binary mode).
+        text_stream: A stream where the text contents should be written
+            (opened in text mode).
+    """
+    for line in iter_text_from_binary_stream(binary_stream):
+        text_stream.write(line)
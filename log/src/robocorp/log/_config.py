@@ -1,12 +1,14 @@
 import enum
-from typing import Dict, Optional, Sequence, Callable, Union
-
-from robocorp import log
-from functools import partial
-from fnmatch import fnmatch
 import itertools
-from dataclasses import dataclass
+import os
+import re
 import typing
+from dataclasses import dataclass
+from fnmatch import fnmatch, translate
+from functools import partial
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+
+from robocorp import log
 
 # Examples:
 # Filter("mymodule.ignore", kind=FilterKind.exclude)
@@ -27,6 +29,94 @@ class Filter:
     kind: FilterKind
 
 
+@dataclass
+class LoopLogPolicy:
+    """
+    Specifies which iterations (steps) of `for` and `while` loops are logged.
+
+    Iterations which are not logged are summarized in a single step (with
+    the number of iterations not logged and their total time) at the end of
+    the loop. Note that iterations which fail are always logged.
+
+    Args:
+        name: The module name (or `fnmatch` pattern) where the policy applies
+            (matched in the same way as `Filter.name`).
+        loop: An `fnmatch` pattern matching the loop description
+            (i.e.: `"for row in *"`).
+        first: The number of iterations at the start of the loop which are
+            logged (None means that all are logged unless `last`, `every`
+            or `only_failing` is given, in which case it's the same as 0).
+        last: The number of iterations at the end of the loop which are
+            logged (only available in `for` loops over builtin collections
+            such as a `list`, `dict` or `range`, where the number of items
+            is known in advance).
+        every: If given, every `every`-th iteration is also logged.
+        only_failing: If True, only the iterations which fail are logged
+            (besides the ones specified in `first`, `last` and `every`).
+    """
+
+    name: str = "*"
+    loop: str = "*"
+    first: Optional[int] = None
+    last: int = 0
+    every: int = 0
+    only_failing: bool = False
+
+    def accept_iteration(self, index: int, size: Optional[int]) -> bool:
+        """
+        Args:
+            index: The (0-based) index of the iteration.
+            size: The number of iterations (if known).
+
+        Returns:
+            Whether the given iteration should be logged.
+        """
+        first = self.first
+        if first is None:
+            if not self.only_failing and self.last <= 0 and self.every <= 0:
+                return True
+            first = 0
+
+        if index < first:
+            return True
+
+        if self.every > 0 and index % self.every == 0:
+            return True
+
+        if self.last > 0 and size is not None and index >= size - self.last:
+            return True
+
+        return False
+
+
+@dataclass
+class AssignLogPolicy:
+    """
+    Specifies a budget for the assigns which are logged in functions (when
+    the budget is exceeded the assigns are not logged and the number of
+    assigns omitted is logged when the function call finishes).
+
+    Args:
+        name: The module name (or `fnmatch` pattern) where the policy applies
+            (matched in the same way as `Filter.name`).
+        function: An `fnmatch` pattern matching the function name (methods
+            are matched with the class name, i.e.: `"MyClass.my_method"`).
+        max_per_call: The maximum number of assigns logged in each call of
+            the function (note: for generators and coroutines each run between
+            a resume and a suspend is considered a call).
+        max_per_second: The maximum number of assigns logged per second in
+            the function (considering all the calls).
+        only_on_change: If True, an assign is only logged if the value
+            (its repr) changed since the last time it was logged in the call.
+    """
+
+    name: str = "*"
+    function: str = "*"
+    max_per_call: Optional[int] = None
+    max_per_second: Optional[int] = None
+    only_on_change: bool = False
+
+
 class GeneralLogConfig:
     __slots__ = [
         "max_value_repr_size",
@@ -34,16 +124,23 @@ class GeneralLogConfig:
         "_accept",
         "_output_log_level",
         "_accept_output",
+        "_accept_any",
         "_output_stream",
     ]
 
-    _accept: Dict[str, Sequence[str]]
-    _accept_output: Dict[str, Sequence[str]]
+    _accept: FrozenSet[str]
+    _accept_output: FrozenSet[str]
+
+    # Union of `_accept` and `_accept_output` (precomputed so that a message
+    # which would be rejected can be skipped with a single check).
+    _accept_any: FrozenSet[str]
 
     def __init__(self) -> None:
         from ._convert_units import _convert_to_bytes
 
         # Setup defaults.
+        self._accept = frozenset()
+        self._accept_output = frozenset()
         self.max_value_repr_size: int = _convert_to_bytes("200k")
 
         # Show log.debug/log.info/log.warn/log.critical by default.
@@ -119,6 +216,7 @@ class GeneralLogConfig:
 
         self._output_log_level = output_log_level
         self._accept_output = accept_log_levels
+        self._accept_any = self._accept | accept_log_levels
 
     @property
     def log_level(self):
@@ -130,8 +228,17 @@ class GeneralLogConfig:
 
         self._log_level = log_level
         self._accept = accept_log_levels
+        self._accept_any = accept_log_levels | self._accept_output
+
+    def _compute_accepted_log_levels(
+        self, log_level: "log.FilterLogLevelLiterals"
+    ) -> FrozenSet[str]:
+        accept_log_levels = self._compute_accepted_log_levels_list(log_level)
+        return frozenset(accept_log_levels)
 
-    def _compute_accepted_log_levels(self, log_level: "log.FilterLogLevelLiterals"):
+    def _compute_accepted_log_levels_list(
+        self, log_level: "log.FilterLogLevelLiterals"
+    ) -> List[str]:
         # The accepted log levels are internal
         accept_log_levels = [
             log.Status.DEBUG,
@@ -177,9 +284,26 @@ class AutoLogConfigBase:
         self,
         rewrite_assigns=True,
         rewrite_yields=True,
+        loop_log_policies: Sequence[LoopLogPolicy] = (),
+        assign_log_policies: Sequence[AssignLogPolicy] = (),
     ):
         self.rewrite_assigns = rewrite_assigns
         self.rewrite_yields = rewrite_yields
+        self._loop_log_policies = tuple(loop_log_policies)
+        self._loop_log_policies_matches = [
+            (_FiterMatch(Filter(policy.name, FilterKind.full_log)), policy)
+            for policy in self._loop_log_policies
+        ]
+        self._cache_loop_to_policy: Dict[Tuple[str, str], Optional[LoopLogPolicy]] = {}
+
+        self._assign_log_policies = tuple(assign_log_policies)
+        self._assign_log_policies_matches = [
+            (_FiterMatch(Filter(policy.name, FilterKind.full_log)), policy)
+            for policy in self._assign_log_policies
+        ]
+        self._cache_function_to_assign_policy: Dict[
+            Tuple[str, str], Optional[AssignLogPolicy]
+        ] = {}
 
     def get_rewrite_yields(self) -> bool:
         """
@@ -200,6 +324,18 @@ class AutoLogConfigBase:
         """
         return self.rewrite_assigns
 
+    def get_rewrite_cache_key(self) -> str:
+        """
+        Returns:
+            A string with the settings which change the rewritten code (used
+            in the key of the cache of rewritten code). Subclasses which
+            change how the code is rewritten must override it.
+        """
+        return (
+            f"rewrite_assigns={self.get_rewrite_assigns()}:"
+            f"rewrite_yields={self.get_rewrite_yields()}"
+        )
+
     def get_filter_kind_by_module_name(self, module_name: str) -> Optional[FilterKind]:
         """
         Args:
@@ -223,6 +359,71 @@ class AutoLogConfigBase:
         """
         raise NotImplementedError()
 
+    def get_loop_log_policy(
+        self, module_name: str, loop_name: str
+    ) -> Optional[LoopLogPolicy]:
+        """
+        Args:
+            module_name: The name of the module where the loop is.
+            loop_name: The description of the loop (i.e.: `for a in range(2)`).
+
+        Returns:
+            The policy specifying which iterations of the loop should be
+            logged (None means that all iterations are logged).
+        """
+        if not self._loop_log_policies:
+            return None
+
+        cache_key = (module_name, loop_name)
+        try:
+            return self._cache_loop_to_policy[cache_key]
+        except KeyError:
+            pass
+
+        found = None
+        for filter_match, policy in self._loop_log_policies_matches:
+            if filter_match.get_filter_kind_match(module_name) is not None and (
+                policy.loop == "*" or fnmatch(loop_name, policy.loop)
+            ):
+                found = policy
+                break
+
+        self._cache_loop_to_policy[cache_key] = found
+        return found
+
+    def get_assign_log_policy(
+        self, module_name: str, function_name: str
+    ) -> Optional[AssignLogPolicy]:
+        """
+        Args:
+            module_name: The name of the module where the function is.
+            function_name: The name of the function (methods have the
+                class name, i.e.: `MyClass.my_method`).
+
+        Returns:
+            The policy specifying the budget for the assigns logged in the
+            function (None means that all assigns are logged).
+        """
+        if not self._assign_log_policies:
+            return None
+
+        cache_key = (module_name, function_name)
+        try:
+            return self._cache_function_to_assign_policy[cache_key]
+        except KeyError:
+            pass
+
+        found = None
+        for filter_match, policy in self._assign_log_policies_matches:
+            if filter_match.get_filter_kind_match(module_name) is not None and (
+                policy.function == "*" or fnmatch(function_name, policy.function)
+            ):
+                found = policy
+                break
+
+        self._cache_function_to_assign_policy[cache_key] = found
+        return found
+
     def set_as_global(self):
         """
         May be used to set this config as the global one to determine if a
@@ -238,7 +439,7 @@ class _FiterMatch:
         name = filter.name
         self._filter_name = name
 
-        if "*" in name or "[" in name or "?" in name:
+        if _is_fnmatch_pattern(name):
             self._match_filter = partial(self._fnmatch, name)
         else:
             self._match_filter = self._match_module_name
@@ -259,6 +460,70 @@ class _FiterMatch:
         return None
 
 
+def _is_fnmatch_pattern(name: str) -> bool:
+    return "*" in name or "[" in name or "?" in name
+
+
+# fnmatch matches case-insensitively on platforms where `os.path.normcase`
+# changes the case.
+_FNMATCH_IGNORECASE = os.path.normcase("A") == "a"
+
+
+def _filter_name_to_regex(index: int, name: str) -> str:
+    if not _is_fnmatch_pattern(name):
+        # Matches the module or any submodule.
+        return f"{re.escape(name)}(?:\\..*)?"
+
+    regex = translate(name)
+    # The groups created by `fnmatch.translate` must be unique in the final regex.
+    regex = re.sub(
+        r"\(\?P([<=])g(\d+)",
+        lambda m: f"(?P{m.group(1)}f{index}g{m.group(2)}",
+        regex,
+    )
+    if _FNMATCH_IGNORECASE:
+        regex = f"(?i:{regex})"
+    return regex
+
+
+class _CompiledFilters:
+    """
+    All the filters merged into a single regular expression.
+
+    The alternatives are tried in order, so, the first filter which matches
+    a module name has priority (as when the filters are checked one by one).
+    """
+
+    def __init__(self, filters: Sequence[Filter]) -> None:
+        self._kinds: Dict[str, FilterKind] = {}
+        parts = []
+        for i, f in enumerate(filters):
+            group_name = f"f{i}"
+            self._kinds[group_name] = f.kind
+            parts.append(f"(?P<{group_name}>{_filter_name_to_regex(i, f.name)})")
+
+        self._pattern = re.compile("|".join(parts), re.DOTALL) if parts else None
+
+    def get_filter_kind_match(self, module_name: str) -> Optional[FilterKind]:
+        pattern = self._pattern
+        if pattern is None:
+            return None
+
+        m = pattern.fullmatch(module_name)
+        if m is None:
+            return None
+
+        # The group of the filter is the outermost, so, it's the last one matched.
+        group_name = m.lastgroup
+        if group_name in self._kinds:
+            return self._kinds[group_name]
+
+        for group_name, kind in self._kinds.items():
+            if m.group(group_name) is not None:
+                return kind
+        return None
+
+
 class DefaultAutoLogConfig(AutoLogConfigBase):
     """
     Configuration which provides information on which modules have to be rewritten
@@ -301,8 +566,15 @@ class DefaultAutoLogConfig(AutoLogConfigBase):
         rewrite_assigns=True,
         rewrite_yields=True,
         default_library_filter_kind=FilterKind.log_on_project_call,
+        loop_log_policies: Sequence[LoopLogPolicy] = (),
+        assign_log_policies: Sequence[AssignLogPolicy] = (),
     ):
-        super().__init__(rewrite_assigns=rewrite_assigns, rewrite_yields=rewrite_yields)
+        super().__init__(
+            rewrite_assigns=rewrite_assigns,
+            rewrite_yields=rewrite_yields,
+            loop_log_policies=loop_log_policies,
+            assign_log_policies=assign_log_policies,
+        )
 
         high_priority_filters = [
             # Make sure we don't log things internal to robocorp.log.
@@ -350,18 +622,16 @@ class DefaultAutoLogConfig(AutoLogConfigBase):
             high_priority_filters.append(Filter("robocorp.tasks", FilterKind.exclude))
 
         self._filters = filters
-        self._filter_matches = [
-            _FiterMatch(f)
-            for f in itertools.chain(
-                high_priority_filters, filters, low_priority_filters
-            )
-        ]
+        self._compiled_filters = _CompiledFilters(
+            tuple(itertools.chain(high_priority_filters, filters, low_priority_filters))
+        )
         self._cache_modname_to_kind: Dict[str, Optional[FilterKind]] = {}
         self._cache_filename_to_kind: Dict[str, FilterKind] = {}
+        self._cache_dirname_to_kind: Dict[str, FilterKind] = {}
         self._default_library_filter_kind = default_library_filter_kind
 
     def _to_dict(self):
-        return {
+        ret = {
             "log_filter_rules": [
                 {"name": f.name, "kind": str(f.kind).split(".")[-1]}
                 for f in self._filters
@@ -370,6 +640,19 @@ class DefaultAutoLogConfig(AutoLogConfigBase):
                 "."
             )[-1],
         }
+        if self._loop_log_policies:
+            from dataclasses import asdict
+
+            ret["loop_log_policies"] = [
+                asdict(policy) for policy in self._loop_log_policies
+            ]
+        if self._assign_log_policies:
+            from dataclasses import asdict
+
+            ret["assign_log_policies"] = [
+                asdict(policy) for policy in self._assign_log_policies
+            ]
+        return ret
 
     def __repr__(self):
         import json
@@ -391,11 +674,7 @@ class DefaultAutoLogConfig(AutoLogConfigBase):
         :return: True if it should be excluded, False if it should be included
             and None if no rule matched the given file.
         """
-        for filter_match in self._filter_matches:
-            filter_kind_match = filter_match.get_filter_kind_match(module_name)
-            if filter_kind_match is not None:
-                return filter_kind_match
-        return None
+        return self._compiled_filters.get_filter_kind_match(module_name)
 
     def _get_modname_filter_kind(self, module_name: str) -> Optional[FilterKind]:
         cache_key = module_name
@@ -423,11 +702,18 @@ class DefaultAutoLogConfig(AutoLogConfigBase):
         except KeyError:
             pass
 
-        in_project_roots = log._in_project_roots(absolute_filename)
-        if in_project_roots:
-            filter_kind = FilterKind.full_log
-        else:
-            filter_kind = self._default_library_filter_kind
+        # The project/library roots are directories, so, all the files in
+        # the same directory have the same result.
+        dirname = os.path.dirname(absolute_filename)
+        try:
+            filter_kind = self._cache_dirname_to_kind[dirname]
+        except KeyError:
+            in_project_roots = log._in_project_roots(absolute_filename)
+            if in_project_roots:
+                filter_kind = FilterKind.full_log
+            else:
+                filter_kind = self._default_library_filter_kind
+            self._cache_dirname_to_kind[dirname] = filter_kind
 
         self._cache_filename_to_kind[cache_key] = filter_kind
         return filter_kind
@@ -1,9 +1,10 @@
 import datetime
+import itertools
 import json
 from logging import getLogger
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from .protocols import IReadLines
+from .protocols import IReadBytes, IReadLines
 
 # Whenever the decoding changes we should bump up this version.
 DOC_VERSION = "0.0.2"
@@ -196,6 +197,10 @@ MESSAGE_TYPE_YIELD_FROM_SUSPEND = "YFS"
 
 _MESSAGE_TYPE_INFO: Dict[str, Callable[[Decoder, str], Any]] = {}
 
+# The fields (name, kind) for each message type (memorize/memorize_path
+# message types aren't added here). Used by the `BatchDecoder`.
+_MESSAGE_TYPE_FIELDS: Dict[str, List[Tuple[str, str]]] = {}
+
 
 def _build_decoding():
     from robocorp.log._decoder_spec import SPEC
@@ -215,8 +220,15 @@ def _build_decoding():
             key = key.strip()
             val = val.strip()
             _MESSAGE_TYPE_INFO[key] = _MESSAGE_TYPE_INFO[val]
+            if val in _MESSAGE_TYPE_FIELDS:
+                _MESSAGE_TYPE_FIELDS[key] = _MESSAGE_TYPE_FIELDS[val]
         else:
             _MESSAGE_TYPE_INFO[key] = _decode(val)
+            if val not in ("memorize", "memorize_path"):
+                _MESSAGE_TYPE_FIELDS[key] = [
+                    (name.strip(), kind.strip())
+                    for name, kind in (f.split(":", 1) for f in val.split(","))
+                ]
 
 
 _build_decoding()
@@ -239,3 +251,195 @@ def iter_decoded_log_format(stream: IReadLines) -> Iterator[dict]:
             decoded = decoder.decode_message_type(message_type, message)
             if decoded:
                 yield decoded
+
+
+class BinaryDecoder:
+    """
+    Incremental decoder for contents in the binary format.
+
+    Usage:
+
+        decoder = BinaryDecoder()
+        for data in iter_bytes:
+            for decoded in decoder.feed(data):
+                ...
+    """
+
+    def __init__(self) -> None:
+        from ._binary_format import BinaryToTextConverter
+
+        self._converter = BinaryToTextConverter()
+        self._decoder = Decoder()
+
+    def feed(self, data: bytes) -> Iterator[dict]:
+        """
+        Provides the data to be decoded and returns an iterator with the decoded
+        messages for all the frames which were completed.
+
+        Note: incomplete frames are kept until more data is provided.
+        """
+        decoder = self._decoder
+        for line in self._converter.feed(data):
+            message_type, message = line.rstrip("\n").split(" ", 1)
+            decoded = decoder.decode_message_type(message_type, message)
+            if decoded:
+                yield decoded
+
+
+def iter_decoded_binary_log_format(
+    stream: IReadBytes, chunk_size: int = 1024 * 64
+) -> Iterator[dict]:
+    decoder = BinaryDecoder()
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        yield from decoder.feed(data)
+
+
+def _convert_column(func: Callable[[str], Any], column: List[Optional[str]]) -> list:
+    try:
+        return [None if v is None else func(v) for v in column]
+    except Exception:
+        # Some value couldn't be converted (do it again one by one so that
+        # just the values which failed are None).
+        ret = []
+        for v in column:
+            try:
+                ret.append(None if v is None else func(v))
+            except Exception:
+                ret.append(None)
+        return ret
+
+
+class BatchDecoder:
+    """
+    Decoder which decodes a batch of lines at once and provides the decoded
+    contents in a columnar way (one list per field for each message type)
+    instead of creating a dict for each message.
+
+    Usage:
+
+        decoder = BatchDecoder()
+        for lines in iter_batches_of_lines:
+            message_type_to_columns = decoder.decode_lines(lines)
+            se_columns = message_type_to_columns.get("SE")
+            if se_columns:
+                for name, time_delta in zip(
+                    se_columns["name"], se_columns["time_delta_in_seconds"]
+                ):
+                    ...
+
+    Note: the memo (`M`) and path location (`P`) messages are kept across
+    batches (so, all the lines of a `.robolog` should be passed to the same
+    decoder in the same order).
+    """
+
+    def __init__(self) -> None:
+        self._decoder = Decoder()
+
+    def decode_lines(self, lines: Iterable[str]) -> Dict[str, Dict[str, list]]:
+        """
+        Args:
+            lines: The lines to be decoded (in the text format).
+
+        Returns:
+            A dict with the message type pointing to a dict with the columns
+            for that message type. Each column has one entry per message
+            of that type (the columns have the same names of the keys
+            provided by `Decoder.decode_message_type` and the `line_index`
+            column has the index of the line of the message in the batch).
+
+            Note: if an optional field isn't available or a value couldn't be
+            decoded, `None` is used.
+        """
+        decoder = self._decoder
+        message_type_to_messages: Dict[str, List[str]] = {}
+        message_type_to_line_indexes: Dict[str, List[int]] = {}
+
+        for line_index, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
+            message_type, _, message = line.partition(" ")
+            if message_type == "M":
+                decode_memo(decoder, message)
+            elif message_type == "P":
+                decode_path_location(decoder, message)
+            else:
+                try:
+                    messages = message_type_to_messages[message_type]
+                except KeyError:
+                    if message_type not in _MESSAGE_TYPE_FIELDS:
+                        raise RuntimeError(f"Error decoding line: {line}")
+                    messages = message_type_to_messages[message_type] = []
+                    message_type_to_line_indexes[message_type] = []
+                messages.append(message)
+                message_type_to_line_indexes[message_type].append(line_index)
+
+        # Ids are resolved once per column (note: an id is never changed
+        # to point to a different value, so, it's ok to resolve it after
+        # all the `M` messages in the batch are decoded).
+        memo_get = decoder.memo.__getitem__
+        location_memo_get = decoder.location_memo.__getitem__
+
+        ret: Dict[str, Dict[str, list]] = {}
+        for message_type, messages in message_type_to_messages.items():
+            fields = _MESSAGE_TYPE_FIELDS[message_type]
+            columns: Dict[str, list] = {
+                "line_index": message_type_to_line_indexes[message_type]
+            }
+            ret[message_type] = columns
+
+            maxsplit = len(fields) - 1
+            rows = [message.split("|", maxsplit) for message in messages]
+            for i, (name, kind) in enumerate(fields):
+                column: List[Optional[str]] = [
+                    row[i] if len(row) > i else None for row in rows
+                ]
+                if kind in ("loc_id", "loc_and_doc_id"):
+                    locations = _convert_column(location_memo_get, column)
+                    columns["name"] = [loc and loc[0] for loc in locations]
+                    columns["libname"] = [loc and loc[1] for loc in locations]
+                    columns["source"] = [loc and loc[2] for loc in locations]
+                    if kind == "loc_and_doc_id":
+                        columns["doc"] = [loc and loc[3] for loc in locations]
+                    columns["lineno"] = [loc and loc[4] for loc in locations]
+                else:
+                    columns[name] = _convert_column(
+                        _COLUMN_CONVERTERS.get(kind) or memo_get, column
+                    )
+        return ret
+
+
+def _decode_dateisoformat_str(msg: str) -> str:
+    return _decode_dateisoformat(None, msg)  # type: ignore
+
+
+_COLUMN_CONVERTERS: Dict[str, Optional[Callable[[str], Any]]] = {
+    "oid": None,  # Resolved from the memo of the decoder.
+    "int": int,
+    "float": float,
+    "str": str,
+    "json.loads": json.loads,
+    "dateisoformat": _decode_dateisoformat_str,
+}
+
+
+def iter_decoded_log_format_in_batches(
+    stream: IReadLines, lines_per_batch: int = 10000
+) -> Iterator[Dict[str, Dict[str, list]]]:
+    decoder = BatchDecoder()
+    lines: Iterable[str]
+    if hasattr(stream, "__iter__"):
+        # Iterate the stream so that only a batch is kept in memory at a time.
+        lines = stream  # type: ignore
+    else:
+        lines = stream.readlines()
+
+    it = iter(lines)
+    while True:
+        batch = list(itertools.islice(it, lines_per_batch))
+        if not batch:
+            break
+        yield decoder.decode_lines(batch)
@@ -122,7 +122,10 @@ ET: status:oid, message:oid, time_delta_in_seconds:float
 #
 # ELSE (note: doesn't add to the stack, just notifies that an if statement was entered)
 #
-SE: loc:loc_and_doc_id, type:oid, time_delta_in_seconds:float
+# The thread_id is only available if the element was started from a thread
+# which is not the main thread (elements in different threads may be
+# interleaved and each thread has its own stack).
+SE: loc:loc_and_doc_id, type:oid, time_delta_in_seconds:float, thread_id:int
 
 # Yield Resume (coming back to a suspended frame).
 # Should be sent when a given frame is resumed from a yield.
@@ -134,7 +137,8 @@ YFR: loc:loc_id, time_delta_in_seconds:float
 
 # End Element
 # When the element ends, provide its status ("PASS", "ERROR") and the time at which it finished.
-EE: type:oid, status:oid, time_delta_in_seconds:float
+# The thread_id is only available if the element was not in the main thread.
+EE: type:oid, status:oid, time_delta_in_seconds:float, thread_id:int
 
 # Return
 # When a return value is found it can be reported.
@@ -0,0 +1,183 @@
+"""
+Helper to hide strings (i.e.: secrets) from the log output.
+
+The strings to hide are kept in a trie (which is updated incrementally when
+a new string is added) and a regular expression is created from the trie
+only when it's actually needed. As the common prefixes are factored in the
+regular expression, the regular expression engine doesn't need to try each
+string at each position.
+
+Strings added after the regular expression was created are kept as pending
+(and are searched directly) until there are enough of them to justify
+recreating the regular expression (so, adding strings one by one while
+messages are logged doesn't recreate the regular expression at each new
+string).
+
+Before applying the regular expression, messages which are too small to
+contain any of the strings to hide are skipped and the messages which had
+nothing to hide are cached (as the same messages are usually logged many
+times).
+"""
+import re
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+# Key used in the trie to mark that a string ends at a node.
+_END = ""
+
+# Messages up to this size have the result of the check cached.
+_MAX_CACHED_MESSAGE_LEN = 512
+_MAX_CACHE_SIZE = 10000
+
+# When there are more pending strings than this, the regular expression is
+# recreated.
+_MAX_PENDING = 32
+
+
+def _trie_to_regex(node: dict) -> str:
+    """
+    Converts the trie to a regular expression (where the longest match is
+    always preferred).
+    """
+    # Compress the chain of nodes with a single child (so that the recursion
+    # is only done when there's a branch).
+    prefix = []
+    while len(node) == 1 and _END not in node:
+        ((c, node),) = node.items()
+        prefix.append(re.escape(c))
+
+    ends_here = _END in node
+    alternatives = [
+        re.escape(c) + _trie_to_regex(child)
+        for c, child in sorted(node.items())
+        if c != _END
+    ]
+
+    if not alternatives:
+        return "".join(prefix)
+
+    if len(alternatives) == 1:
+        branch = alternatives[0]
+        if ends_here:
+            branch = f"(?:{branch})?"
+    else:
+        branch = f"(?:{'|'.join(alternatives)})"
+        if ends_here:
+            branch += "?"
+
+    return "".join(prefix) + branch
+
+
+class HideStrings:
+    def __init__(self) -> None:
+        self._strings: Set[str] = set()
+        self._trie: Dict[str, dict] = {}
+        self._min_len = 0
+
+        # Created lazily from the trie.
+        self._pattern: Optional[Pattern[str]] = None
+
+        # Strings added after the pattern was created.
+        self._pending: List[str] = []
+
+        # Cache with whether a message contains some string to hide.
+        self._cache: Dict[str, bool] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._strings)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def add(self, string_to_hide: str) -> bool:
+        """
+        Returns:
+            True if the string was added and False if it was already there
+            (or if it's empty).
+        """
+        if not string_to_hide or string_to_hide in self._strings:
+            return False
+
+        self._strings.add(string_to_hide)
+        node = self._trie
+        for c in string_to_hide:
+            child = node.get(c)
+            if child is None:
+                child = node[c] = {}
+            node = child
+        node[_END] = {}
+
+        if len(self._strings) == 1 or len(string_to_hide) < self._min_len:
+            self._min_len = len(string_to_hide)
+
+        if self._pattern is not None:
+            self._pending.append(string_to_hide)
+        self._cache.clear()
+        return True
+
+    def _get_pattern(self) -> Pattern[str]:
+        pattern = self._pattern
+        if pattern is None or len(self._pending) > _MAX_PENDING:
+            pattern = self._pattern = re.compile(_trie_to_regex(self._trie))
+            del self._pending[:]
+        return pattern
+
+    def _sub_with_pending(
+        self, pattern: Pattern[str], replacement: str, message: str
+    ) -> str:
+        # The matches of the pattern and of the pending strings may overlap,
+        # so, the overlapping ranges are merged before replacing (otherwise
+        # a part of a string to hide could be kept).
+        ranges: List[Tuple[int, int]] = [m.span() for m in pattern.finditer(message)]
+        for s in self._pending:
+            start = message.find(s)
+            while start != -1:
+                ranges.append((start, start + len(s)))
+                start = message.find(s, start + 1)
+
+        if not ranges:
+            return message
+
+        ranges.sort()
+        parts = []
+        last_end = 0
+        cur_start, cur_end = ranges[0]
+        for start, end in ranges[1:]:
+            if start < cur_end:
+                cur_end = max(cur_end, end)
+            else:
+                parts.append(message[last_end:cur_start])
+                parts.append(replacement)
+                last_end = cur_end
+                cur_start, cur_end = start, end
+        parts.append(message[last_end:cur_start])
+        parts.append(replacement)
+        parts.append(message[cur_end:])
+        return "".join(parts)
+
+    def sub(self, replacement: str, message: str) -> str:
+        """
+        Replaces the strings to hide in the message with the replacement.
+        """
+        if not self._strings or len(message) < self._min_len:
+            return message
+
+        cache_it = len(message) <= _MAX_CACHED_MESSAGE_LEN
+        if cache_it:
+            found = self._cache.get(message)
+            if found is False:
+                return message
+
+        pattern = self._get_pattern()
+        if self._pending:
+            new_message = self._sub_with_pending(pattern, replacement, message)
+        else:
+            new_message = pattern.sub(replacement, message)
+        found = new_message != message
+        message = new_message
+
+        if cache_it:
+            if len(self._cache) >= _MAX_CACHE_SIZE:
+                self._cache.clear()
+            if not found:
+                self._cache[message] = False
+        return message
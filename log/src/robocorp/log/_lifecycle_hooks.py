@@ -1,10 +1,14 @@
+import itertools
 import sys
 from collections import deque
+from functools import partial
 from logging import getLogger
-from typing import Iterator, Tuple
+from typing import Any, Iterator, Tuple
 
 from robocorp import log
 
+from .protocols import LogElementType
+
 logger = getLogger(__name__)
 
 
@@ -49,7 +53,9 @@ class Callback(object):
                     raise
 
 
-# Called as: before_method(log_element_type, __name__, filename, name, lineno, args_dict)
+# Called as: before_method(location, arg_values)
+# location is a `MethodLocation` and arg_values is a tuple with the values of
+# the arguments (in the same order of `location.arg_names`).
 before_method = Callback()
 
 # Called as: after_method(log_element_type, __name__, filename, name, lineno)
@@ -85,6 +91,14 @@ before_yield_from = Callback()
 # Called as: after_yield_from(__name__, filename, name, lineno)
 after_yield_from = Callback()
 
+# Called as: before_await(__name__, filename, name, lineno)
+# Note: `await` is handled as a `yield from` (the coroutine is suspended
+# until the awaitable finishes).
+before_await = Callback()
+
+# Called as: after_await(__name__, filename, name, lineno)
+after_await = Callback()
+
 # Called as: before_iterate(log_element_type, __name__, filename, name, lineno)
 before_iterate = Callback()
 
@@ -92,6 +106,10 @@ before_iterate = Callback()
 # tp, e, tb = exc_info
 iterate_except = Callback()
 
+# Called as: iterate_size(log_element_type, __name__, filename, name, lineno, size)
+# Called after before_iterate when the number of iterations is known in advance.
+iterate_size = Callback()
+
 # Called as: before_iterate_step(log_element_type, __name__, filename, name, lineno, targets)
 # targets is a tuple(tuple(target_name, target_value))
 before_iterate_step = Callback()
@@ -107,6 +125,45 @@ iterate_step_except = Callback()
 after_iterate = Callback()
 
 
+# The rewritten code checks this flag whenever a function is called: when
+# False the original code is run directly (without creating a
+# `MethodLifecycleContext` nor calling any of the callbacks).
+# Note: this is a module attribute (and not a function) for speed.
+enabled = True
+
+# When True, `enabled` is only True while some logger instance is registered.
+_enable_only_with_logger_instances = False
+
+
+def update_enabled() -> None:
+    """
+    Updates the `enabled` flag (should be called whenever a logger instance
+    or a profiler is added/removed).
+    """
+    global enabled
+
+    if _enable_only_with_logger_instances:
+        from ._logger_instances import _has_logger_instances
+        from ._profile import _has_profilers
+
+        enabled = _has_logger_instances() or _has_profilers()
+    else:
+        enabled = True
+
+
+def set_enable_only_with_logger_instances(value: bool) -> None:
+    """
+    Args:
+        value: If True the hooks are only called while some logger instance
+        is registered (i.e.: when the output would be discarded anyway the
+        original code is run directly).
+    """
+    global _enable_only_with_logger_instances
+
+    _enable_only_with_logger_instances = value
+    update_enabled()
+
+
 def iter_all_callbacks() -> Iterator[Callback]:
     for _key, val in globals().copy().items():
         if isinstance(val, Callback):
@@ -126,6 +183,98 @@ del k
 del v
 
 
+_SIZED_BUILTIN_TYPES = frozenset(
+    (
+        list,
+        tuple,
+        range,
+        dict,
+        set,
+        frozenset,
+        str,
+        bytes,
+        deque,
+        type({}.keys()),
+        type({}.values()),
+        type({}.items()),
+    )
+)
+
+
+_next_loc_index: "partial[int]" = partial(next, itertools.count())
+
+
+class MethodLocation:
+    """
+    The constant parts of the calls of a function which is auto-logged.
+
+    The rewritten code creates it only once for each function (when the module
+    is imported), so, at each call just the values of the arguments need to
+    be passed.
+    """
+
+    __slots__ = [
+        "log_element_type",
+        "mod_name",
+        "filename",
+        "name",
+        "lineno",
+        "arg_names",
+        "header",
+        "loc_index",
+        "_sensitive_args",
+        "_sensitive_version",
+    ]
+
+    def __init__(
+        self,
+        log_element_type: LogElementType,
+        mod_name: str,
+        filename: str,
+        name: str,
+        lineno: int,
+        arg_names: Tuple[str, ...],
+    ):
+        self.log_element_type = log_element_type
+        self.mod_name = mod_name
+        self.filename = filename
+        self.name = name
+        self.lineno = lineno
+        self.arg_names = arg_names
+
+        # What's passed to the callbacks such as `after_method`.
+        self.header = (log_element_type, mod_name, filename, name, lineno)
+
+        # A unique index for each location (outputs use it to cache the id of
+        # the location written, so, it's not a global id, but an index which
+        # starts at 0 to be used in a list).
+        self.loc_index = _next_loc_index()
+
+        self._sensitive_args: Tuple[bool, ...] = ()
+        self._sensitive_version = -1
+
+    def get_sensitive_args(self) -> Tuple[bool, ...]:
+        """
+        Returns:
+            A tuple (in the same order of `arg_names`) which is True for the
+            arguments which have a sensitive name.
+        """
+        sensitive_names = log._sensitive_names
+        if self._sensitive_version != sensitive_names.version:
+            self._sensitive_args = tuple(
+                bool(sensitive_names.is_sensitive_variable_name(arg_name))
+                for arg_name in self.arg_names
+            )
+            self._sensitive_version = sensitive_names.version
+        return self._sensitive_args
+
+    def get_args_dict(self, arg_values: Tuple[Any, ...]) -> dict:
+        return dict(zip(self.arg_names, arg_values))
+
+    def __repr__(self):
+        return f"MethodLocation{self.header + (self.arg_names,)}"
+
+
 class MethodLifecycleContext:
     """
     See: robocorp_log_tests.test_rewrite_strategy tests to see how the
@@ -135,17 +284,16 @@ class MethodLifecycleContext:
     # Flag which subclasses can override.
     _accept = True
 
-    def __init__(self, tup):
+    def __init__(self, location: MethodLocation, arg_values: Tuple[Any, ...]):
         if not self._accept:
             return
 
         self._stack = deque()
 
-        # tup is log_element_type, mod_name, filename, name, lineno, args_dict
-        before_method(*tup)
+        before_method(location, arg_values)
 
-        # The after doesn't have the args_dict.
-        self._stack.append((-1, "method", tup[:-1]))
+        # The after receives just the header (without the args).
+        self._stack.append((-1, "method", location.header))
 
     def __enter__(self):
         return self
@@ -177,10 +325,24 @@ class MethodLifecycleContext:
 
     report_while_start = report_for_start
 
+    def report_for_iter(self, report_id, iterable):
+        if self._accept:
+            # Only builtin collections are checked (calling `len()` could
+            # have side effects in other objects).
+            if type(iterable) in _SIZED_BUILTIN_TYPES and self._stack:
+                stack_report_id, _method_name, tup = self._stack[-1]
+                if stack_report_id == report_id:
+                    iterate_size(*tup, len(iterable))
+        return iterable
+
     def report_for_step_start(self, report_id, tup):
         if not self._accept:
             return
 
+        if self._stack and self._stack[-1][0] == report_id:
+            # The previous step didn't reach its end (i.e.: `continue`).
+            self._report_end(report_id)
+
         # tup is (log_element_type, __name__, filename, name, lineno, targets)
         before_iterate_step(*tup)
         self._stack.append((report_id, "iterate_step", tup[:-1]))
@@ -225,8 +387,8 @@ class MethodLifecycleContext:
 
 
 class MethodLifecycleContextCallerInProject(MethodLifecycleContext):
-    def __init__(self, tup):
+    def __init__(self, location: MethodLocation, arg_values: Tuple[Any, ...]):
         self._caller_in_project_roots = log._caller_in_project_roots(level=3)
         self._accept = self._caller_in_project_roots
 
-        MethodLifecycleContext.__init__(self, tup)
+        MethodLifecycleContext.__init__(self, location, arg_values)
@@ -0,0 +1,332 @@
+"""
+Sidecar index for the `.robolog` files.
+
+When a `.robolog` file is finished (because the output was rotated or closed)
+an `<name>.robolog.index` file is written alongside it with the byte offsets of
+the tasks and of the elements which start close to the task level as well as
+the time delta range of the file.
+
+This makes it possible to decode just the part of a run which is related to a
+given task or time window (without having to decode everything from the start).
+
+Note: each `.robolog` file is independent from the other files (the memo for
+a file starts empty and the messages needed to restore the scope are written
+at the start of the file), so, to decode from an offset, only the memo (`M`)
+and path location (`P`) messages before that offset need to be decoded. The
+index has the byte ranges of those messages (`memo_ranges`) and each entry has
+how many of those ranges are before it, so, just those ranges are read before
+seeking to the offset of the entry.
+
+The index is only written when requested (`add_log_output(write_index=True)`).
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+INDEX_VERSION = "0.0.2"
+INDEX_SUFFIX = ".index"
+
+# Elements are only indexed up to this depth (0 means elements directly
+# inside a task) to keep the index small.
+INDEX_MAX_ELEMENT_DEPTH = 1
+
+
+def get_index_path(robolog: Path) -> Path:
+    return robolog.with_name(robolog.name + INDEX_SUFFIX)
+
+
+class LogIndexBuilder:
+    """
+    Collects the information for the index of a single `.robolog` file.
+    """
+
+    def __init__(
+        self, robolog: Path, part: int, binary_format: bool, start_time_delta: float
+    ) -> None:
+        self._robolog = robolog
+        self._part = part
+        self._binary_format = binary_format
+        self._start_time_delta = start_time_delta
+        self._tasks: List[Dict[str, Any]] = []
+        self._elements: List[list] = []
+        self._memo_ranges: List[List[int]] = []
+
+    def on_memo(self, offset: int, end_offset: int) -> None:
+        memo_ranges = self._memo_ranges
+        if memo_ranges and memo_ranges[-1][1] == offset:
+            # Contiguous with the previous memo message.
+            memo_ranges[-1][1] = end_offset
+        else:
+            memo_ranges.append([offset, end_offset])
+
+    def on_start_task(
+        self,
+        offset: int,
+        name: str,
+        libname: str,
+        time_delta: float,
+        restarted: bool = False,
+    ) -> None:
+        self._tasks.append(
+            {
+                "name": name,
+                "libname": libname,
+                "offset": offset,
+                "memo_ranges": len(self._memo_ranges),
+                "time_delta": time_delta,
+                "restarted": restarted,
+                "end_offset": None,
+                "end_time_delta": None,
+                "status": None,
+            }
+        )
+
+    def on_end_task(self, end_offset: int, status: str, time_delta: float) -> None:
+        for task in reversed(self._tasks):
+            if task["end_offset"] is None:
+                task["end_offset"] = end_offset
+                task["end_time_delta"] = time_delta
+                task["status"] = status
+                break
+
+    def on_start_element(
+        self, offset: int, depth: int, name: str, libname: str, time_delta: float
+    ) -> None:
+        self._elements.append(
+            [offset, depth, f"{libname}.{name}", time_delta, len(self._memo_ranges)]
+        )
+
+    def write(self, end_time_delta: float) -> None:
+        from ._log_html import _open_for_atomic_write
+
+        contents = {
+            "version": INDEX_VERSION,
+            "robolog": self._robolog.name,
+            "part": self._part,
+            "binary_format": self._binary_format,
+            "start_time_delta": self._start_time_delta,
+            "end_time_delta": end_time_delta,
+            "tasks": self._tasks,
+            # Each element is:
+            # [offset, depth, libname.name, time_delta, memo_ranges]
+            "elements": self._elements,
+            # The [offset, end_offset] of the memo (`M` and `P`) messages.
+            "memo_ranges": self._memo_ranges,
+        }
+        with _open_for_atomic_write(str(get_index_path(self._robolog))) as stream:
+            stream.write(json.dumps(contents).encode("utf-8"))
+
+
+def load_log_index(output_dir: Union[str, Path]) -> List[dict]:
+    """
+    Loads the index of all the `.robolog` files in the given directory
+    (sorted by the part of the file in the run).
+    """
+    found = []
+    for index_path in Path(output_dir).glob(f"*.robolog{INDEX_SUFFIX}"):
+        try:
+            with index_path.open("rb") as stream:
+                index = json.loads(stream.read().decode("utf-8"))
+        except Exception:
+            # It may have been removed/changed in the meanwhile.
+            continue
+        if index.get("version") != INDEX_VERSION:
+            continue
+        robolog = index_path.with_name(index["robolog"])
+        if not robolog.exists():
+            continue
+        index["robolog_path"] = robolog
+        found.append(index)
+
+    found.sort(key=lambda index: index["part"])
+    return found
+
+
+def _iter_raw_messages(
+    contents: bytes, binary_format: bool, at_file_start: bool = True
+) -> Iterator[Tuple[int, Optional[str], Any]]:
+    """
+    Provides `(offset, message_type, raw_message)` for each message in the
+    contents (where the raw message can be converted to a text line with
+    `_raw_to_line`).
+
+    Args:
+        at_file_start: Whether the contents are from the start of the file
+            (in which case the binary header is skipped) or start at the
+            offset of some message.
+    """
+    if binary_format:
+        from ._binary_format import (
+            _CODE_TO_MESSAGE_TYPE,
+            BINARY_HEADER,
+            _read_varint,
+        )
+
+        pos = len(BINARY_HEADER) if at_file_start else 0
+        size = len(contents)
+        while pos < size:
+            offset = pos
+            payload_len, start = _read_varint(contents, pos)
+            end = start + payload_len
+            if end > size:
+                return  # Incomplete frame.
+            code, _ = _read_varint(contents, start)
+            yield offset, _CODE_TO_MESSAGE_TYPE.get(code), (start, end)
+            pos = end
+    else:
+        pos = 0
+        size = len(contents)
+        while pos < size:
+            offset = pos
+            end = contents.find(b"\n", pos)
+            if end == -1:
+                return  # Incomplete line.
+            pos = end + 1
+            space = contents.find(b" ", offset, end)
+            if space == -1:
+                continue
+            message_type = contents[offset:space].decode("ascii", "replace")
+            yield offset, message_type, (offset, end)
+
+
+def _raw_to_line(contents: bytes, binary_format: bool, raw: Tuple[int, int]) -> str:
+    start, end = raw
+    if binary_format:
+        from ._binary_format import decode_frame
+
+        return decode_frame(contents, start, end)
+    return contents[start:end].decode("utf-8", "replace")
+
+
+def iter_decoded_from_offset(
+    robolog: Path,
+    binary_format: bool,
+    offset: int,
+    end_offset: Optional[int] = None,
+    memo_ranges: Optional[List[List[int]]] = None,
+) -> Iterator[dict]:
+    """
+    Decodes the messages in the given `.robolog` from `offset` up to
+    `end_offset` (if given).
+
+    Args:
+        memo_ranges: The byte ranges of the memo messages before `offset`
+            (from the index). If not given, the file is scanned from the start
+            to restore the memo.
+    """
+    from ._decoder import Decoder
+
+    decoder = Decoder()
+
+    def decode(contents: bytes, at_file_start: bool, base_offset: int):
+        for msg_offset, message_type, raw in _iter_raw_messages(
+            contents, binary_format, at_file_start
+        ):
+            if message_type is None:
+                continue
+            line = _raw_to_line(contents, binary_format, raw)
+            line_message_type, message = line.split(" ", 1)
+            yield base_offset + msg_offset, decoder.decode_message_type(
+                line_message_type, message
+            )
+
+    with robolog.open("rb") as stream:
+        if memo_ranges is None:
+            contents = stream.read(offset)
+            for msg_offset, message_type, raw in _iter_raw_messages(
+                contents, binary_format
+            ):
+                if message_type in ("M", "P"):
+                    line = _raw_to_line(contents, binary_format, raw)
+                    decoder.decode_message_type(*line.split(" ", 1))
+        else:
+            for memo_offset, memo_end_offset in memo_ranges:
+                if memo_offset >= offset:
+                    break
+                stream.seek(memo_offset)
+                contents = stream.read(min(memo_end_offset, offset) - memo_offset)
+                for _ in decode(contents, False, memo_offset):
+                    pass
+
+        stream.seek(offset)
+        if end_offset is None:
+            contents = stream.read()
+        else:
+            contents = stream.read(end_offset - offset)
+
+    for _msg_offset, decoded in decode(contents, offset == 0, offset):
+        if decoded:
+            yield decoded
+
+
+def iter_decoded_from_index(
+    output_dir: Union[str, Path],
+    task_name: Optional[str] = None,
+    start_time_delta: Optional[float] = None,
+    end_time_delta: Optional[float] = None,
+) -> Iterator[dict]:
+    for index in load_log_index(output_dir):
+        robolog = index["robolog_path"]
+        binary_format = index["binary_format"]
+        memo_ranges = index["memo_ranges"]
+
+        if task_name is not None:
+            for task in index["tasks"]:
+                if task["name"] == task_name:
+                    yield from iter_decoded_from_offset(
+                        robolog,
+                        binary_format,
+                        task["offset"],
+                        task["end_offset"],
+                        memo_ranges[: task["memo_ranges"]],
+                    )
+            continue
+
+        if end_time_delta is not None and index["start_time_delta"] > end_time_delta:
+            break
+
+        if start_time_delta is not None:
+            if index["end_time_delta"] < start_time_delta:
+                continue
+
+        # Start at the last indexed entry which starts before the time window.
+        offset = 0
+        memo_ranges_count = 0
+        if start_time_delta is not None:
+            for (
+                entry_offset,
+                entry_time_delta,
+                entry_memo_ranges_count,
+            ) in _iter_entries(index):
+                if entry_time_delta <= start_time_delta and entry_offset > offset:
+                    offset = entry_offset
+                    memo_ranges_count = entry_memo_ranges_count
+
+        for msg in iter_decoded_from_offset(
+            robolog, binary_format, offset, None, memo_ranges[:memo_ranges_count]
+        ):
+            if end_time_delta is not None:
+                time_delta = msg.get("time_delta_in_seconds")
+                if time_delta is not None and time_delta > end_time_delta:
+                    return
+            yield msg
+
+
+def _iter_entries(index: dict) -> Iterator[Tuple[int, float, int]]:
+    """
+    Provides `(offset, time_delta, memo_ranges_count)` for the tasks and
+    elements in the index.
+    """
+    for task in index["tasks"]:
+        if not task["restarted"]:
+            yield task["offset"], task["time_delta"], task["memo_ranges"]
+    for element in index["elements"]:
+        yield element[0], element[3], element[4]
+
+
+def remove_index(robolog: Path) -> None:
+    index_path = get_index_path(robolog)
+    if index_path.exists():
+        os.remove(index_path)
@@ -2,7 +2,7 @@
 import threading
 import typing
 from contextlib import contextmanager
-from typing import Dict, Iterator
+from typing import Dict, Iterator, Tuple
 
 if typing.TYPE_CHECKING:
     from ._robo_logger import _RoboLogger
@@ -10,14 +10,17 @@ if typing.TYPE_CHECKING:
 _instances_lock = threading.RLock()
 instances: Dict["_RoboLogger", int] = {}
 
+# Immutable snapshot of the instances (updated whenever `instances` is changed)
+# so that logging from multiple threads doesn't need to get a global lock.
+_instances_snapshot: Tuple["_RoboLogger", ...] = ()
+
 _main_thread_id = threading.get_ident()
 
 
-# We could use a set, but we're using a dict to keep the order.
 @contextmanager
 def _get_logger_instances(
-    only_from_main_thread: bool = True,
-) -> Iterator[Dict["_RoboLogger", int]]:
+    only_from_main_thread: bool = False,
+) -> Iterator[Tuple["_RoboLogger", ...]]:
     """
     Args:
         only_from_main_thread:
@@ -27,14 +30,46 @@ def _get_logger_instances(
             in the main thread.
 
     Returns:
-        The logger instances registered so far. Note that a lock is held when
-        the instances are requested and it's only released when the context
-        exits.
+        The logger instances registered so far. Note that this is a snapshot
+        of the instances (which is not changed if a logger is added/removed
+        while it's being used) and no lock is held while it's being used.
+        Use `_update_logger_instances()` to add/remove logger instances.
     """
     if only_from_main_thread:
         if _main_thread_id != threading.get_ident():
-            yield {}
+            yield ()
             return
 
+    yield _instances_snapshot
+
+
+# We could use a set, but we're using a dict to keep the order.
+@contextmanager
+def _update_logger_instances() -> Iterator[Dict["_RoboLogger", int]]:
+    """
+    Returns:
+        The logger instances registered so far to be changed. Note that a lock
+        is held when the instances are requested and it's only released when
+        the context exits.
+    """
+    global _instances_snapshot
+
     with _instances_lock:
-        yield instances
+        try:
+            yield instances
+        finally:
+            _instances_snapshot = tuple(instances)
+
+            from ._lifecycle_hooks import update_enabled
+
+            update_enabled()
+
+
+def _has_logger_instances() -> bool:
+    """
+    Returns:
+        Whether there's some logger instance registered (note: no lock is held
+        as this is meant to be a fast check to skip work which would be
+        discarded anyway).
+    """
+    return bool(_instances_snapshot)
@@ -1,10 +1,307 @@
-from typing import Any, Tuple
+"""
+Helpers to get the repr of objects which are logged.
+
+The repr is created with a max size (`max_value_repr_size`): for the types
+where the repr may be really big (str, bytes, containers, numpy arrays,
+pandas objects) the repr is created by parts and it stops being created as
+soon as the max size is reached (so, a call receiving a huge object doesn't
+need to create the full repr just to clip it afterwards).
+
+Objects of other types use `repr(obj)` (and the result is clipped if needed).
+
+Custom types may provide their own implementation with `register_type_repr`.
+"""
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from . import _config
 from . import suppress
 
+# The repr of immutable values with at least this size may be cached.
+_MIN_LEN_TO_CACHE = 256
+
+# Max number of entries in a repr cache (it's cleared when full).
+_MAX_REPR_CACHE_SIZE = 64
+
+
+class _ReprWriter:
+    """
+    Collects the parts of a repr up to a max size.
+    """
+
+    __slots__ = ["_parts", "_remaining", "_visiting", "clipped_chars", "exact"]
+
+    def __init__(self, max_size: int) -> None:
+        self._parts: List[str] = []
+        self._remaining = max_size
+        # Ids of the containers being written (to detect recursion).
+        self._visiting: Set[int] = set()
+
+        # Number of chars which were clipped.
+        self.clipped_chars = 0
+
+        # If some part was skipped without being created `clipped_chars` isn't
+        # exact.
+        self.exact = True
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    @property
+    def full(self) -> bool:
+        return self._remaining <= 0
+
+    def write(self, s: str, clipped_chars: int = 0) -> None:
+        """
+        Args:
+            s: The contents to be written (clipped if it doesn't fit).
+            clipped_chars: The number of chars which were already clipped
+                from `s` by the caller.
+        """
+        remaining = self._remaining
+        if len(s) > remaining:
+            if remaining > 0:
+                self._parts.append(s[:remaining])
+            clipped_chars += len(s) - max(remaining, 0)
+            self._remaining = 0
+        else:
+            self._parts.append(s)
+            self._remaining = remaining - len(s)
+        self.clipped_chars += clipped_chars
+
+    def write_repr(self, obj: Any) -> None:
+        cls = type(obj)
+        try:
+            func = _resolved_type_to_repr[cls]
+        except KeyError:
+            func = _resolved_type_to_repr[cls] = _resolve_type_repr(cls)
+
+        if func is None:
+            self.write(repr(obj))
+        else:
+            func(obj, self)
+
+    def write_items(
+        self,
+        obj: Any,
+        items: Iterable[Any],
+        write_item: Callable[[Any], None],
+        start: str,
+        end: str,
+    ) -> None:
+        """
+        Writes the items from a container (stops once the max size is reached).
+        """
+        obj_id = id(obj)
+        if obj_id in self._visiting:
+            self.write(f"{start}...{end}")
+            return
+
+        self._visiting.add(obj_id)
+        try:
+            self.write(start)
+            for i, item in enumerate(items):
+                if i:
+                    self.write(", ")
+                if self._remaining <= 0:
+                    self.exact = False
+                    return
+                write_item(item)
+            self.write(end)
+        finally:
+            self._visiting.discard(obj_id)
+
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+
+
+def _repr_str_or_bytes(obj: Union[str, bytes, bytearray], writer: _ReprWriter) -> None:
+    # Besides the quotes the repr has at least one char for each char in
+    # the object, so, it's enough to create the repr of the start.
+    max_len = writer.remaining + 1
+    if len(obj) <= max_len:
+        writer.write(repr(obj))
+    else:
+        # Note: the number of clipped chars assumes that the clipped part
+        # has no escaped chars.
+        writer.write(repr(obj[:max_len]), len(obj) - max_len)
+
+
+def _repr_list(obj: list, writer: _ReprWriter) -> None:
+    writer.write_items(obj, obj, writer.write_repr, "[", "]")
+
+
+def _repr_tuple(obj: tuple, writer: _ReprWriter) -> None:
+    if len(obj) == 1:
+        writer.write("(")
+        writer.write_repr(obj[0])
+        writer.write(",)")
+        return
+    writer.write_items(obj, obj, writer.write_repr, "(", ")")
+
+
+def _repr_set(obj: set, writer: _ReprWriter) -> None:
+    if not obj:
+        writer.write("set()")
+        return
+    writer.write_items(obj, obj, writer.write_repr, "{", "}")
+
+
+def _repr_frozenset(obj: frozenset, writer: _ReprWriter) -> None:
+    if not obj:
+        writer.write("frozenset()")
+        return
+    writer.write_items(obj, obj, writer.write_repr, "frozenset({", "})")
+
+
+def _repr_dict(obj: dict, writer: _ReprWriter) -> None:
+    write = writer.write
+    write_repr = writer.write_repr
+
+    def write_item(item):
+        write_repr(item[0])
+        write(": ")
+        write_repr(item[1])
+
+    writer.write_items(obj, obj.items(), write_item, "{", "}")
+
+
+def _repr_numpy_array(obj: Any, writer: _ReprWriter) -> None:
+    # numpy already summarizes big arrays, but the threshold may have been
+    # changed by the user (i.e.: to print all the values), so, make sure
+    # that a summary is used.
+    numpy = sys.modules["numpy"]
+    options = numpy.get_printoptions()
+    with numpy.printoptions(
+        threshold=min(options["threshold"], 1000),
+        edgeitems=min(options["edgeitems"], 3),
+    ):
+        writer.write(repr(obj))
+
+
+def _repr_pandas_object(obj: Any, writer: _ReprWriter) -> None:
+    # Same thing for pandas: the display options may have been changed by the
+    # user to show everything.
+    pandas = sys.modules["pandas"]
+
+    options = []
+    for name, max_value in (
+        ("display.max_rows", 60),
+        ("display.min_rows", 10),
+        ("display.max_columns", 20),
+        ("display.max_colwidth", 50),
+    ):
+        value = pandas.get_option(name)
+        options.append(name)
+        options.append(max_value if value is None else min(value, max_value))
+
+    with pandas.option_context(*options):
+        writer.write(repr(obj))
+
+
+_type_to_repr: Dict[type, Callable[[Any, _ReprWriter], None]] = {
+    str: _repr_str_or_bytes,
+    bytes: _repr_str_or_bytes,
+    bytearray: _repr_str_or_bytes,
+    list: _repr_list,
+    tuple: _repr_tuple,
+    set: _repr_set,
+    frozenset: _repr_frozenset,
+    dict: _repr_dict,
+}
+
+# Used for types from libraries which we don't want to import (only objects
+# whose type matches `<type.__module__>.<type.__qualname__>` are handled).
+_qualified_name_to_repr: Dict[str, Callable[[Any, _ReprWriter], None]] = {
+    "numpy.ndarray": _repr_numpy_array,
+    "pandas.core.frame.DataFrame": _repr_pandas_object,
+    "pandas.core.series.Series": _repr_pandas_object,
+}
+
+# Cache with the function resolved for a given type (None means that `repr` is
+# used).
+_resolved_type_to_repr: Dict[type, Optional[Callable[[Any, _ReprWriter], None]]] = {}
+
+
+def _resolve_type_repr(cls: type) -> Optional[Callable[[Any, _ReprWriter], None]]:
+    func = _type_to_repr.get(cls)
+    if func is None:
+        func = _qualified_name_to_repr.get(
+            f"{getattr(cls, '__module__', '')}.{getattr(cls, '__qualname__', '')}"
+        )
+    return func
+
+
+def register_type_repr(
+    cls: Union[type, str], func: Callable[[Any, _ReprWriter], None]
+) -> None:
+    """
+    Registers a function which writes the repr for objects of the given type
+    (subclasses aren't affected).
+
+    Args:
+        cls: The type or its qualified name (i.e.: `"numpy.ndarray"`).
+        func: A function which receives the object and the writer and
+            should call `writer.write(...)` (multiple times if possible, so
+            that it stops when `writer.full` is True) or `writer.write_repr(...)`
+            for inner objects.
+    """
+    if isinstance(cls, str):
+        _qualified_name_to_repr[cls] = func
+    else:
+        _type_to_repr[cls] = func
+    _resolved_type_to_repr.clear()
+
+
+def bounded_repr(obj: Any, max_size: int) -> str:
+    """
+    Provides the repr of the object with up to `max_size` chars (if the
+    repr is bigger it's clipped).
+    """
+    writer = _ReprWriter(max_size)
+    writer.write_repr(obj)
+    r = writer.getvalue()
+    if writer.clipped_chars or not writer.exact:
+        if writer.exact:
+            r = f"{r} <clipped {writer.clipped_chars} chars>"
+        else:
+            r = f"{r} <clipped>"
+    return r
+
+
+_ATOMIC_IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def _is_cacheable(obj: Any) -> bool:
+    cls = type(obj)
+    if cls is str or cls is bytes:
+        return len(obj) >= _MIN_LEN_TO_CACHE
+    if cls is tuple:
+        return len(obj) >= _MIN_LEN_TO_CACHE and all(
+            type(v) in _ATOMIC_IMMUTABLE_TYPES for v in obj
+        )
+    return False
+
+
+def get_obj_type_and_repr(
+    obj: Any, repr_cache: Optional[Dict[int, Tuple[Any, str, str]]] = None
+) -> Tuple[str, str]:
+    """
+    Args:
+        repr_cache: If given the repr of (big) immutable objects is cached
+            in it (this should be used while in the same frame, where the
+            same objects are usually logged multiple times).
+    """
+    cacheable = repr_cache is not None and _is_cacheable(obj)
+    if cacheable:
+        assert repr_cache is not None
+        cached = repr_cache.get(id(obj))
+        # Note: the object is kept in the cache so that the id can't be
+        # reused while in the cache.
+        if cached is not None and cached[0] is obj:
+            return cached[1], cached[2]
 
-def get_obj_type_and_repr(obj: Any) -> Tuple[str, str]:
     with suppress():
         # Anything called during a repr must be suppressed.
         try:
@@ -18,13 +315,13 @@ def get_obj_type_and_repr(obj: Any) -> Tuple[str, str]:
                 val_type = "<recursion error getting type>"
 
         try:
-            r = repr(obj)
+            r = bounded_repr(obj, _config._general_log_config.max_value_repr_size)
         except (Exception, RecursionError) as e:
             r = f"<error getting repr: {e}>"
 
-        max_size = _config._general_log_config.max_value_repr_size
-        if len(r) > max_size:
-            diff = len(r) - max_size
-            r = f"{r[:max_size]} <clipped {diff} chars>"
-
-        return val_type, r
+    if cacheable:
+        assert repr_cache is not None
+        if len(repr_cache) >= _MAX_REPR_CACHE_SIZE:
+            repr_cache.clear()
+        repr_cache[id(obj)] = (obj, val_type, r)
+    return val_type, r
@@ -0,0 +1,425 @@
+"""
+Aggregates the time spent in the functions which are auto-logged (a "profile
+view" of each task).
+
+The `ProfileAggregator` is a consumer of the callbacks in `_lifecycle_hooks`
+(so, only functions rewritten by the auto-logging are profiled) and it keeps a
+call tree in memory (with the number of calls, the cumulative time and the self
+time of each call path), the same information aggregated by function and the
+slowest calls (with the repr of their arguments).
+
+A summary with those is written when each task finishes.
+"""
+import heapq
+import itertools
+import json
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from ._stack_id import get_current_stack_id
+
+if TYPE_CHECKING:
+    from ._lifecycle_hooks import MethodLocation
+
+    # The location and the values of the arguments of a call.
+    _CallArgs = Tuple[MethodLocation, Tuple[Any, ...]]
+
+# The profilers currently registered.
+_profilers: Tuple["ProfileAggregator", ...] = ()
+_profilers_lock = threading.Lock()
+
+# Untracked generators are not profiled as there's no way to know when those
+# are suspended/resumed.
+_PROFILED_ELEMENT_TYPES = frozenset(("METHOD", "GENERATOR"))
+
+
+def _has_profilers() -> bool:
+    return bool(_profilers)
+
+
+class _CallNode:
+    __slots__ = "key source lineno calls total_time self_time children".split()
+
+    def __init__(self, key: Tuple[str, str], source: str, lineno: int):
+        # key is (libname, name)
+        self.key = key
+        self.source = source
+        self.lineno = lineno
+        self.calls = 0
+        self.total_time = 0.0
+        self.self_time = 0.0
+        self.children: Dict[Tuple[str, str], "_CallNode"] = {}
+
+    def get_child(self, key: Tuple[str, str], source: str, lineno: int) -> "_CallNode":
+        try:
+            return self.children[key]
+        except KeyError:
+            node = self.children[key] = _CallNode(key, source, lineno)
+            return node
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.key[1],
+            "libname": self.key[0],
+            "lineno": self.lineno,
+            "calls": self.calls,
+            "total_time": round(self.total_time, 6),
+            "self_time": round(self.self_time, 6),
+            "children": [
+                child.to_dict()
+                for child in sorted(
+                    self.children.values(), key=lambda n: n.total_time, reverse=True
+                )
+            ],
+        }
+
+
+class _FunctionStats:
+    __slots__ = "source lineno calls total_time self_time".split()
+
+    def __init__(self, source: str, lineno: int):
+        self.source = source
+        self.lineno = lineno
+        self.calls = 0
+        # Note: in recursive calls only the outermost call is added to the
+        # total time.
+        self.total_time = 0.0
+        self.self_time = 0.0
+
+
+class _Frame:
+    __slots__ = "node key start children_time args depth".split()
+
+    def __init__(
+        self,
+        node: _CallNode,
+        key: Tuple[str, str],
+        args: Optional["_CallArgs"],
+        depth: int,
+    ):
+        self.node = node
+        self.key = key
+        self.start = time.perf_counter()
+        self.children_time = 0.0
+        # Only available in the first segment of the call (i.e.: not when
+        # a generator is resumed).
+        self.args = args
+        self.depth = depth
+
+
+class ProfileAggregator:
+    """
+    Collects the time spent in each function which is auto-logged.
+
+    Args:
+        on_task_profile: Called as `on_task_profile(summary)` when a task
+            finishes (where summary is a dict which can be dumped as json).
+        max_slowest_calls: The number of slowest calls to be kept.
+        max_depth: The maximum depth of the call tree (calls which are deeper
+            are accounted in the node at the max depth).
+    """
+
+    def __init__(
+        self,
+        on_task_profile: Callable[[dict], Any],
+        max_slowest_calls: int = 10,
+        max_depth: int = 30,
+    ) -> None:
+        self._on_task_profile = on_task_profile
+        self._max_slowest_calls = max_slowest_calls
+        self._max_depth = max_depth
+
+        # Each thread (or asyncio task) has its own stack.
+        self._stack_var: ContextVar[Optional[Tuple[int, List[_Frame]]]]
+        self._stack_var = ContextVar("robocorp_log_profile_stack", default=None)
+
+        self._lock = threading.Lock()
+        # Set while computing the repr of arguments (which may call
+        # auto-logged functions which must not be profiled).
+        self._in_args_repr = threading.local()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._root = _CallNode(("", ""), "", 0)
+        self._functions: Dict[Tuple[str, str], _FunctionStats] = {}
+        # function key -> number of active calls (to deal with recursion).
+        self._active: Dict[Tuple[str, str], int] = {}
+        # heap with (time, counter, call info).
+        self._slowest: List[Tuple[float, int, dict]] = []
+        self._next_counter = itertools.count()
+        self._start_time = time.perf_counter()
+
+    @property
+    def _stack(self) -> List[_Frame]:
+        stack_id = get_current_stack_id()
+        stack_id_and_stack = self._stack_var.get()
+        if stack_id_and_stack is not None and stack_id_and_stack[0] == stack_id:
+            return stack_id_and_stack[1]
+
+        stack: List[_Frame] = []
+        self._stack_var.set((stack_id, stack))
+        return stack
+
+    def register(self) -> None:
+        global _profilers
+        from . import _lifecycle_hooks
+
+        _lifecycle_hooks.before_method.register(self._before_method)
+        _lifecycle_hooks.after_method.register(self._after_method)
+        _lifecycle_hooks.before_yield.register(self._before_suspend)
+        _lifecycle_hooks.after_yield.register(self._after_resume)
+        _lifecycle_hooks.before_yield_from.register(self._before_suspend)
+        _lifecycle_hooks.after_yield_from.register(self._after_resume)
+        _lifecycle_hooks.before_await.register(self._before_suspend)
+        _lifecycle_hooks.after_await.register(self._after_resume)
+
+        with _profilers_lock:
+            _profilers = _profilers + (self,)
+        _lifecycle_hooks.update_enabled()
+
+    def unregister(self) -> None:
+        global _profilers
+        from . import _lifecycle_hooks
+
+        _lifecycle_hooks.before_method.unregister(self._before_method)
+        _lifecycle_hooks.after_method.unregister(self._after_method)
+        _lifecycle_hooks.before_yield.unregister(self._before_suspend)
+        _lifecycle_hooks.after_yield.unregister(self._after_resume)
+        _lifecycle_hooks.before_yield_from.unregister(self._before_suspend)
+        _lifecycle_hooks.after_yield_from.unregister(self._after_resume)
+        _lifecycle_hooks.before_await.unregister(self._before_suspend)
+        _lifecycle_hooks.after_await.unregister(self._after_resume)
+
+        with _profilers_lock:
+            _profilers = tuple(p for p in _profilers if p is not self)
+        _lifecycle_hooks.update_enabled()
+
+    def _push(
+        self,
+        mod_name: str,
+        filename: str,
+        name: str,
+        lineno: int,
+        args: Optional["_CallArgs"],
+    ) -> None:
+        if getattr(self._in_args_repr, "active", False):
+            return
+
+        stack = self._stack
+        key = (mod_name, name)
+        with self._lock:
+            if stack:
+                parent = stack[-1]
+                depth = parent.depth + 1
+                if depth > self._max_depth:
+                    # Too deep: accounted in the parent.
+                    stack.append(_Frame(parent.node, key, None, depth))
+                    return
+                node = parent.node.get_child(key, filename, lineno)
+            else:
+                depth = 1
+                node = self._root.get_child(key, filename, lineno)
+
+            if args is not None:
+                node.calls += 1
+                stats = self._functions.get(key)
+                if stats is None:
+                    stats = self._functions[key] = _FunctionStats(filename, lineno)
+                stats.calls += 1
+            self._active[key] = self._active.get(key, 0) + 1
+
+        stack.append(_Frame(node, key, args, depth))
+
+    def _pop(self, mod_name: str, name: str) -> None:
+        if getattr(self._in_args_repr, "active", False):
+            return
+
+        stack = self._stack
+        key = (mod_name, name)
+        for frame in reversed(stack):
+            if frame.key == key:
+                break
+        else:
+            # i.e.: the call started before the profiler was registered.
+            return
+
+        # Note: if the stack is unsynchronized (i.e.: the end of some inner
+        # call was not received) the inner calls are also finished.
+        while True:
+            frame = stack.pop()
+            elapsed = time.perf_counter() - frame.start
+            if frame.depth <= self._max_depth:
+                if stack:
+                    stack[-1].children_time += elapsed
+                self._add_time(frame, elapsed)
+            if frame.key == key:
+                return
+
+    def _add_time(self, frame: _Frame, elapsed: float) -> None:
+        key = frame.key
+        node = frame.node
+        self_time = elapsed - frame.children_time
+
+        with self._lock:
+            node.total_time += elapsed
+            node.self_time += self_time
+
+            active = self._active.get(key, 1) - 1
+            self._active[key] = active
+
+            stats = self._functions.get(key)
+            if stats is not None:
+                stats.self_time += self_time
+                if active == 0:
+                    stats.total_time += elapsed
+
+            args = frame.args
+            if args is None:
+                return
+
+            slowest = self._slowest
+            if len(slowest) >= self._max_slowest_calls:
+                if not slowest or elapsed <= slowest[0][0]:
+                    return
+
+        # Note: the repr of the arguments may run user code (which may even
+        # call auto-logged functions), so, the lock must not be held.
+        self._in_args_repr.active = True
+        try:
+            args_repr = _get_args_repr(*args)
+        finally:
+            self._in_args_repr.active = False
+
+        call_info = {
+            "name": key[1],
+            "libname": key[0],
+            "source": node.source,
+            "lineno": node.lineno,
+            "time": round(elapsed, 6),
+            "args": args_repr,
+        }
+
+        with self._lock:
+            if slowest is not self._slowest:
+                return  # The task finished in the meanwhile.
+
+            entry = (elapsed, next(self._next_counter), call_info)
+            if len(slowest) >= self._max_slowest_calls:
+                if elapsed <= slowest[0][0]:
+                    return
+                heapq.heapreplace(slowest, entry)
+            else:
+                heapq.heappush(slowest, entry)
+
+    # --- Callbacks from _lifecycle_hooks
+
+    def _before_method(
+        self, location: "MethodLocation", arg_values: Tuple[Any, ...]
+    ) -> None:
+        if location.log_element_type in _PROFILED_ELEMENT_TYPES:
+            self._push(
+                location.mod_name,
+                location.filename,
+                location.name,
+                location.lineno,
+                (location, arg_values),
+            )
+
+    def _after_method(
+        self,
+        log_element_type: str,
+        mod_name: str,
+        filename: str,
+        name: str,
+        lineno: int,
+    ) -> None:
+        if log_element_type in _PROFILED_ELEMENT_TYPES:
+            self._pop(mod_name, name)
+
+    def _before_suspend(
+        self, mod_name: str, filename: str, name: str, lineno: int, *args
+    ) -> None:
+        self._pop(mod_name, name)
+
+    def _after_resume(
+        self, mod_name: str, filename: str, name: str, lineno: int
+    ) -> None:
+        self._push(mod_name, filename, name, lineno, None)
+
+    # --- Task handling
+
+    def start_task(self, name: str, libname: str) -> None:
+        with self._lock:
+            self._reset()
+
+    def end_task(self, name: str, libname: str, status: str) -> None:
+        with self._lock:
+            summary = self._create_summary(name, libname, status)
+            self._reset()
+        self._on_task_profile(summary)
+
+    def _create_summary(self, name: str, libname: str, status: str) -> dict:
+        functions = []
+        for key, stats in sorted(
+            self._functions.items(), key=lambda item: item[1].self_time, reverse=True
+        ):
+            functions.append(
+                {
+                    "name": key[1],
+                    "libname": key[0],
+                    "source": stats.source,
+                    "lineno": stats.lineno,
+                    "calls": stats.calls,
+                    "total_time": round(stats.total_time, 6),
+                    "self_time": round(stats.self_time, 6),
+                }
+            )
+
+        return {
+            "task": {"name": name, "libname": libname, "status": status},
+            "total_time": round(time.perf_counter() - self._start_time, 6),
+            "functions": functions,
+            "call_tree": self._root.to_dict()["children"],
+            "slowest_calls": [
+                call_info
+                for _time, _i, call_info in sorted(self._slowest, reverse=True)
+            ],
+        }
+
+
+def _get_args_repr(
+    location: "MethodLocation", arg_values: Tuple[Any, ...]
+) -> List[Tuple[str, str, str]]:
+    from ._obj_info_repr import get_obj_type_and_repr
+
+    ret = []
+    for key, val, sensitive in zip(
+        location.arg_names, arg_values, location.get_sensitive_args()
+    ):
+        obj_type, obj_repr = get_obj_type_and_repr(val)
+        if sensitive:
+            obj_repr = "<redacted>"
+        ret.append((key, obj_type, obj_repr))
+    return ret
+
+
+_INVALID_FILENAME_CHARS = re.compile(r"[^\w.-]+")
+
+
+def write_task_profile(output_dir: Path, summary: dict) -> Path:
+    """
+    Writes the summary to `<output_dir>/<libname>.<task name>.profile.json`.
+
+    Returns:
+        The path written.
+    """
+    task = summary["task"]
+    basename = _INVALID_FILENAME_CHARS.sub("_", f"{task['libname']}.{task['name']}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    target = output_dir / f"{basename}.profile.json"
+    target.write_text(json.dumps(summary, separators=(",", ":")), "utf-8")
+    return target
@@ -1,6 +1,6 @@
 import ast
 import types
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union, Literal
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, Union
 
 from ._ast_utils import ASTRewriter
 from ._config import AutoLogConfigBase, FilterKind
@@ -32,16 +32,15 @@ def _make_import_aliases_ast(lineno, filter_kind: FilterKind):
     return imports
 
 
-def _get_function_and_class_name(stack) -> Optional[Tuple[ast.FunctionDef, str]]:
+_FunctionDef = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+
+def _get_function_and_class_name(stack) -> Optional[Tuple[_FunctionDef, str]]:
     if not stack:
         return None
     stack_it = reversed(stack)
     for function in stack_it:
-        funcname = function.__class__.__name__
-        if funcname != "FunctionDef":
-            if funcname == "AsyncFunctionDef":
-                # We don't rewrite 'AsyncFunctionDef'
-                return None
+        if not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
             continue
         break
     else:
@@ -105,6 +104,19 @@ def _make_after_yield_from_expr(factory, function, class_name, node_lineno) -> a
     )
 
 
+def _make_await_expr(factory, func_name, function, class_name, node_lineno) -> ast.Expr:
+    return factory.Expr(
+        _make_func_with_args(
+            factory,
+            func_name,
+            factory.NameLoad("__name__"),
+            factory.NameLoad("__file__"),
+            factory.Str(f"{class_name}{function.name}"),
+            factory.LineConstantAt(node_lineno),
+        )
+    )
+
+
 _EMPTY_LIST: list = []
 
 
@@ -118,44 +130,51 @@ def _create_method_with_stmt(
     function_body: List[ast.stmt],
 ) -> ast.With:
     # Target code:
+    # @method_location_0 = MethodLocation('METHOD', __name__, __file__, "method_name", 11, ('a', 'b'))
+    # ...
     # def method(a, b):
-    #     with MethodLifecycleContextCallerInProject(__name, __file__, "method_name", 11, {'a': a, 'b': b}) as ctx:
+    #     with MethodLifecycleContextCallerInProject(@method_location_0, (a, b)) as ctx:
     #         ...
+    # (the location is created just once at the module level).
     if filter_kind == FilterKind.log_on_project_call:
         name = "MethodLifecycleContextCallerInProject"
     else:
         name = "MethodLifecycleContext"
 
-    call = factory.Call(factory.NameLoadRewriteCallback(name))
-
-    tup_elts = [
-        factory.Str(log_method_type),
-        factory.NameLoad("__name__"),
-        factory.NameLoad("__file__"),
-        factory.Str(f"{class_name}{function.name}"),
-        factory.LineConstantAt(function.lineno),
-    ]
-
-    dct = factory.Dict()
-    keys: list[Union[ast.expr, None]] = []
-    values: list[ast.expr] = []
+    arg_names: List[ast.expr] = []
+    arg_values: List[ast.expr] = []
     for arg in function.args.args:
         if class_name and arg.arg == "self":
             continue
-        keys.append(factory.Str(arg.arg))
-        values.append(factory.NameLoad(arg.arg))
+        arg_names.append(factory.Str(arg.arg))
+        arg_values.append(factory.NameLoad(arg.arg))
 
     if function.args.vararg:
-        keys.append(factory.Str(function.args.vararg.arg))
-        values.append(factory.NameLoad(function.args.vararg.arg))
+        arg_names.append(factory.Str(function.args.vararg.arg))
+        arg_values.append(factory.NameLoad(function.args.vararg.arg))
 
     if function.args.kwarg:
-        keys.append(factory.Str(function.args.kwarg.arg))
-        values.append(factory.NameLoad(function.args.kwarg.arg))
-    dct.keys = keys
-    dct.values = values
-    tup_elts.append(dct)
-    call.args.append(factory.Tuple(*tup_elts))
+        arg_names.append(factory.Str(function.args.kwarg.arg))
+        arg_values.append(factory.NameLoad(function.args.kwarg.arg))
+
+    location = factory.Call(factory.NameLoadRewriteCallback("MethodLocation"))
+    location.args.extend(
+        [
+            factory.Str(log_method_type),
+            factory.NameLoad("__name__"),
+            factory.NameLoad("__file__"),
+            factory.Str(f"{class_name}{function.name}"),
+            factory.LineConstantAt(function.lineno),
+            factory.Tuple(*arg_names),
+        ]
+    )
+    location_name = rewrite_ctx.add_module_level_assign(
+        factory, "method_location", location
+    )
+
+    call = factory.Call(factory.NameLoadRewriteCallback(name))
+    call.args.append(factory.NameLoad(location_name))
+    call.args.append(factory.Tuple(*arg_values))
 
     with_stmt = factory.WithStmt(
         items=[
@@ -183,7 +202,7 @@ AcceptedCases = Literal[
 
 
 def _accept_function_rewrite(
-    function: ast.FunctionDef,
+    function: _FunctionDef,
     rewrite_ctx,
     filter_kind,
     cases: Tuple[AcceptedCases, ...],
@@ -213,11 +232,18 @@ def _accept_function_rewrite(
                 # Don't rewrite untracked generators.
                 return False
 
+        if isinstance(function, ast.AsyncFunctionDef):
+            if rewrite_ctx.has_yield_in_expression(function):
+                # In async generators a `yield` inside an expression can't be
+                # rewritten (as it'd need a `yield from`, which isn't
+                # available in async generators).
+                return False
+
     return True
 
 
 def _rewrite_funcdef(
-    rewrite_ctx: ASTRewriter, stack, function: ast.FunctionDef, filter_kind
+    rewrite_ctx: ASTRewriter, stack, function: _FunctionDef, filter_kind
 ) -> None:
     parent: Any
     # Only rewrite functions which actually have some content.
@@ -278,7 +304,47 @@ def _rewrite_funcdef(
         function_body,
     )
 
-    function.body = function_body_prefix + [with_stmt]
+    original_body = rewrite_ctx.pop_original_body(function)
+    if not original_body:
+        function.body = function_body_prefix + [with_stmt]
+        return
+
+    # Target code:
+    # def method(a, b):
+    #     if @robo_lifecycle_hooks.enabled:
+    #         with MethodLifecycleContext(...) as ctx:
+    #             ...
+    #     else:
+    #         ... original code (without any hooks)
+    if_stmt = factory.If(factory.NameLoadRewriteCallback("enabled"))
+    if_stmt.body = [with_stmt]
+    if_stmt.orelse = _remove_scope_declarations(
+        original_body[first_non_constant_stmt_index:]
+    )
+    function.body = function_body_prefix + [if_stmt]
+
+
+def _remove_scope_declarations(body: List[ast.stmt]) -> List[ast.stmt]:
+    # The `global` / `nonlocal` declarations are already in the instrumented
+    # code (which comes first), so, they must not be repeated (as it'd be a
+    # SyntaxError to declare it after the name is used).
+    for node in ast.walk(ast.Module(body=body, type_ignores=[])):
+        for _field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                for i, stmt in enumerate(value):
+                    if isinstance(stmt, (ast.Global, ast.Nonlocal)):
+                        value[i] = ast.copy_location(ast.Pass(), stmt)
+    return body
+
+
+def _has_nested_scope(function: _FunctionDef) -> bool:
+    for stmt in function.body:
+        for node in ast.walk(stmt):
+            if isinstance(
+                node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+            ):
+                return True
+    return False
 
 
 def rewrite_ast_add_callbacks(
@@ -323,7 +389,10 @@ def rewrite_ast_add_callbacks(
         pos += 1
     # Special case: for a decorated function, set the lineno to that of the
     # first decorator, not the `def`. Issue #4984.
-    if isinstance(item, ast.FunctionDef) and item.decorator_list:
+    if (
+        isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and item.decorator_list
+    ):
         lineno = item.decorator_list[0].lineno
     else:
         lineno = item.lineno
@@ -370,6 +439,10 @@ def rewrite_ast_add_callbacks(
                 if result is not None:
                     rewrite_ctx.cursor.current = result
 
+    if rewrite_ctx.module_level_stmts:
+        pos = mod.body.index(imports[-1]) + 1
+        mod.body[pos:pos] = rewrite_ctx.module_level_stmts
+
     if DEBUG:
         print("\n============ New AST (with hooks in place) ==============\n")
         # Note: only python 3.9 onwards.
@@ -380,7 +453,7 @@ def _handle_funcdef(
     rewrite_ctx: ASTRewriter, config, module_path, stack, filter_kind, node
 ):
     try:
-        function: ast.FunctionDef = node
+        function: _FunctionDef = node
         if not _accept_function_rewrite(
             function,
             rewrite_ctx,
@@ -401,6 +474,31 @@ def _handle_funcdef(
         )
 
 
+def _handle_before_funcdef(
+    rewrite_ctx: ASTRewriter, config, module_path, stack, filter_kind, node
+):
+    function: _FunctionDef = node
+    if not _accept_function_rewrite(
+        function,
+        rewrite_ctx,
+        filter_kind,
+        cases=(
+            "full_log",
+            "log_on_project_call",
+            "untracked_generator",
+            "generator",
+        ),
+    ):
+        return
+
+    # Functions with nested scopes (i.e.: inner functions or classes) are
+    # always run with the hooks because the inner scopes must also be
+    # rewritten (and they could escape the call which created them).
+    if not _has_nested_scope(function):
+        # Keep a copy of the code to be run when the hooks are disabled.
+        rewrite_ctx.save_original_body(function)
+
+
 def _handle_return(
     rewrite_ctx: ASTRewriter, config, module_path, stack, filter_kind, node
 ):
@@ -603,7 +701,7 @@ def _collect_names(target):
 
 def _accept_generator_full_log(
     rewrite_ctx: ASTRewriter, stack, filter_kind: FilterKind
-) -> Optional[Tuple[ast.FunctionDef, str]]:
+) -> Optional[Tuple[_FunctionDef, str]]:
     """
     If it's accepted returns the function and class name, otherwise
     returns None.
@@ -667,7 +765,7 @@ def _handle_for_or_while(
     module_path,
     stack,
     filter_kind,
-    node: Union[ast.For, ast.While],
+    node: Union[ast.For, ast.AsyncFor, ast.While],
 ):
     func_and_class_name = _get_function_and_class_name(stack)
     if not func_and_class_name:
@@ -695,11 +793,12 @@ def _handle_for_or_while(
         stmts_cursor = rewrite_ctx.stmts_cursor
 
         stmt_name: str
-        if isinstance(node, ast.For):
+        if isinstance(node, (ast.For, ast.AsyncFor)):
             iter_desc = ast.unparse(node.iter)
             collect_names_from_node = node.target
             target_desc = ast.unparse(node.target)
-            name_str = factory.Str(f"for {target_desc} in {iter_desc}")
+            prefix = "async for" if isinstance(node, ast.AsyncFor) else "for"
+            name_str = factory.Str(f"{prefix} {target_desc} in {iter_desc}")
             stmt_name = "for"
 
         elif isinstance(node, ast.While):
@@ -715,7 +814,7 @@ def _handle_for_or_while(
         # With a FOR we want to generate something as:
         #
         # @ctx.report_for_start(1, ("FOR", __name__, "filename", "for a in range(2)", 2))
-        # for a in b:
+        # for a in @ctx.report_for_iter(1, b):
         #     @ctx.report_for_step_start(2, ("FOR_STEP", __name__, "filename", "for a in range(2)", 2), [('a', a)])
         #     print(a)
         #     @ctx.report_for_step_end(2)
@@ -750,6 +849,14 @@ def _handle_for_or_while(
         call.args.append(factory.IntConstant(for_id))
         stmts_cursor.after_append(factory.Expr(call))
 
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            # The iterable is passed on so that the number of iterations
+            # can be known in advance (used in the loop log policies).
+            call = factory.Call(factory.NameLoadCtx("report_for_iter"))
+            call.args.append(factory.IntConstant(for_id))
+            call.args.append(node.iter)
+            node.iter = call
+
         body = node.body
         if body:
             first_stmt = body[0]
@@ -996,6 +1103,90 @@ def _handle_yield(
         )
 
 
+# Statements where an `await` can be rewritten (the awaited value is the first
+# thing computed when running the statement).
+_AWAIT_REWRITE_PARENTS = (ast.Expr, ast.Assign, ast.AnnAssign, ast.Return)
+
+
+def _handle_await(
+    rewrite_ctx: ASTRewriter,
+    config,
+    module_path,
+    stack,
+    filter_kind,
+    node: ast.Await,
+):
+    func_and_class_name = _get_function_and_class_name(stack)
+    if not func_and_class_name:
+        return None
+
+    function, class_name = func_and_class_name
+    if not _accept_function_rewrite(
+        function, rewrite_ctx, filter_kind, cases=("full_log", "generator")
+    ):
+        return None
+
+    await_cursor = rewrite_ctx.cursor
+    parent = await_cursor.parent
+    if not isinstance(parent, _AWAIT_REWRITE_PARENTS) or parent.value is not node:
+        # i.e.: something as `call(await a, await b)`: it'd change the order
+        # in which things are computed.
+        return None
+
+    for ancestor in reversed(stack):
+        if ancestor is function:
+            break
+        if isinstance(ancestor, (ast.For, ast.AsyncFor, ast.While)):
+            # Loops are tracked in the stack (so, the method can't just be
+            # suspended/resumed inside a loop).
+            return None
+
+    try:
+        # Something as:
+        #
+        # a = await call()
+        #
+        # becomes:
+        #
+        # before_await(...)
+        # try:
+        #     @tmp_0 = await call()
+        # finally:
+        #     after_await(...)
+        # a = @tmp_0
+        #
+        # (if it's just `await call()` the statement itself is put in the try).
+        factory = rewrite_ctx.NodeFactory(node.lineno, node.col_offset)
+        stmts_cursor = rewrite_ctx.stmts_cursor
+
+        try_body: List[ast.stmt]
+        if isinstance(parent, ast.Expr):
+            try_body = [parent]
+            stmts_cursor.current = []
+        else:
+            store_name = factory.NameTempStore()
+            try_body = [factory.Assign(targets=[store_name], value=node)]
+            await_cursor.current = factory.NameLoad(store_name.id)
+
+        stmts_cursor.before_append(
+            _make_await_expr(factory, "before_await", function, class_name, node.lineno)
+        )
+        stmts_cursor.before_append(
+            factory.TryFinally(
+                try_body,
+                [
+                    _make_await_expr(
+                        factory, "after_await", function, class_name, node.lineno
+                    )
+                ],
+            )
+        )
+    except Exception:
+        raise RuntimeError(
+            f"Error when rewriting await: {function.name} line: {node.lineno} at: {module_path}"
+        )
+
+
 _dispatch_before: Dict[
     type,
     Callable[
@@ -1013,11 +1204,16 @@ _dispatch_after: Dict[
 _dispatch_after[ast.Return] = _handle_return
 _dispatch_after[ast.Assign] = _handle_assign
 _dispatch_after[ast.FunctionDef] = _handle_funcdef
+_dispatch_after[ast.AsyncFunctionDef] = _handle_funcdef
 _dispatch_after[ast.Yield] = _handle_yield
 _dispatch_after[ast.YieldFrom] = _handle_yield
 _dispatch_after[ast.For] = _handle_for_or_while
+_dispatch_after[ast.AsyncFor] = _handle_for_or_while
 _dispatch_after[ast.While] = _handle_for_or_while
 _dispatch_after[ast.If] = _handle_if
+_dispatch_after[ast.Await] = _handle_await
 
+_dispatch_before[ast.FunctionDef] = _handle_before_funcdef
+_dispatch_before[ast.AsyncFunctionDef] = _handle_before_funcdef
 # Note: returns generator which is called when it finishes (right before _dispatch_after)
 _dispatch_before[ast.Try] = _handle_before_try
@@ -0,0 +1,310 @@
+"""
+Shared cache for the code rewritten by the auto-logging import hook.
+
+The rewritten code is usually cached alongside the source in `__pycache__`,
+but when that's not possible (i.e.: the `site-packages` is read-only) every
+module would need to be parsed and rewritten again on each run.
+
+This cache is stored in a user-level directory and each entry is keyed by a
+hash of the source contents, its filename, the filter kind, the settings of
+the config which change the rewritten code and the version of the rewrite
+(so, entries never need to be invalidated, old entries are just evicted based
+on the last time they were used when the cache is bigger than its max size).
+"""
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+import types
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ._config import AutoLogConfigBase, FilterKind
+from ._rewrite_importhook import NAME_WITH_TAG, trace, try_makedirs
+
+DEFAULT_MAX_SIZE = "200MB"
+
+# When evicting, entries are removed until the size is below this ratio of
+# the max size (so that evicting isn't needed again right away).
+_EVICT_TO_RATIO = 0.8
+
+
+def get_default_cache_dir() -> Path:
+    """
+    Returns:
+        The directory where the rewritten code is cached (may be customized
+        with the `RC_LOG_REWRITE_CACHE_DIR` environment variable).
+    """
+    cache_dir = os.environ.get("RC_LOG_REWRITE_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return Path(base) / "robocorp" / "log_rewrite_cache"
+
+
+def get_default_rewrite_cache() -> Optional["RewriteCache"]:
+    """
+    Returns:
+        The cache to be used by default or None if it's disabled (by setting
+        the `RC_LOG_REWRITE_CACHE_MAX_SIZE` environment variable to `0`).
+    """
+    from ._convert_units import _convert_to_bytes
+
+    max_size_str = os.environ.get("RC_LOG_REWRITE_CACHE_MAX_SIZE", DEFAULT_MAX_SIZE)
+    try:
+        max_size = _convert_to_bytes(max_size_str)
+    except ValueError:
+        trace(f"Invalid RC_LOG_REWRITE_CACHE_MAX_SIZE: {max_size_str}")
+        max_size = _convert_to_bytes(DEFAULT_MAX_SIZE)
+
+    if max_size <= 0:
+        return None
+    return RewriteCache(get_default_cache_dir(), max_size)
+
+
+class RewriteCache:
+    """
+    Content-addressed cache for rewritten code objects.
+
+    Writes are atomic (the contents are written to a temporary file which is
+    then renamed), so, it's safe to share it among multiple processes.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._writable: Optional[bool] = None
+        # The first write in the process always checks the cache size.
+        self._bytes_written_since_evict: Optional[int] = None
+
+    def compute_key(
+        self,
+        source: bytes,
+        filename: str,
+        filter_kind: FilterKind,
+        config: AutoLogConfigBase,
+    ) -> str:
+        from robocorp.log import __version__
+
+        h = hashlib.sha256()
+        header = "\0".join(
+            (
+                NAME_WITH_TAG,
+                __version__,
+                filter_kind.value,
+                config.get_rewrite_cache_key(),
+                filename,
+                # The code is compiled with the optimization level of the
+                # interpreter (i.e.: `python -O` strips the asserts).
+                str(sys.flags.optimize),
+            )
+        )
+        h.update(header.encode("utf-8", "surrogateescape"))
+        h.update(b"\0")
+        h.update(source)
+        return h.hexdigest()
+
+    def _get_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key[2:]}.pyc"
+
+    def get(self, key: str) -> Optional[types.CodeType]:
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as stream:
+                contents = stream.read()
+        except OSError:
+            return None
+
+        magic = importlib.util.MAGIC_NUMBER
+        if contents[: len(magic)] != magic:
+            trace(f"RewriteCache: invalid entry (bad magic number): {path}")
+            return None
+        try:
+            co = marshal.loads(contents[len(magic) :])
+        except Exception as e:
+            trace(f"RewriteCache: marshal.loads error {e}: {path}")
+            return None
+        if not isinstance(co, types.CodeType):
+            trace(f"RewriteCache: not a code object: {path}")
+            return None
+
+        # Update the mtime so that the entries used recently are the last
+        # ones to be evicted.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return co
+
+    def put(self, key: str, co: types.CodeType) -> bool:
+        if self._writable is None:
+            self._writable = try_makedirs(self.cache_dir)
+        if not self._writable:
+            return False
+
+        path = self._get_path(key)
+        if not try_makedirs(path.parent):
+            return False
+
+        contents = importlib.util.MAGIC_NUMBER + marshal.dumps(co)
+        tmp_path = f"{path}.{os.getpid()}"
+        try:
+            with open(tmp_path, "wb") as stream:
+                stream.write(contents)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            trace(f"RewriteCache: error writing {path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+        if self._bytes_written_since_evict is not None:
+            self._bytes_written_since_evict += len(contents)
+            if self._bytes_written_since_evict < self.max_size * 0.1:
+                return True
+        self._bytes_written_since_evict = 0
+        self.evict()
+        return True
+
+    def _list_entries(self) -> List[Tuple[float, int, str]]:
+        entries: List[Tuple[float, int, str]] = []
+        try:
+            subdirs = list(os.scandir(self.cache_dir))
+        except OSError:
+            return entries
+
+        for subdir in subdirs:
+            if not subdir.is_dir():
+                continue
+            try:
+                for entry in os.scandir(subdir.path):
+                    if entry.name.endswith(".pyc"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                continue
+        return entries
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used entries if the cache is bigger than
+        its max size.
+
+        Returns:
+            The number of entries removed.
+        """
+        entries = self._list_entries()
+        total_size = sum(size for _mtime, size, _path in entries)
+        if total_size <= self.max_size:
+            return 0
+
+        target_size = self.max_size * _EVICT_TO_RATIO
+        removed = 0
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total_size <= target_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # i.e.: it may have been removed by another process or may be
+                # in use on Windows.
+                continue
+            total_size -= size
+            removed += 1
+        return removed
+
+
+def iter_modules_to_rewrite(
+    config: AutoLogConfigBase, paths: Sequence[str]
+) -> Iterator[Tuple[str, Path, FilterKind]]:
+    """
+    Provides the modules which would be rewritten by the import hook if
+    imported from the given paths (the module found first is used when the
+    same module is available in multiple paths, as done by the import).
+
+    Returns:
+        An iterator with the module name, the filename and the filter kind.
+    """
+    found: Set[str] = set()
+    for entry in paths:
+        root = entry or os.getcwd()
+        if not os.path.isdir(root):
+            continue
+
+        for dirpath, dirnames, filenames in os.walk(root):
+            relative = os.path.relpath(dirpath, root)
+            package_parts = [] if relative == "." else relative.split(os.sep)
+
+            # Only walk into directories which could be packages.
+            dirnames[:] = sorted(
+                d for d in dirnames if d.isidentifier() and d != "__pycache__"
+            )
+
+            for filename in sorted(filenames):
+                if not filename.endswith(".py"):
+                    continue
+                name = filename[:-3]
+                if name == "__init__":
+                    if not package_parts:
+                        continue
+                    module_name = ".".join(package_parts)
+                elif name.isidentifier():
+                    module_name = ".".join(package_parts + [name])
+                else:
+                    continue
+
+                if module_name in found:
+                    continue
+                found.add(module_name)
+
+                path = Path(dirpath) / filename
+                filter_kind = config.get_filter_kind_by_module_name(module_name)
+                if filter_kind is None:
+                    filter_kind = config.get_filter_kind_by_module_name_and_path(
+                        module_name, str(path)
+                    )
+                if filter_kind != FilterKind.exclude:
+                    yield module_name, path, filter_kind
+
+
+def prewarm(
+    rewrite_cache: RewriteCache,
+    config: AutoLogConfigBase,
+    paths: Sequence[str],
+    on_error: Optional[Callable[[Path, Exception], None]] = None,
+) -> int:
+    """
+    Rewrites the modules which would be rewritten by the import hook (if
+    imported from the given paths) and stores them in the cache.
+
+    Returns:
+        The number of modules whose rewritten code is in the cache.
+    """
+    from ._rewrite_importhook import _rewrite_source
+
+    count = 0
+    for _module_name, path, filter_kind in iter_modules_to_rewrite(config, paths):
+        try:
+            source = path.read_bytes()
+            key = rewrite_cache.compute_key(source, str(path), filter_kind, config)
+            if rewrite_cache.get(key) is None:
+                co, _tree = _rewrite_source(path, source, config, filter_kind)
+                if not rewrite_cache.put(key, co):
+                    continue
+        except Exception as e:
+            # i.e.: files with syntax errors or which can't be read.
+            if on_error is not None:
+                on_error(path, e)
+            continue
+        count += 1
+    return count
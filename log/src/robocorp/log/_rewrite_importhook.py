@@ -30,12 +30,28 @@ import marshal
 import os
 import struct
 import sys
+import time
 import types
 from pathlib import Path
-from typing import IO, Callable, Dict, Optional, Sequence, Tuple, Union
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from ._config import AutoLogConfigBase, FilterKind
 
+if TYPE_CHECKING:
+    from ._rewrite_cache import RewriteCache
+
 # caches rewritten pycs in pycache dirs
 # 0.0.1: Initial version
 # 0.0.2: Bugfix: docstrings must be kept as the first statement
@@ -56,7 +72,11 @@ from ._config import AutoLogConfigBase, FilterKind
 # 0.0.18: Fixes in generation based on scoping (generator/untracked_generator,full_log,log_on_project_call).
 # 0.0.19: Fixed return with log_on_project_call.
 # 0.0.20: Fixed line numbers
-version = "0.0.20"
+# 0.0.21: Report the iterable of for statements.
+# 0.0.22: Run the original code when `_lifecycle_hooks.enabled` is False.
+# 0.0.23: Rewrite `async def` (and `await` / `async for`).
+# 0.0.24: The constant parts of function calls are in a module level `MethodLocation`.
+version = "0.0.24"
 NAME_WITH_TAG = f"{sys.implementation.cache_tag}-log-{version}"
 PYC_EXT = ".py" + (__debug__ and "c" or "o")
 PYC_TAIL = "." + NAME_WITH_TAG + PYC_EXT
@@ -76,15 +96,70 @@ else:
         pass
 
 
+CodeSource = Literal["pycache", "shared_cache", "rewrite"]
+
+
+class ModuleImportStats(NamedTuple):
+    module_name: str
+    filter_kind: FilterKind
+    # Where the code was obtained from.
+    code_source: CodeSource
+    # Time (in seconds) to obtain the code (without executing it).
+    load_time: float
+
+
+class ImportStats:
+    """
+    Collects how much time the import hook adds to the imports (shown in the
+    stderr when the auto-logging is finished if the `RC_LOG_REWRITE_STATS`
+    environment variable is set).
+    """
+
+    def __init__(self) -> None:
+        # Note: `find_spec` is called for every import done in the process.
+        self.find_spec_calls = 0
+        self.find_spec_time = 0.0
+        self.modules: List[ModuleImportStats] = []
+
+    def get_report(self, max_modules: int = 20) -> str:
+        load_time = sum(m.load_time for m in self.modules)
+        lines = [
+            "robocorp.log import hook stats:",
+            f"  find_spec: {self.find_spec_calls} calls, {self.find_spec_time:.3f}s",
+            f"  modules loaded: {len(self.modules)}, {load_time:.3f}s",
+        ]
+        for code_source in ("pycache", "shared_cache", "rewrite"):
+            modules = [m for m in self.modules if m.code_source == code_source]
+            if modules:
+                t = sum(m.load_time for m in modules)
+                lines.append(f"    from {code_source}: {len(modules)}, {t:.3f}s")
+
+        slowest = sorted(self.modules, key=lambda m: m.load_time, reverse=True)
+        if slowest:
+            lines.append(f"  slowest modules (max {max_modules}):")
+            for m in slowest[:max_modules]:
+                lines.append(
+                    f"    {m.load_time:.4f}s {m.code_source:<12} "
+                    f"{m.filter_kind.value:<19} {m.module_name}"
+                )
+        return "\n".join(lines)
+
+
 class RewriteHook(importlib.abc.MetaPathFinder, importlib.abc.Loader):
     """PEP302/PEP451 import hook which rewrites asserts."""
 
-    def __init__(self, config: AutoLogConfigBase) -> None:
+    def __init__(
+        self, config: AutoLogConfigBase, rewrite_cache: Optional["RewriteCache"] = None
+    ) -> None:
         self.config = config
+        # Shared cache used when the rewritten code isn't available in the
+        # `__pycache__` (i.e.: when it's read-only).
+        self._rewrite_cache = rewrite_cache
         self._rewritten_names: Dict[str, Path] = {}
         # flag to guard against trying to rewrite a pyc file while we are already writing another pyc file,
         # which might result in infinite recursion (#3506)
         self._writing_pyc = False
+        self.stats = ImportStats()
 
     # Indirection so we can mock calls to find_spec originated from the hook during testing
     _find_spec = importlib.machinery.PathFinder.find_spec
@@ -94,6 +169,19 @@ class RewriteHook(importlib.abc.MetaPathFinder, importlib.abc.Loader):
         name: str,
         path: Optional[Sequence[Union[str, bytes]]] = None,
         target: Optional[types.ModuleType] = None,
+    ) -> Optional[importlib.machinery.ModuleSpec]:
+        initial_time = time.perf_counter()
+        try:
+            return self._find_rewrite_spec(name, path)
+        finally:
+            stats = self.stats
+            stats.find_spec_calls += 1
+            stats.find_spec_time += time.perf_counter() - initial_time
+
+    def _find_rewrite_spec(
+        self,
+        name: str,
+        path: Optional[Sequence[Union[str, bytes]]],
     ) -> Optional[importlib.machinery.ModuleSpec]:
         if self._writing_pyc:
             return None
@@ -146,6 +234,8 @@ class RewriteHook(importlib.abc.MetaPathFinder, importlib.abc.Loader):
         assert module.__spec__ is not None
         assert module.__spec__.origin is not None
         fn = Path(module.__spec__.origin)
+        initial_time = time.perf_counter()
+        code_source: CodeSource = "pycache"
 
         self._rewritten_names[module.__name__] = fn
 
@@ -179,8 +269,31 @@ class RewriteHook(importlib.abc.MetaPathFinder, importlib.abc.Loader):
         else:
             co = _read_pyc(fn, pyc, trace)
         if co is None:
-            trace(f"rewriting {fn!r}")
-            source_stat, co, _tree = _rewrite(fn, self.config, filter_kind)
+            source_stat = os.stat(fn)
+            source = fn.read_bytes()
+
+            rewrite_cache = self._rewrite_cache
+            cache_key = None
+            if rewrite_cache is not None and not FORCE_CODE_GENERATION:
+                cache_key = rewrite_cache.compute_key(
+                    source, str(fn), filter_kind, self.config
+                )
+                co = rewrite_cache.get(cache_key)
+
+            if co is None:
+                trace(f"rewriting {fn!r}")
+                code_source = "rewrite"
+                co, _tree = _rewrite_source(fn, source, self.config, filter_kind)
+                if rewrite_cache is not None and cache_key is not None:
+                    self._writing_pyc = True
+                    try:
+                        rewrite_cache.put(cache_key, co)
+                    finally:
+                        self._writing_pyc = False
+            else:
+                trace(f"found rewritten code for {fn} in the shared cache")
+                code_source = "shared_cache"
+
             if write:
                 self._writing_pyc = True
                 try:
@@ -189,6 +302,15 @@ class RewriteHook(importlib.abc.MetaPathFinder, importlib.abc.Loader):
                     self._writing_pyc = False
         else:
             trace(f"found cached rewritten pyc for {fn}")
+
+        self.stats.modules.append(
+            ModuleImportStats(
+                module.__name__,
+                filter_kind,
+                code_source,
+                time.perf_counter() - initial_time,
+            )
+        )
         exec(co, module.__dict__)
 
     def get_data(self, pathname: Union[str, bytes]) -> bytes:
@@ -259,10 +381,18 @@ def _rewrite(
     fn: Path, config: AutoLogConfigBase, filter_kind: FilterKind
 ) -> Tuple[os.stat_result, types.CodeType, ast.AST]:
     """Read and rewrite *fn* and return the code object."""
-    from ._rewrite_ast_add_callbacks import rewrite_ast_add_callbacks
-
     stat = os.stat(fn)
     source = fn.read_bytes()
+    co, tree = _rewrite_source(fn, source, config, filter_kind)
+    return stat, co, tree
+
+
+def _rewrite_source(
+    fn: Path, source: bytes, config: AutoLogConfigBase, filter_kind: FilterKind
+) -> Tuple[types.CodeType, ast.AST]:
+    """Rewrite the *source* (contents of *fn*) and return the code object."""
+    from ._rewrite_ast_add_callbacks import rewrite_ast_add_callbacks
+
     strfn = str(fn)
     tree = ast.parse(source, filename=strfn)
     rewrite_ast_add_callbacks(tree, filter_kind, source, strfn, config)
@@ -270,7 +400,7 @@ def _rewrite(
         print(f"Changed {strfn} to:")
         print(ast.unparse(tree))
     co = compile(tree, strfn, "exec", dont_inherit=True)
-    return stat, co, tree
+    return co, tree
 
 
 def _read_pyc(
@@ -6,7 +6,13 @@ import traceback
 from pathlib import Path
 from typing import Any, Optional, Sequence, Tuple, Union
 
-from .protocols import LogElementType, LogHTMLStyle, OptExcInfo
+from .protocols import (
+    AsyncOverflowPolicy,
+    LogElementType,
+    LogHTMLStyle,
+    LogOutputFormat,
+    OptExcInfo,
+)
 
 
 class _LogErrorLock:
@@ -17,7 +23,10 @@ def _log_error(func):
     @functools.wraps(func)
     def new_func(self, *args, **kwargs) -> Any:
         try:
-            return func(self, *args, **kwargs)
+            # Note: the lock is per logger (so, different threads may log
+            # concurrently, just the write of each message is serialized).
+            with self._lock:
+                return func(self, *args, **kwargs)
         except Exception:
             try:
                 writing = _LogErrorLock.tlocal._writing
@@ -50,10 +59,22 @@ class _RoboLogger:
         log_html: Optional[Union[Path, str]] = None,
         log_html_style: LogHTMLStyle = "standalone",
         min_messages_per_file: int = 50,
+        flush_threshold: str = "0",
+        flush_interval: float = 0,
+        async_writer: bool = False,
+        async_max_queue_size: int = 10000,
+        async_overflow_policy: AsyncOverflowPolicy = "block",
+        output_format: LogOutputFormat = "text",
+        log_html_refresh_interval: Optional[float] = None,
+        max_value_memo_size: Optional[int] = 10000,
+        log_html_compression_level: int = -1,
+        log_html_chunk_size: str = "64kb",
+        write_index: bool = False,
         **kwargs,
     ):
         from ._convert_units import _convert_to_bytes
         from ._robo_output_impl import _Config, _RoboOutputImpl
+        from ._robo_output_scopes import _SerializedScopesRoboOutputImpl
 
         # Note: expected to be used just when used in-memory (not part of the public API).
         config = _Config(kwargs.get("__uuid__"))
@@ -64,6 +85,11 @@ class _RoboLogger:
         else:
             raise ValueError(f"Unexpected log html style: {log_html_style}")
 
+        if output_format == "binary":
+            config.binary_format = True
+        elif output_format != "text":
+            raise ValueError(f"Unexpected output format: {output_format}")
+
         if output_dir is None:
             config.output_dir = None
         else:
@@ -74,6 +100,32 @@ class _RoboLogger:
         else:
             config.log_html = str(log_html)
 
+        if log_html_refresh_interval is not None and log_html_refresh_interval < 0:
+            raise ValueError(
+                f"Expected log_html_refresh_interval to be >= 0. Found: {log_html_refresh_interval}."
+            )
+        config.log_html_refresh_interval_in_seconds = log_html_refresh_interval
+
+        if max_value_memo_size is not None and max_value_memo_size < 0:
+            raise ValueError(
+                f"Expected max_value_memo_size to be >= 0. Found: {max_value_memo_size}."
+            )
+        config.max_value_memo_size = max_value_memo_size
+
+        if not -1 <= log_html_compression_level <= 9:
+            raise ValueError(
+                f"Expected log_html_compression_level to be between -1 and 9. Found: {log_html_compression_level}."
+            )
+        config.log_html_compression_level = log_html_compression_level
+
+        config.log_html_chunk_size = _convert_to_bytes(log_html_chunk_size)
+        if config.log_html_chunk_size <= 0:
+            raise ValueError(
+                f"Expected log_html_chunk_size to be > 0. Found: {log_html_chunk_size}."
+            )
+
+        config.write_index = write_index
+
         config.max_file_size_in_bytes = _convert_to_bytes(max_file_size)
         config.max_files = max_files
 
@@ -83,6 +135,18 @@ class _RoboLogger:
 
         config.min_messages_per_file = min_messages_per_file
 
+        config.flush_threshold_in_bytes = _convert_to_bytes(flush_threshold)
+        if config.flush_threshold_in_bytes < 0:
+            raise ValueError(
+                f"Expected flush_threshold to be >= 0. Found: {flush_threshold}."
+            )
+
+        if flush_interval < 0:
+            raise ValueError(
+                f"Expected flush_interval to be >= 0. Found: {flush_interval}."
+            )
+        config.flush_interval_in_seconds = flush_interval
+
         if config.max_file_size_in_bytes < _convert_to_bytes("10kb"):
             raise ValueError(
                 f"Cannot generate logs where the max file size in bytes is less than 10kb."
@@ -95,10 +159,23 @@ class _RoboLogger:
         config.initial_time = kwargs.get("__initial_time__")
         config.additional_info = kwargs.get("__additional_info__")
 
-        self._robot_output_impl = _RoboOutputImpl(config)
+        # The elements of threads other than the main thread are written as
+        # a block when finished (so that the scopes are never interleaved).
+        self._robot_output_impl = _SerializedScopesRoboOutputImpl(
+            _RoboOutputImpl(config)
+        )
+        if async_writer:
+            from ._robo_output_async import _AsyncRoboOutputImpl
+
+            self._robot_output_impl = _AsyncRoboOutputImpl(
+                self._robot_output_impl, async_max_queue_size, async_overflow_policy
+            )
         self._skip_log_methods = 0
         self._skip_log_variables = 0
 
+        # Messages may be logged from multiple threads.
+        self._lock = threading.RLock()
+
     def hide_from_output(self, string_to_hide: str) -> None:
         self._robot_output_impl.hide_from_output(string_to_hide)
 
@@ -200,6 +277,7 @@ class _RoboLogger:
         element_type: LogElementType,
         doc: str,
         args: Sequence[Tuple[str, str, str]],
+        loc_index: int = -1,
     ):
         """
         Example:
@@ -213,6 +291,10 @@ class _RoboLogger:
             doc="Closes Browser",
             args=[("force", "boolean", "True")],
         )
+
+        Note: `loc_index` is the index of a static location (see:
+        `MethodLocation.loc_index`) which is used to cache the location id
+        written to the output (-1 if not available).
         """
         hide_from_logs = bool(self._skip_log_methods)
 
@@ -230,6 +312,7 @@ class _RoboLogger:
             self._get_time_delta(),
             args,
             hide_from_logs,
+            loc_index,
         )
 
     def yield_resume(
@@ -241,14 +324,15 @@ class _RoboLogger:
     ):
         hide_from_logs = bool(self._skip_log_methods)
 
-        return self._robot_output_impl.yield_resume(
-            name,
-            libname,
-            source,
-            lineno,
-            self._get_time_delta(),
-            hide_from_logs,
-        )
+        with self._lock:
+            return self._robot_output_impl.yield_resume(
+                name,
+                libname,
+                source,
+                lineno,
+                self._get_time_delta(),
+                hide_from_logs,
+            )
 
     def yield_suspend(
         self,
@@ -263,15 +347,16 @@ class _RoboLogger:
             yielded_value_type = ""
             yielded_value_repr = ""
 
-        return self._robot_output_impl.yield_suspend(
-            name,
-            libname,
-            source,
-            lineno,
-            yielded_value_type,
-            yielded_value_repr,
-            self._get_time_delta(),
-        )
+        with self._lock:
+            return self._robot_output_impl.yield_suspend(
+                name,
+                libname,
+                source,
+                lineno,
+                yielded_value_type,
+                yielded_value_repr,
+                self._get_time_delta(),
+            )
 
     def yield_from_resume(
         self,
@@ -282,14 +367,15 @@ class _RoboLogger:
     ):
         hide_from_logs = bool(self._skip_log_methods)
 
-        return self._robot_output_impl.yield_from_resume(
-            name,
-            libname,
-            source,
-            lineno,
-            self._get_time_delta(),
-            hide_from_logs,
-        )
+        with self._lock:
+            return self._robot_output_impl.yield_from_resume(
+                name,
+                libname,
+                source,
+                lineno,
+                self._get_time_delta(),
+                hide_from_logs,
+            )
 
     def yield_from_suspend(
         self,
@@ -298,13 +384,14 @@ class _RoboLogger:
         source: str,
         lineno: int,
     ):
-        return self._robot_output_impl.yield_from_suspend(
-            name,
-            libname,
-            source,
-            lineno,
-            self._get_time_delta(),
-        )
+        with self._lock:
+            return self._robot_output_impl.yield_from_suspend(
+                name,
+                libname,
+                source,
+                lineno,
+                self._get_time_delta(),
+            )
 
     @_log_error
     def after_assign(
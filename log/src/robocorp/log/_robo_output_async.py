@@ -0,0 +1,208 @@
+"""
+Helpers to write the log contents from a separate thread.
+
+The idea is that the thread which is running the automation only pushes
+`(method_name, args, thread_id)` tuples into a queue and a writer thread is the one
+which actually does the work of converting those to the log format (which
+involves `json.dumps`, hiding strings from the output and the file I/O).
+"""
+import collections
+import threading
+import traceback
+from typing import Any, Deque, Tuple
+
+from ._stack_id import get_current_stack_id
+from .protocols import AsyncOverflowPolicy, OptExcInfo
+
+
+def _make_enqueue(method_name: str, can_drop: bool):
+    def method(self, *args):
+        self._put(method_name, args, can_drop)
+
+    method.__name__ = method_name
+    return method
+
+
+class _AsyncRoboOutputImpl:
+    """
+    Wraps a `_RoboOutputImpl` so that the messages are written from a writer
+    thread.
+
+    Messages which need to be written as soon as they're created (such as
+    exceptions or process snapshots, which need to inspect the current frames)
+    are written in the caller thread after all the pending messages are written.
+    """
+
+    def __init__(
+        self,
+        robot_output_impl,
+        max_queue_size: int,
+        overflow_policy: AsyncOverflowPolicy,
+    ):
+        if max_queue_size <= 0:
+            raise ValueError(f"max_queue_size must be > 0. Found: {max_queue_size}")
+
+        if overflow_policy not in ("block", "drop"):
+            raise ValueError(f"Unexpected overflow policy: {overflow_policy}")
+
+        self._impl = robot_output_impl
+        self._max_queue_size = max_queue_size
+        self._drop_on_overflow = overflow_policy == "drop"
+
+        # Note: `deque.append` and `deque.popleft` are atomic, so, the producer
+        # doesn't need to get a lock to add something to the queue.
+        self._queue: Deque[Tuple[str, tuple, int]] = collections.deque()
+
+        # The lock is held by the writer while writing and by the caller when
+        # something must be written synchronously.
+        self._impl_lock = threading.Lock()
+
+        self._has_contents_event = threading.Event()
+        self._has_space_event = threading.Event()
+        self._finish = False
+        self._dropped = 0
+        self._closed = False
+
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name="RobocorpLogAsyncWriter"
+        )
+        self._writer_thread.daemon = True
+        self._writer_thread.start()
+
+    def _put(self, method_name: str, args: tuple, can_drop: bool) -> None:
+        if self._closed:
+            return
+
+        queue = self._queue
+        if len(queue) >= self._max_queue_size:
+            if self._drop_on_overflow:
+                if can_drop:
+                    self._dropped += 1
+                    return
+                # Messages which change the scope (start/end) are never dropped
+                # (otherwise the log structure would be broken).
+            else:
+                while len(queue) >= self._max_queue_size and not self._finish:
+                    self._has_space_event.clear()
+                    self._has_contents_event.set()
+                    self._has_space_event.wait(0.1)
+
+        queue.append((method_name, args, get_current_stack_id()))
+        self._has_contents_event.set()
+
+    def _write_pending(self) -> None:
+        """
+        Writes all the pending contents in the queue.
+
+        Note: must be called with the `_impl_lock` held.
+        """
+        queue = self._queue
+        impl = self._impl
+        while True:
+            try:
+                method_name, args, thread_id = queue.popleft()
+            except IndexError:
+                break
+            # The message must be written as if it was written by the
+            # thread which created it.
+            impl._thread_id_override = thread_id
+            try:
+                getattr(impl, method_name)(*args)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                impl._thread_id_override = None
+
+            if not self._has_space_event.is_set():
+                self._has_space_event.set()
+
+        dropped = self._dropped
+        if dropped:
+            self._dropped -= dropped
+            impl.log_message(
+                "W",
+                f"Robocorp Log: {dropped} message(s) were dropped because the "
+                "log writer queue was full.",
+                False,
+                "",
+                "",
+                "",
+                0,
+                impl.get_time_delta(),
+            )
+
+    def _writer_loop(self) -> None:
+        while True:
+            self._has_contents_event.wait()
+            self._has_contents_event.clear()
+            with self._impl_lock:
+                self._write_pending()
+                self._has_space_event.set()
+            if self._finish and not self._queue:
+                return
+
+    def flush(self) -> None:
+        with self._impl_lock:
+            self._write_pending()
+            self._impl.flush()
+
+    def __getattr__(self, attr: str) -> Any:
+        # i.e.: `current_file`, `initial_time`, `get_time_delta`, ... are all
+        # forwarded directly to the actual implementation.
+        return getattr(self._impl, attr)
+
+    def hide_from_output(self, string_to_hide: str) -> None:
+        with self._impl_lock:
+            self._impl.hide_from_output(string_to_hide)
+
+    start_run = _make_enqueue("start_run", False)
+    end_run = _make_enqueue("end_run", False)
+    start_task = _make_enqueue("start_task", False)
+    end_task = _make_enqueue("end_task", False)
+    send_info = _make_enqueue("send_info", False)
+    send_start_time_delta = _make_enqueue("send_start_time_delta", False)
+    start_element = _make_enqueue("start_element", False)
+    end_method = _make_enqueue("end_method", False)
+    yield_resume = _make_enqueue("yield_resume", False)
+    yield_suspend = _make_enqueue("yield_suspend", False)
+    yield_from_resume = _make_enqueue("yield_from_resume", False)
+    yield_from_suspend = _make_enqueue("yield_from_suspend", False)
+
+    # These don't change the scope, so, they may be dropped if the queue is full.
+    after_assign = _make_enqueue("after_assign", True)
+    method_return = _make_enqueue("method_return", True)
+    log_message = _make_enqueue("log_message", True)
+    console_message = _make_enqueue("console_message", True)
+
+    def log_method_except(
+        self,
+        exc_info: OptExcInfo,
+        unhandled: bool,
+        hide_vars: bool,
+    ) -> bool:
+        # The frames must be inspected right now (afterwards the locals
+        # may be changed).
+        with self._impl_lock:
+            self._write_pending()
+            return self._impl.log_method_except(exc_info, unhandled, hide_vars)
+
+    def process_snapshot(self, hide_vars: bool) -> None:
+        with self._impl_lock:
+            self._write_pending()
+            self._impl.process_snapshot(hide_vars)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+
+        self._finish = True
+        self._has_contents_event.set()
+        self._has_space_event.set()
+        self._writer_thread.join()
+
+        with self._impl_lock:
+            # The writer should've written everything already, but just
+            # in case do it again (it's a no-op if the queue is empty).
+            self._write_pending()
+            self._impl.close()
@@ -0,0 +1,175 @@
+"""
+Helpers to keep the scopes of the log consistent when elements are logged
+from multiple threads (or from concurrent asyncio tasks).
+
+The viewer (log.html) builds the tree with a single stack of scopes, so, if the
+elements of different threads were written as they happen, they'd be
+interleaved and the tree would be broken (i.e.: the end of an element in a
+thread would close the scope of an element from another thread).
+
+To prevent that, the messages of the main thread are written as they happen
+and the messages of a secondary stack (a thread other than the main thread or
+an asyncio task which isn't the one using the stack of the thread -- see:
+`_stack_id`) are kept pending while an element is active in that stack and are
+written all at once when its outermost element finishes (so, the whole element
+is written as a block inside the scope which is active in the main thread).
+
+Messages from a secondary stack which aren't inside an element (such as a
+`log.info` in a thread which wasn't started from an auto-logged function) are
+written directly.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from ._logger_instances import _main_thread_id
+from .protocols import OptExcInfo
+
+# The maximum number of messages kept pending for a secondary stack. If an
+# element has more messages than this, its messages are dropped (a warning
+# with the number of dropped messages is added to the log when it finishes).
+MAX_PENDING_MESSAGES_PER_STACK = 20000
+
+
+class _SecondaryStack:
+    def __init__(self) -> None:
+        self.depth = 0
+        self.pending: List[Tuple[str, tuple]] = []
+        self.dropped = 0
+
+
+def _make_scope_method(method_name: str, depth_delta: int):
+    def method(self, *args):
+        return self._on_message(method_name, args, depth_delta)
+
+    method.__name__ = method_name
+    return method
+
+
+class _SerializedScopesRoboOutputImpl:
+    """
+    Wraps a `_RoboOutputImpl` so that the elements of secondary stacks are
+    written as a block when finished.
+
+    Note: all the methods are expected to be called with the lock of the
+    `_RoboLogger` held (or from the writer thread of the `_AsyncRoboOutputImpl`).
+    """
+
+    def __init__(
+        self,
+        robot_output_impl,
+        max_pending_messages_per_stack: int = MAX_PENDING_MESSAGES_PER_STACK,
+    ):
+        self._impl = robot_output_impl
+        self._max_pending_messages_per_stack = max_pending_messages_per_stack
+        self._stack_id_to_secondary_stack: Dict[int, _SecondaryStack] = {}
+
+    def __getattr__(self, attr: str) -> Any:
+        # i.e.: `current_file`, `initial_time`, `get_time_delta`, ... are all
+        # forwarded directly to the actual implementation.
+        return getattr(self._impl, attr)
+
+    @property
+    def _thread_id_override(self) -> Optional[int]:
+        return self._impl._thread_id_override
+
+    @_thread_id_override.setter
+    def _thread_id_override(self, thread_id: Optional[int]) -> None:
+        # Set by the async writer (which writes the messages as if it was
+        # the thread which created those).
+        self._impl._thread_id_override = thread_id
+
+    def _on_message(self, method_name: str, args: tuple, depth_delta: int):
+        stack_id = self._impl._get_thread_id()
+        if stack_id == _main_thread_id:
+            return getattr(self._impl, method_name)(*args)
+
+        secondary_stack = self._stack_id_to_secondary_stack.get(stack_id)
+        if secondary_stack is None:
+            if depth_delta <= 0:
+                # Not inside an element: just write it.
+                return getattr(self._impl, method_name)(*args)
+
+            secondary_stack = self._stack_id_to_secondary_stack[stack_id] = (
+                _SecondaryStack()
+            )
+
+        secondary_stack.depth += depth_delta
+        if secondary_stack.dropped:
+            secondary_stack.dropped += 1
+        elif len(secondary_stack.pending) >= self._max_pending_messages_per_stack:
+            secondary_stack.dropped = len(secondary_stack.pending) + 1
+            secondary_stack.pending = []
+        else:
+            secondary_stack.pending.append((method_name, args))
+
+        if secondary_stack.depth <= 0:
+            # The outermost element finished: write it all.
+            del self._stack_id_to_secondary_stack[stack_id]
+            self._write_pending(secondary_stack)
+        return None
+
+    def _write_pending(self, secondary_stack: _SecondaryStack) -> None:
+        impl = self._impl
+        for method_name, args in secondary_stack.pending:
+            getattr(impl, method_name)(*args)
+
+        if secondary_stack.dropped:
+            self._warn(
+                f"Robocorp Log: {secondary_stack.dropped} message(s) from an "
+                "element which was not in the main thread were dropped (the "
+                f"element had more than {self._max_pending_messages_per_stack} "
+                "messages)."
+            )
+
+    def _warn(self, message: str) -> None:
+        impl = self._impl
+        impl.log_message("W", message, False, "", "", "", 0, impl.get_time_delta())
+
+    start_run = _make_scope_method("start_run", 1)
+    end_run = _make_scope_method("end_run", -1)
+    start_task = _make_scope_method("start_task", 1)
+    end_task = _make_scope_method("end_task", -1)
+    start_element = _make_scope_method("start_element", 1)
+    end_method = _make_scope_method("end_method", -1)
+    yield_resume = _make_scope_method("yield_resume", 1)
+    yield_suspend = _make_scope_method("yield_suspend", -1)
+    yield_from_resume = _make_scope_method("yield_from_resume", 1)
+    yield_from_suspend = _make_scope_method("yield_from_suspend", -1)
+
+    after_assign = _make_scope_method("after_assign", 0)
+    method_return = _make_scope_method("method_return", 0)
+    log_message = _make_scope_method("log_message", 0)
+    console_message = _make_scope_method("console_message", 0)
+
+    def log_method_except(
+        self,
+        exc_info: OptExcInfo,
+        unhandled: bool,
+        hide_vars: bool,
+    ) -> bool:
+        # Note: when pending, the frames in the traceback are only inspected
+        # when the element finishes (these are the frames which already
+        # finished, so, the locals shouldn't change).
+        ret = self._on_message("log_method_except", (exc_info, unhandled, hide_vars), 0)
+        if ret is None:
+            return True
+        return ret
+
+    def process_snapshot(self, hide_vars: bool) -> None:
+        # The snapshot is a block by itself and must be done right now.
+        self._impl.process_snapshot(hide_vars)
+
+    def close(self) -> None:
+        # Elements which didn't finish can't be written (the threads are
+        # still running).
+        dropped = 0
+        for secondary_stack in self._stack_id_to_secondary_stack.values():
+            dropped += len(secondary_stack.pending) + secondary_stack.dropped
+        self._stack_id_to_secondary_stack.clear()
+        if dropped:
+            self._warn(
+                f"Robocorp Log: {dropped} message(s) from elements which were not "
+                "in the main thread were dropped (the elements didn't finish "
+                "before the log output was closed)."
+            )
+        self._impl.close()
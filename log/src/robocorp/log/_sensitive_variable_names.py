@@ -10,6 +10,10 @@ class SensitiveVariableNames:
 
         self._cache: Dict[str, bool] = {}
 
+        # Incremented whenever a name/pattern is added (so that clients caching
+        # the result of `is_sensitive_variable_name` know they must recompute it).
+        self.version = 0
+
         for variable_name in default_sensitive_variable_names:
             self.add_sensitive_variable_name(variable_name)
 
@@ -37,3 +41,4 @@ class SensitiveVariableNames:
         self._sensitive_variable_regexps.add(variable_name_pattern)
         self._sensitive_variable_re = None
         self._cache.clear()
+        self.version += 1
@@ -0,0 +1,72 @@
+"""
+Provides the id of the stack of log elements for the current context.
+
+Usually each thread has its own stack (and the id of the stack is the id of the
+thread), but in asyncio the elements of different tasks may be interleaved in
+the same thread, so, each asyncio task also needs its own stack.
+
+The first task in a thread to log something (usually the task created by
+`asyncio.run()`, where the code which started it is blocked until it finishes)
+uses the stack of the thread and any other task running concurrently gets a
+new stack (with a negative id, so that it never clashes with a thread id).
+
+Note: the messages of stacks other than the one from the main thread are
+written as a block when their elements finish (see: `_robo_output_scopes`).
+"""
+import itertools
+import sys
+import threading
+import weakref
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+
+# Provides the (task, stack id) for the current task.
+_task_stack_id: ContextVar[Optional[Tuple[Any, int]]] = ContextVar(
+    "robocorp_log_task_stack_id", default=None
+)
+
+# thread id -> weak reference to the task which is using the stack of the thread.
+_thread_id_to_task: Dict[int, "weakref.ref[Any]"] = {}
+_thread_id_to_task_lock = threading.Lock()
+
+_next_task_stack_id: "partial[int]" = partial(next, itertools.count(-1, -1))
+
+
+def get_current_stack_id() -> int:
+    """
+    Returns:
+        The id of the thread or an id for the current asyncio task if it's
+        not the task which uses the stack of the thread.
+    """
+    # If asyncio wasn't imported there's no need to check for a task.
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is None:
+        return threading.get_ident()
+
+    loop = asyncio._get_running_loop()
+    if loop is None:
+        return threading.get_ident()
+
+    task = asyncio.current_task(loop)
+    if task is None:
+        return threading.get_ident()
+
+    task_and_stack_id = _task_stack_id.get()
+    if task_and_stack_id is not None and task_and_stack_id[0] is task:
+        return task_and_stack_id[1]
+
+    # First time in this task (note: the value of the parent task may be
+    # available as the context is copied when a task is created).
+    thread_id = threading.get_ident()
+    with _thread_id_to_task_lock:
+        task_ref = _thread_id_to_task.get(thread_id)
+        owner = task_ref() if task_ref is not None else None
+        if owner is None or owner.done():
+            _thread_id_to_task[thread_id] = weakref.ref(task)
+            stack_id = thread_id
+        else:
+            stack_id = _next_task_stack_id()
+
+    _task_stack_id.set((task, stack_id))
+    return stack_id
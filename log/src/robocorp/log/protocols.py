@@ -6,12 +6,21 @@ OptExcInfo = Union[ExcInfo, tuple[None, None, None]]
 
 LogHTMLStyle = Literal["standalone", "vscode"]
 
+AsyncOverflowPolicy = Literal["block", "drop"]
+
+LogOutputFormat = Literal["text", "binary"]
+
 
 class IReadLines(Protocol):
     def readlines(self) -> Sequence[str]:
         pass
 
 
+class IReadBytes(Protocol):
+    def read(self, size: int) -> bytes:
+        pass
+
+
 # Note: this is a bit messy as we're mixing task states with log levels.
 # Note2: This is for the log.html and not really for user APIs.
 class Status:
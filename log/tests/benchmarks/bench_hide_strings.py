@@ -0,0 +1,99 @@
+"""
+Benchmark for the hiding of strings in the log output.
+
+Shows the throughput (messages/second) as the number of strings to hide grows
+for the previous approach (a regular expression with an alternation of all
+the strings, recompiled when a string is added) and `HideStrings`.
+
+Usage:
+
+    python tests/benchmarks/bench_hide_strings.py
+"""
+import random
+import re
+import time
+
+from robocorp.log._hide_strings import HideStrings
+
+
+class _AlternationHideStrings:
+    # The approach previously used in `_RoboOutputImpl.hide_from_output`.
+    def __init__(self):
+        self._strings = set()
+        self._re = None
+
+    def add(self, string_to_hide):
+        if string_to_hide in self._strings:
+            return
+        self._strings.add(string_to_hide)
+        self._re = re.compile("|".join(re.escape(s) for s in self._strings))
+
+    def sub(self, replacement, message):
+        if self._re is None:
+            return message
+        return self._re.sub(replacement, message)
+
+
+def _create_messages(rand, secrets, count):
+    messages = []
+    for i in range(count):
+        if i % 100 == 0:
+            # Some messages do have a secret.
+            messages.append(f"Using token: {rand.choice(secrets)}")
+        else:
+            messages.append(
+                rand.choice(
+                    [
+                        f"Processed item {i} with status 'ok'",
+                        f"{{'id': {i}, 'name': 'customer-{i}', 'items': [1, 2, 3]}}",
+                        "<Response [200]>",
+                        str(i),
+                        "'some-string-value'",
+                    ]
+                )
+            )
+    return messages
+
+
+def _bench(hide_strings_class, secrets, messages):
+    # Adding the strings (interleaved with messages: in practice the secrets
+    # are collected while the run is in progress).
+    hide_strings = hide_strings_class()
+    initial = time.perf_counter()
+    for i, secret in enumerate(secrets):
+        hide_strings.add(secret)
+        hide_strings.sub("<redacted>", messages[i % len(messages)])
+    add_time = time.perf_counter() - initial
+
+    initial = time.perf_counter()
+    for message in messages:
+        hide_strings.sub("<redacted>", message)
+    sub_time = time.perf_counter() - initial
+    return add_time, len(messages) / sub_time
+
+
+def main():
+    rand = random.Random(0)
+    print(
+        f"{'hidden strings':>15} | {'impl':>12} | {'add all (s)':>12} | {'msgs/sec':>12}"
+    )
+    for count in (1, 10, 100, 500, 1000):
+        secrets = [
+            "".join(
+                rand.choice("abcdefghijklmnopqrstuvwxyz0123456789")
+                for _ in range(rand.randint(8, 40))
+            )
+            for _ in range(count)
+        ]
+        messages = _create_messages(rand, secrets, 10000)
+
+        for name, hide_strings_class in (
+            ("alternation", _AlternationHideStrings),
+            ("HideStrings", HideStrings),
+        ):
+            add_time, throughput = _bench(hide_strings_class, secrets, messages)
+            print(f"{count:>15} | {name:>12} | {add_time:>12.4f} | {throughput:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark for the cost of obtaining the id of the location written for each
+element started (with a recursion-heavy workload, where the same few
+locations are started over and over).
+
+Compares the location id obtained from the `(name, libname, source, lineno)`
+key (the previous behavior and what's still used for locations which aren't
+static) with the location id cached by the index of the `MethodLocation`
+created by the rewritten code.
+
+Usage:
+
+    python tests/benchmarks/bench_location_ids.py
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from robocorp import log
+from robocorp.log._auto_logging_setup import register_auto_logging_callbacks
+from robocorp.log._config import DefaultAutoLogConfig, FilterKind
+from robocorp.log._lifecycle_hooks import MethodLocation
+from robocorp.log._logger_instances import _get_logger_instances
+from robocorp.log._rewrite_importhook import _rewrite
+
+_SOURCE = """
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+"""
+
+FIB_N = 20
+LOC_ID_CALLS = 1_000_000
+REPEAT = 3
+
+
+def _compile():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        target = Path(tmpdir) / "bench_target.py"
+        target.write_text(_SOURCE, "utf-8")
+        return _rewrite(target, DefaultAutoLogConfig(), FilterKind.full_log)[1]
+
+
+def _new_fib(code, static_locations: bool):
+    namespace = {"__name__": "bench_target", "__file__": "bench_target.py"}
+    exec(code, namespace)
+    if not static_locations:
+        for value in namespace.values():
+            if isinstance(value, MethodLocation):
+                value.loc_index = -1
+    return namespace["fib"]
+
+
+def _get_output_impl():
+    with _get_logger_instances() as logger_instances:
+        for robo_logger in logger_instances:
+            return robo_logger._robot_output_impl
+    raise AssertionError("No logger registered.")
+
+
+def _bench_obtain_loc_id(loc_index: int) -> float:
+    obtain_loc_id = _get_output_impl()._obtain_loc_id
+    initial = time.perf_counter()
+    for _i in range(LOC_ID_CALLS):
+        obtain_loc_id("fib", "bench_target", "bench_target.py", 2, "", loc_index)
+    return (time.perf_counter() - initial) / LOC_ID_CALLS
+
+
+def _bench_fib(code, static_locations: bool) -> float:
+    fib = _new_fib(code, static_locations)
+    timings = []
+    for _i in range(REPEAT):
+        initial = time.perf_counter()
+        fib(FIB_N)
+        timings.append(time.perf_counter() - initial)
+    return min(timings)
+
+
+def main():
+    code = _compile()
+
+    with register_auto_logging_callbacks(
+        DefaultAutoLogConfig(), add_rewrite_hook=False
+    ):
+        with log.add_in_memory_log_output(lambda msg: None):
+            log.start_run("Bench")
+            log.start_task("bench", "bench_mod", __file__, 0)
+
+            print(f"{'':>24} | {'_obtain_loc_id (ns)':>20} | {f'fib({FIB_N}) (s)':>12}")
+            for name, static_locations in (
+                ("key (name, lineno, ...)", False),
+                ("location index", True),
+            ):
+                loc_index = 0 if static_locations else -1
+                per_call = _bench_obtain_loc_id(loc_index) * 1e9
+                total = _bench_fib(code, static_locations)
+                print(f"{name:>24} | {per_call:>20.0f} | {total:>12.3f}")
+
+            log.end_task("bench", "bench_mod", "PASS", "Ok")
+            log.end_run("Bench", "PASS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark for the cost of calling a function rewritten by the auto-logging.
+
+Compares calling the plain function, the rewritten function while logging,
+the rewritten function with the hooks always enabled but without a logger
+(the previous behavior when no logger was registered) and the rewritten
+function when no logger is registered (where the original code is run
+directly).
+
+"hot" is the time per call when calling the same function many times and
+"cold" is the time of the first call of a function which was just defined.
+
+Usage:
+
+    python tests/benchmarks/bench_rewrite_fast_path.py
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from robocorp import log
+from robocorp.log import _lifecycle_hooks
+from robocorp.log._auto_logging_setup import register_auto_logging_callbacks
+from robocorp.log._config import DefaultAutoLogConfig, FilterKind
+from robocorp.log._rewrite_importhook import _rewrite
+
+_SOURCE = """
+def process(a, b):
+    c = a + b
+    if c > 10:
+        c = 10
+    return c
+"""
+
+HOT_CALLS = 100_000
+COLD_CALLS = 2_000
+
+
+def _compile(rewrite: bool):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        target = Path(tmpdir) / "bench_target.py"
+        target.write_text(_SOURCE, "utf-8")
+        if rewrite:
+            return _rewrite(target, DefaultAutoLogConfig(), FilterKind.full_log)[1]
+        return compile(_SOURCE, str(target), "exec")
+
+
+def _new_function(code):
+    namespace = {"__name__": "bench_target", "__file__": "bench_target.py"}
+    exec(code, namespace)
+    return namespace["process"]
+
+
+def _bench_hot(code) -> float:
+    process = _new_function(code)
+    initial = time.perf_counter()
+    for i in range(HOT_CALLS):
+        process(i, 1)
+    return (time.perf_counter() - initial) / HOT_CALLS
+
+
+def _bench_cold(code) -> float:
+    total = 0.0
+    for i in range(COLD_CALLS):
+        process = _new_function(code)
+        initial = time.perf_counter()
+        process(i, 1)
+        total += time.perf_counter() - initial
+    return total / COLD_CALLS
+
+
+def _bench(name, code):
+    hot = _bench_hot(code) * 1e9
+    cold = _bench_cold(code) * 1e9
+    print(f"{name:>32} | {hot:>10.0f} | {cold:>10.0f}")
+
+
+def main():
+    plain_code = _compile(rewrite=False)
+    rewritten_code = _compile(rewrite=True)
+
+    print(f"{'':>32} | {'hot (ns)':>10} | {'cold (ns)':>10}")
+    _bench("plain", plain_code)
+
+    with register_auto_logging_callbacks(
+        DefaultAutoLogConfig(), add_rewrite_hook=False
+    ):
+        with log.add_in_memory_log_output(lambda msg: None):
+            log.start_run("Bench")
+            log.start_task("bench", "bench_mod", __file__, 0)
+            _bench("rewritten (logging)", rewritten_code)
+            log.end_task("bench", "bench_mod", "PASS", "Ok")
+            log.end_run("Bench", "PASS")
+
+        _lifecycle_hooks.set_enable_only_with_logger_instances(False)
+        _bench("rewritten (no logger, hooks on)", rewritten_code)
+
+        _lifecycle_hooks.set_enable_only_with_logger_instances(True)
+        _bench("rewritten (no logger)", rewritten_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark for the memory used when logging many unique messages.
+
+Logs 1M unique messages (with `log.info`) and shows the peak memory (max RSS)
+of the process along with the time taken, comparing the default (bounded)
+memo for values with the memo keeping all the values (the previous behavior).
+
+Each case runs in a new process (so that the max RSS of one doesn't affect
+the other).
+
+Usage:
+
+    python tests/benchmarks/bench_value_memo_memory.py
+"""
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MESSAGES = 1_000_000
+
+_CASES = (
+    ("bounded (default)", "10000"),
+    ("unbounded", "None"),
+)
+
+
+def _max_rss_in_mb() -> float:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)  # bytes
+    return max_rss / 1024  # kilobytes
+
+
+def _run_case(max_value_memo_size: str) -> None:
+    from robocorp import log
+
+    memo_size = None if max_value_memo_size == "None" else int(max_value_memo_size)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with log.add_log_output(
+            tmpdir,
+            max_file_size="10MB",
+            max_files=2,
+            max_value_memo_size=memo_size,
+        ):
+            log.start_run("Bench")
+            log.start_task("bench", "bench_mod", __file__, 0)
+
+            initial = time.perf_counter()
+            for i in range(MESSAGES):
+                log.info(f"Processed item: {i}")
+            elapsed = time.perf_counter() - initial
+
+            log.end_task("bench", "bench_mod", "PASS", "Ok")
+            log.end_run("Bench", "PASS")
+
+    print(f"{_max_rss_in_mb():.1f} {elapsed:.2f}")
+
+
+def main():
+    print(f"{'':>20} | {'max RSS (MB)':>12} | {'time (s)':>10}")
+    for name, max_value_memo_size in _CASES:
+        output = subprocess.check_output(
+            [sys.executable, __file__, "--case", max_value_memo_size], text=True
+        )
+        max_rss, elapsed = output.split()
+        print(f"{name:>20} | {float(max_rss):>12.1f} | {float(elapsed):>10.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--case":
+        _run_case(sys.argv[2])
+    else:
+        main()
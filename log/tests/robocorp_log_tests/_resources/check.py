@@ -21,6 +21,15 @@ def recurse_some_method():
         some_method()
 
 
+counter = 0
+
+
+def increment_counter():
+    global counter
+    counter += 1
+    return counter
+
+
 class SomeClass:
     def __init__(self, arg1, arg2):
         pass
@@ -0,0 +1,42 @@
+import asyncio
+
+
+async def fetch(name, delay):
+    result = []
+    await asyncio.sleep(delay)
+    async for i in count_up_to(2):
+        value = await process(name, i)
+        result.append(value)
+    return result
+
+
+async def count_up_to(n):
+    i = 0
+    while i < n:
+        await asyncio.sleep(0)
+        yield i
+        i += 1
+
+
+async def process(name, i):
+    await asyncio.sleep(0)
+    return f"{name}-{i}"
+
+
+async def main():
+    results = await asyncio.gather(fetch("a", 0.01), fetch("b", 0))
+    return results
+
+
+def run_main():
+    return asyncio.run(main())
+
+
+async def main_interleaved():
+    # Both tasks run interleaved (each `await` switches to the other task).
+    results = await asyncio.gather(fetch("a", 0), fetch("b", 0))
+    return results
+
+
+def run_main_interleaved():
+    return asyncio.run(main_interleaved())
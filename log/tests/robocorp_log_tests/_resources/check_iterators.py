@@ -99,3 +99,40 @@ def for_with_exception():
             raise RuntimeError()
     except RuntimeError:
         pass
+
+
+def process_item(item):
+    if item == 7:
+        raise RuntimeError(f"Error processing: {item}")
+    return item
+
+
+def for_with_loop_log_policy():
+    for i in range(6):
+        process_item(i)
+
+    try:
+        for i in range(10):
+            process_item(i)
+    except RuntimeError:
+        pass
+
+    i = 0
+    while i < 5:
+        i += 1
+
+
+def compute_totals():
+    total = 0
+    status = "running"
+    for i in range(5):
+        value = i * 2
+        total += value
+        status = "running"
+    status = "done"
+    return total, status
+
+
+def assigns_with_assign_log_policy():
+    totals = compute_totals()
+    return totals
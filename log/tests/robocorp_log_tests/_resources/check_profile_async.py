@@ -0,0 +1,13 @@
+import asyncio
+
+
+async def work():
+    await asyncio.sleep(0.2)
+
+
+async def main():
+    await asyncio.gather(*(work() for _i in range(5)))
+
+
+def run_main():
+    asyncio.run(main())
@@ -0,0 +1,16 @@
+def compute_repr_contents():
+    return "contents"
+
+
+class ReprCallsLoggedFunction:
+    def __repr__(self):
+        return f"ReprCallsLoggedFunction({compute_repr_contents()})"
+
+
+def receive_arg(arg):
+    pass
+
+
+def main():
+    for _i in range(3):
+        receive_arg(ReprCallsLoggedFunction())
@@ -66,9 +66,9 @@ def ui_regenerate():
 
     # --- Implementation
     if PRINT_SAMPLE_CONTENTS:
-        from robocorp.log import _robo_output_impl
+        from robocorp.log import _log_html
 
-        _robo_output_impl.WRITE_CONTENTS_TO_STDERR = True
+        _log_html.WRITE_CONTENTS_TO_STDERR = True
 
     uiregenerate_fixture = UIRegenerateFixture()
 
@@ -393,3 +393,88 @@ def pretty_format_logs_from_iter(
             level += 1
             indent = "    " * level
     return "".join(out)
+
+
+class ScopeNode:
+    def __init__(self, msg: Optional[dict]):
+        self.msg = msg
+        self.children: List["ScopeNode"] = []
+
+    def iter_descendants(self):
+        for child in self.children:
+            yield child
+            yield from child.iter_descendants()
+
+
+def build_scope_tree_from_iter(iter_in) -> ScopeNode:
+    """
+    Builds the tree of scopes just as the viewer (`treeBuilder.ts`) does: a
+    single stack of scopes for all the messages (where the replay messages
+    are skipped after a regular message is found).
+
+    Raises:
+        AssertionError if some message ends a scope which doesn't match the
+        one at the top of the stack.
+    """
+    replay_to_original = {
+        "RR": "SR",
+        "RT": "ST",
+        "RE": "SE",
+        "RYR": "YR",
+        "RYFR": "YFR",
+        "RPS": "SPS",
+    }
+    starts = {"ST": "task", "SE": "element", "YR": "element", "YFR": "element"}
+    starts["SPS"] = "process_snapshot"
+    ends = {"ET": "task", "EE": "element", "YS": "element", "YFS": "element"}
+    ends["EPS"] = "process_snapshot"
+
+    root = ScopeNode(None)
+    stack = [root]
+    regular_start_found = False
+    for msg in iter_in:
+        msg_type = msg["message_type"]
+        if msg_type in ("SR", "ST", "SE", "YR", "YFR", "SPS"):
+            regular_start_found = True
+
+        original = replay_to_original.get(msg_type)
+        if original is not None:
+            if regular_start_found:
+                continue
+            msg_type = original
+
+        if msg_type in starts:
+            if msg_type == "SE" and msg["type"] in (
+                "UNTRACKED_GENERATOR",
+                "IF",
+                "ELSE",
+            ):
+                stack[-1].children.append(ScopeNode(msg))
+                continue
+            node = ScopeNode(msg)
+            stack[-1].children.append(node)
+            stack.append(node)
+
+        elif msg_type in ends:
+            if msg_type == "EE" and msg["type"] == "UNTRACKED_GENERATOR":
+                continue
+            assert len(stack) > 1, f"No scope to end with: {msg}"
+            start_msg = stack[-1].msg
+            assert start_msg is not None
+            start_type = replay_to_original.get(
+                start_msg["message_type"], start_msg["message_type"]
+            )
+            assert (
+                starts[start_type] == ends[msg_type]
+            ), f"{msg} does not end: {start_msg}"
+            if msg_type == "EE" and start_type == "SE":
+                # The end element must be from the same thread of the start.
+                assert msg.get("thread_id") == start_msg.get(
+                    "thread_id"
+                ), f"{msg} does not end: {start_msg}"
+            stack.pop()
+
+        else:
+            stack[-1].children.append(ScopeNode(msg))
+
+    return root
@@ -41,3 +41,77 @@ def test_auto_log_config_catch_all() -> None:
 
     # robocorp.log is always excluded.
     assert config.get_filter_kind_by_module_name("robocorp.log") == FilterKind.exclude
+
+
+def test_compiled_filters_same_as_filters_in_order() -> None:
+    from robocorp.log._config import _CompiledFilters, _FiterMatch
+
+    filters: List[Filter] = [
+        Filter("RPA.Browser", kind=FilterKind.full_log),
+        Filter("RPA.*", kind=FilterKind.log_on_project_call),
+        Filter("*RPA*", kind=FilterKind.exclude),
+        Filter("a*b*c", kind=FilterKind.full_log),
+        Filter("a*b*d", kind=FilterKind.exclude),
+        Filter("mod?", kind=FilterKind.full_log),
+        Filter("[xy]mod", kind=FilterKind.exclude),
+        Filter("another", kind=FilterKind.log_on_project_call),
+        Filter("dotted.name", kind=FilterKind.exclude),
+    ]
+    compiled = _CompiledFilters(filters)
+    filter_matches = [_FiterMatch(f) for f in filters]
+
+    def get_filter_kind(module_name):
+        for filter_match in filter_matches:
+            kind = filter_match.get_filter_kind_match(module_name)
+            if kind is not None:
+                return kind
+        return None
+
+    for module_name in [
+        "RPA",
+        "RPA.Browser",
+        "RPA.Browser.Selenium",
+        "RPA.Browser2",
+        "myRPA",
+        "abc",
+        "a.b.c",
+        "aXbYd",
+        "abd",
+        "mod",
+        "mod1",
+        "mod12",
+        "xmod",
+        "zmod",
+        "another",
+        "another.sub",
+        "anothermodule",
+        "dotted",
+        "dotted.name",
+        "dotted.name.sub",
+        "dottedxname",
+        "other",
+    ]:
+        assert compiled.get_filter_kind_match(module_name) == get_filter_kind(
+            module_name
+        ), module_name
+
+    assert _CompiledFilters([]).get_filter_kind_match("any") is None
+
+
+def test_loop_log_policy_accept_iteration() -> None:
+    from robocorp.log import LoopLogPolicy
+
+    def accepted(policy: LoopLogPolicy, size=10):
+        return [i for i in range(10) if policy.accept_iteration(i, size)]
+
+    assert accepted(LoopLogPolicy()) == list(range(10))
+    assert accepted(LoopLogPolicy(first=2)) == [0, 1]
+    assert accepted(LoopLogPolicy(last=2)) == [8, 9]
+    assert accepted(LoopLogPolicy(last=2), size=None) == []
+    assert accepted(LoopLogPolicy(every=4)) == [0, 4, 8]
+    assert accepted(LoopLogPolicy(only_failing=True)) == []
+
+    # Combined.
+    assert accepted(LoopLogPolicy(first=2, last=1)) == [0, 1, 9]
+    assert accepted(LoopLogPolicy(first=1, every=4)) == [0, 4, 8]
+    assert accepted(LoopLogPolicy(first=3, only_failing=True)) == [0, 1, 2]
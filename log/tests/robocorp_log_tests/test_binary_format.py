@@ -0,0 +1,114 @@
+import io
+from pathlib import Path
+
+
+def _run_with_output_format(tmpdir, output_format) -> Path:
+    from imp import reload
+
+    from robocorp_log_tests._resources import check
+    from robocorp_log_tests.fixtures import AutoLogConfigForTest
+
+    from robocorp import log
+
+    log_target = Path(tmpdir.join("log.html"))
+
+    with log.setup_auto_logging(AutoLogConfigForTest()):
+        check = reload(check)
+        with log.add_log_output(
+            tmpdir, log_html=log_target, output_format=output_format
+        ):
+            log.start_run("Root Suite")
+            log.start_task("my_task", "task_mod", __file__, 0)
+            for _i in range(200):
+                check.some_method()
+            log.info("Some message with | pipe and unicode: áéí")
+            log.end_task("my_task", "task_mod", "PASS", "Ok")
+            log.end_run("Root Suite", "PASS")
+
+    return Path(tmpdir)
+
+
+def test_binary_format_id_conversion() -> None:
+    from robocorp.log._binary_format import id_to_int, int_to_id
+    from robocorp.log._robo_output_impl import _gen_id
+
+    gen = _gen_id()
+    for i in range(62 * 62 + 100):
+        oid = next(gen)
+        assert id_to_int(oid) == i
+        assert int_to_id(i) == oid
+
+
+def test_binary_format_round_trip(tmpdir) -> None:
+    from robocorp.log import (
+        iter_decoded_log_format_from_binary_stream,
+        iter_decoded_log_format_from_log_html,
+        iter_decoded_log_format_from_stream,
+    )
+    from robocorp.log._binary_format import (
+        convert_binary_to_text,
+        convert_text_to_binary,
+    )
+
+    text_dir = _run_with_output_format(tmpdir.mkdir("text"), "text")
+    binary_dir = _run_with_output_format(tmpdir.mkdir("binary"), "binary")
+
+    text_robolog = text_dir / "output.robolog"
+    binary_robolog = binary_dir / "output.robolog"
+
+    assert binary_robolog.stat().st_size < text_robolog.stat().st_size * 0.6
+
+    # Text -> binary -> text must give the same contents.
+    text_contents = text_robolog.read_text("utf-8")
+    binary_stream = io.BytesIO()
+    convert_text_to_binary(io.StringIO(text_contents), binary_stream)
+    binary_stream.seek(0)
+    new_text_stream = io.StringIO()
+    convert_binary_to_text(binary_stream, new_text_stream)
+    assert new_text_stream.getvalue() == text_contents
+
+    def only_structure(msgs):
+        ret = []
+        for msg in msgs:
+            if msg["message_type"] in ("T", "ID", "I"):
+                continue
+            msg = msg.copy()
+            msg.pop("time_delta_in_seconds", None)
+            ret.append(msg)
+        return ret
+
+    with text_robolog.open("r", encoding="utf-8") as stream:
+        from_text = list(iter_decoded_log_format_from_stream(stream))
+
+    with binary_robolog.open("rb") as stream:
+        from_binary = list(iter_decoded_log_format_from_binary_stream(stream))
+
+    assert only_structure(from_text) == only_structure(from_binary)
+    assert any(
+        msg.get("message") == "Some message with | pipe and unicode: áéí"
+        for msg in from_binary
+    )
+
+    # The log.html is always in the text format.
+    from_html = list(iter_decoded_log_format_from_log_html(binary_dir / "log.html"))
+    assert only_structure(from_html) == only_structure(from_binary)
+
+
+def test_binary_format_incremental_decoding(tmpdir) -> None:
+    from robocorp.log._decoder import BinaryDecoder
+
+    binary_dir = _run_with_output_format(tmpdir, "binary")
+    contents = (binary_dir / "output.robolog").read_bytes()
+
+    with (binary_dir / "output.robolog").open("rb") as stream:
+        from robocorp.log import iter_decoded_log_format_from_binary_stream
+
+        expected = list(iter_decoded_log_format_from_binary_stream(stream))
+
+    # Feed the contents one byte at a time.
+    decoder = BinaryDecoder()
+    found = []
+    for i in range(len(contents)):
+        found.extend(decoder.feed(contents[i : i + 1]))
+
+    assert found == expected
@@ -41,3 +41,75 @@ I "my-name"
     )
     msgs = list(iter_decoded_log_format(s))
     assert msgs == [{"message_type": "I", "info": "my-name"}]
+
+
+def test_batch_decoder_matches_decoder(tmpdir):
+    from io import StringIO
+    from pathlib import Path
+
+    from robocorp_log_tests._resources import check
+    from robocorp_log_tests.fixtures import AutoLogConfigForTest, basic_log_setup
+
+    from robocorp import log
+    from robocorp.log._decoder import (
+        iter_decoded_log_format,
+        iter_decoded_log_format_in_batches,
+    )
+
+    config = AutoLogConfigForTest()
+    with basic_log_setup(tmpdir, config=config):
+        from imp import reload
+
+        check = reload(check)
+        for _i in range(10):
+            check.some_method()
+        log.info("Some message")
+
+    contents = Path(tmpdir.join("output.robolog")).read_text("utf-8")
+    messages = list(iter_decoded_log_format(StringIO(contents)))
+
+    # Use a small batch so that the memo must be kept across batches.
+    lines = contents.splitlines()
+    line_offset = 0
+    found = []
+    for batch in iter_decoded_log_format_in_batches(
+        StringIO(contents), lines_per_batch=7
+    ):
+        for message_type, columns in batch.items():
+            for i, line_index in enumerate(columns["line_index"]):
+                msg = {"message_type": message_type}
+                for key, column in columns.items():
+                    if key != "line_index" and column[i] is not None:
+                        msg[key] = column[i]
+                found.append((line_offset + line_index, msg))
+        line_offset += 7
+
+    found.sort(key=lambda entry: entry[0])
+    assert len(found) == len(messages)
+    for (line_index, msg), expected in zip(found, messages):
+        expected = dict((k, v) for k, v in expected.items() if v is not None)
+        assert msg == expected, f"Line: {lines[line_index]}"
+    assert {"SE", "EE", "L", "EA", "R"}.issubset(
+        set(m["message_type"] for _, m in found)
+    )
+
+
+def test_batch_decoder_iterates_stream():
+    from robocorp.log._decoder import iter_decoded_log_format_in_batches
+
+    lines_read = []
+
+    class _Stream:
+        def __iter__(self):
+            for i in range(10):
+                lines_read.append(i)
+                yield f'M a{i}:"message {i}"\n'
+
+        def readlines(self):
+            raise AssertionError("The whole stream must not be read at once.")
+
+    it = iter_decoded_log_format_in_batches(_Stream(), lines_per_batch=3)
+    next(it)
+    assert len(lines_read) == 3
+    assert len(list(it)) == 3
+    assert len(lines_read) == 10
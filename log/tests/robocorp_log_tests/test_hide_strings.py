@@ -0,0 +1,76 @@
+def test_hide_strings():
+    from robocorp.log._hide_strings import HideStrings
+
+    hide_strings = HideStrings()
+    assert not hide_strings
+    assert hide_strings.sub("<redacted>", "my secret") == "my secret"
+
+    assert hide_strings.add("secret")
+    assert not hide_strings.add("secret")
+    assert not hide_strings.add("")
+    assert hide_strings.sub("<redacted>", "my secret") == "my <redacted>"
+
+    # The longest match is preferred.
+    hide_strings.add("secret-value")
+    hide_strings.add("sec")
+    assert (
+        hide_strings.sub("<redacted>", "sec secret secret-value secret-v")
+        == "<redacted> <redacted> <redacted> <redacted>-v"
+    )
+
+    # Special chars must be escaped.
+    hide_strings.add("a.b*c(d")
+    hide_strings.add("line1\nline2")
+    assert hide_strings.sub("<redacted>", "a.b*c(d axb*c(d") == "<redacted> axb*c(d"
+    assert hide_strings.sub("<redacted>", "[line1\nline2]") == "[<redacted>]"
+
+    # Checked twice (the 2nd time the result is cached).
+    assert hide_strings.sub("<redacted>", "nothing here") == "nothing here"
+    assert hide_strings.sub("<redacted>", "nothing here") == "nothing here"
+
+    # Adding a new string must invalidate the cache.
+    hide_strings.add("here")
+    assert hide_strings.sub("<redacted>", "nothing here") == "nothing <redacted>"
+    assert len(hide_strings) == 6
+
+
+def test_hide_strings_many():
+    import random
+
+    from robocorp.log._hide_strings import HideStrings
+
+    rand = random.Random(0)
+    secrets = [
+        "".join(rand.choice("abcdef0123") for _ in range(rand.randint(3, 12)))
+        for _ in range(300)
+    ]
+
+    hide_strings = HideStrings()
+    for secret in secrets:
+        hide_strings.add(secret)
+
+    for secret in secrets:
+        message = f"value: {secret}!"
+        assert secret not in hide_strings.sub("<redacted>", message)
+
+
+def test_hide_strings_added_after_use():
+    from robocorp.log._hide_strings import HideStrings
+
+    hide_strings = HideStrings()
+    hide_strings.add("secret")
+    assert hide_strings.sub("<redacted>", "my secret") == "my <redacted>"
+
+    # Strings added after the pattern is created (which overlap with the
+    # existing ones) must still be fully hidden.
+    hide_strings.add("sec")
+    hide_strings.add("cretive")
+    assert (
+        hide_strings.sub("<redacted>", "sec secret secretive x")
+        == "<redacted> <redacted> <redacted> x"
+    )
+
+    for i in range(100):
+        hide_strings.add(f"value-{i}-")
+        assert hide_strings.sub("*", f"a value-{i}- b") == "a * b"
+    assert hide_strings.sub("*", "value-3-value-99-") == "**"
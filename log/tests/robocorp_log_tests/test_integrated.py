@@ -164,6 +164,43 @@ def test_log_with_for_loop_and_exception_inside_for(
     # setup_info.open_log_target()
 
 
+def test_log_with_loop_log_policy(tmpdir, ui_regenerate, str_regression):
+    import re
+
+    from robocorp.log import LoopLogPolicy
+
+    config = AutoLogConfigForTest(
+        loop_log_policies=[
+            LoopLogPolicy(loop="for *", first=1, last=1),
+            LoopLogPolicy(loop="while *", only_failing=True, every=2),
+        ]
+    )
+    with basic_log_setup(tmpdir, config=config) as setup_info:
+        reload(check_iterators).for_with_loop_log_policy()
+
+    log_target = setup_info.log_target
+    assert log_target.exists()
+    contents = pretty_format_logs_from_log_html(log_target)
+    contents = re.sub(r"skipped_time: [\d.]+s", "skipped_time: <time>", contents)
+    str_regression.check(contents)
+
+
+def test_log_with_assign_log_policy(tmpdir, ui_regenerate, str_regression):
+    from robocorp.log import AssignLogPolicy
+
+    config = AutoLogConfigForTest(
+        assign_log_policies=[
+            AssignLogPolicy(function="compute_*", max_per_call=4, only_on_change=True),
+        ]
+    )
+    with basic_log_setup(tmpdir, config=config) as setup_info:
+        reload(check_iterators).assigns_with_assign_log_policy()
+
+    log_target = setup_info.log_target
+    assert log_target.exists()
+    str_regression.check(pretty_format_logs_from_log_html(log_target))
+
+
 def test_exception_suppress_variables(tmpdir, ui_regenerate, str_regression):
     __tracebackhide__ = 1
     config = AutoLogConfigForTest()
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+
+
+def test_stack_id_in_asyncio_tasks():
+    from robocorp.log._stack_id import get_current_stack_id
+
+    thread_id = threading.get_ident()
+    assert get_current_stack_id() == thread_id
+
+    async def child():
+        stack_id = get_current_stack_id()
+        await asyncio.sleep(0)
+        # The id is kept for the whole task.
+        assert get_current_stack_id() == stack_id
+        return stack_id
+
+    async def main():
+        # The first task uses the stack of the thread which started it.
+        stack_id = get_current_stack_id()
+        child_ids = await asyncio.gather(child(), child())
+        return stack_id, child_ids
+
+    main_stack_id, child_ids = asyncio.run(main())
+    assert main_stack_id == thread_id
+    assert len(set(child_ids)) == 2
+    assert thread_id not in child_ids
+
+    # After the task finishes the stack of the thread may be used by a new task.
+    main_stack_id, _child_ids = asyncio.run(main())
+    assert main_stack_id == thread_id
+
+
+def test_log_asyncio_tasks(tmpdir):
+    from imp import reload
+    from pathlib import Path
+
+    from robocorp_log_tests._resources import check_async
+    from robocorp_log_tests.fixtures import AutoLogConfigForTest, basic_log_setup
+
+    from robocorp.log import iter_decoded_log_format_from_stream
+
+    config = AutoLogConfigForTest()
+    with basic_log_setup(tmpdir, config=config):
+        check_async = reload(check_async)
+        assert check_async.run_main() == [["a-0", "a-1"], ["b-0", "b-1"]]
+
+    stack_id_to_depth = {}
+    stack_id_to_names = {}
+    main_stack_id = threading.get_ident()
+    suspended = []
+    for f in sorted(Path(tmpdir).glob("*.robolog")):
+        with f.open("r") as stream:
+            for msg in iter_decoded_log_format_from_stream(stream):
+                msg_type = msg["message_type"]
+                # Errors would be logged if the stack wasn't properly tracked.
+                assert msg_type != "L", msg
+
+                if msg_type in ("SE", "EE"):
+                    stack_id = msg.get("thread_id", main_stack_id)
+                    delta = -1 if msg_type == "EE" else 1
+                    depth = stack_id_to_depth.get(stack_id, 0) + delta
+                    assert depth >= 0
+                    stack_id_to_depth[stack_id] = depth
+                    if msg_type == "SE":
+                        stack_id_to_names.setdefault(stack_id, []).append(msg["name"])
+
+                elif msg_type in ("YFS", "YFR"):
+                    # Each `await` is logged as a suspend/resume.
+                    suspended.append((msg_type, msg["name"]))
+
+    # All the elements are finished.
+    assert all(depth == 0 for depth in stack_id_to_depth.values())
+
+    # Each task created by `gather` has its own stack.
+    assert len(stack_id_to_names) == 3
+    assert stack_id_to_names.pop(main_stack_id) == ["run_main", "main"]
+    for names in stack_id_to_names.values():
+        assert names[0] == "fetch"
+        assert names.count("process") == 2
+
+    assert ("YFS", "main") in suspended
+    assert ("YFR", "main") in suspended
+    assert suspended.count(("YFS", "process")) == 4
+
+
+def test_log_html_tree_with_asyncio_gather(tmpdir):
+    from imp import reload
+
+    from robocorp_log_tests._resources import check_async
+    from robocorp_log_tests.fixtures import (
+        AutoLogConfigForTest,
+        basic_log_setup,
+        build_scope_tree_from_iter,
+    )
+
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    config = AutoLogConfigForTest()
+    with basic_log_setup(tmpdir, config=config) as setup_info:
+        check_async = reload(check_async)
+        assert check_async.run_main_interleaved() == [["a-0", "a-1"], ["b-0", "b-1"]]
+
+    # The viewer uses a single stack of scopes: the elements of the tasks
+    # created by `gather` (which run interleaved) must not be mixed.
+    tree = build_scope_tree_from_iter(
+        iter_decoded_log_format_from_log_html(setup_info.log_target)
+    )
+    (task,) = [node for node in tree.children if node.msg["message_type"] == "ST"]
+
+    (run_main,) = [
+        node
+        for node in task.children
+        if node.msg["message_type"] == "SE"
+        and node.msg["name"] == "run_main_interleaved"
+    ]
+
+    # Each `await` which suspends a task finishes the scope of its elements
+    # (and the scope is restarted when resumed), so, each entry is a block
+    # with the elements of a single task.
+    stack_id_to_names = {}
+    for node in run_main.children:
+        if node.msg["message_type"] not in ("SE", "YFR"):
+            continue
+        stack_ids = set(
+            descendant.msg.get("thread_id")
+            for descendant in node.iter_descendants()
+            if descendant.msg["message_type"] == "SE"
+        )
+        if node.msg["message_type"] == "SE":
+            stack_ids.add(node.msg.get("thread_id"))
+        assert len(stack_ids) <= 1, f"Elements of different tasks mixed in: {node}"
+        if stack_ids:
+            (stack_id,) = stack_ids
+            names = stack_id_to_names.setdefault(stack_id, [])
+            names.append(node.msg["name"])
+            names.extend(
+                descendant.msg["name"]
+                for descendant in node.iter_descendants()
+                if descendant.msg["message_type"] == "SE"
+            )
+
+    # Each task created by `gather` has its own stack.
+    assert stack_id_to_names.pop(None) == ["main_interleaved"]
+    assert len(stack_id_to_names) == 2
+    for stack_id, names in stack_id_to_names.items():
+        assert stack_id < 0
+        assert names[0] == "fetch"
+        assert names.count("process") == 2
@@ -14,16 +14,17 @@ def test_log_and_threads(tmpdir):
     with basic_log_setup(tmpdir, config=config) as setup_info:
         check = reload(check)
 
+        thread_ids = []
+
         def run_in_thread():
-            # This won't be logged (in auto-logging we check that logging
-            # from threads aren't logged).
+            thread_ids.append(threading.get_ident())
+
+            # Elements started from threads have the thread id.
             check.some_method()
 
-            # This won't be logged either because it's not in the main thread.
             log.critical("critical in log")
 
-            # This is a special case though because we want to be able to request
-            # a process snapshot from any thread.
+            # A process snapshot can be requested from any thread.
             log.process_snapshot()
 
         t = threading.Thread(target=run_in_thread)
@@ -36,6 +37,16 @@ def test_log_and_threads(tmpdir):
     verify_log_messages_from_log_html(
         log_target,
         [
+            {
+                "message_type": "SE",
+                "name": "some_method",
+                "thread_id": thread_ids[0],
+            },
+            {
+                "message_type": "EE",
+                "thread_id": thread_ids[0],
+            },
+            {"message_type": "L", "level": "E", "message": "critical in log"},
             {
                 "message_type": "SPS",  # Start process snapshot
             },
@@ -47,5 +58,184 @@ def test_log_and_threads(tmpdir):
                 "message_type": "STD",
             },
         ],
-        [{"message_type": "L", "level": "E"}],
+        # Note: the critical message from the thread is expected.
+        not_expected=(),
+    )
+
+
+def test_log_concurrent_threads(tmpdir):
+    from imp import reload
+    from pathlib import Path
+
+    from robocorp_log_tests._resources import check
+    from robocorp_log_tests.fixtures import AutoLogConfigForTest, basic_log_setup
+
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_stream
+
+    config = AutoLogConfigForTest()
+    with basic_log_setup(tmpdir, max_file_size="20kb", max_files=100, config=config):
+        check = reload(check)
+
+        barrier = threading.Barrier(4)
+
+        def run_in_thread():
+            barrier.wait()
+            for i in range(100):
+                check.some_method()
+                log.info(f"message {i}")
+
+        threads = [threading.Thread(target=run_in_thread) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    files = sorted(Path(tmpdir).glob("*.robolog"))
+    assert len(files) > 1
+
+    main_thread_id = threading.get_ident()
+    for f in files:
+        # Each file must be consistent by itself: for each thread the number
+        # of started/restarted elements must match the ended ones (or be more
+        # if the file was rotated while the element was running).
+        thread_id_to_depth = {}
+        with f.open("r") as stream:
+            for msg in iter_decoded_log_format_from_stream(stream):
+                if msg["message_type"] in ("SE", "RE", "EE"):
+                    thread_id = msg.get("thread_id", main_thread_id)
+                    assert thread_id != main_thread_id
+                    delta = -1 if msg["message_type"] == "EE" else 1
+                    depth = thread_id_to_depth.get(thread_id, 0) + delta
+                    assert depth >= 0
+                    thread_id_to_depth[thread_id] = depth
+
+    # All the elements are finished in the last file.
+    assert all(depth == 0 for depth in thread_id_to_depth.values())
+
+    log_messages = []
+    for f in files:
+        with f.open("r") as stream:
+            for msg in iter_decoded_log_format_from_stream(stream):
+                if msg["message_type"] == "L":
+                    log_messages.append(msg["message"])
+    assert len(log_messages) == 400
+
+
+def test_log_html_tree_with_concurrent_threads(tmpdir):
+    from imp import reload
+
+    from robocorp_log_tests._resources import check
+    from robocorp_log_tests.fixtures import (
+        AutoLogConfigForTest,
+        basic_log_setup,
+        build_scope_tree_from_iter,
+    )
+
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    config = AutoLogConfigForTest()
+    with basic_log_setup(tmpdir, config=config) as setup_info:
+        check = reload(check)
+
+        barrier = threading.Barrier(4)
+
+        def run_in_thread():
+            barrier.wait()
+            for i in range(20):
+                check.some_method()
+                log.info(f"message {i}")
+
+        threads = [threading.Thread(target=run_in_thread) for _ in range(4)]
+        for t in threads:
+            t.start()
+
+        # Elements in the main thread while the threads are running.
+        for i in range(20):
+            check.some_method()
+
+        for t in threads:
+            t.join()
+
+    # The viewer uses a single stack of scopes: the elements of the threads
+    # must not be interleaved (note: an element of a thread is written as a
+    # block when it finishes, so, it may be inside an element of the main
+    # thread, but never inside an element of another thread).
+    tree = build_scope_tree_from_iter(
+        iter_decoded_log_format_from_log_html(setup_info.log_target)
+    )
+    (task,) = [node for node in tree.children if node.msg["message_type"] == "ST"]
+    some_method_nodes = [
+        node
+        for node in task.iter_descendants()
+        if node.msg["message_type"] == "SE" and node.msg["name"] == "some_method"
+    ]
+    assert len(some_method_nodes) == 100
+
+    main_thread_id = threading.get_ident()
+    for node in some_method_nodes:
+        thread_id = node.msg.get("thread_id", main_thread_id)
+        same_thread_children = []
+        for child in node.children:
+            if child.msg["message_type"] == "SE":
+                child_thread_id = child.msg.get("thread_id", main_thread_id)
+                if child_thread_id == thread_id:
+                    same_thread_children.append(child)
+                else:
+                    # Only the elements of the main thread may have elements
+                    # from other threads inside.
+                    assert thread_id == main_thread_id
+
+        (call_another_method,) = same_thread_children
+        assert call_another_method.msg["name"] == "call_another_method"
+
+    log_messages = [
+        node.msg["message"]
+        for node in task.iter_descendants()
+        if node.msg["message_type"] == "L"
+    ]
+    assert len(log_messages) == 80
+
+
+def test_log_thread_element_with_too_many_messages(tmpdir):
+    from imp import reload
+
+    from robocorp_log_tests._resources import check
+    from robocorp_log_tests.fixtures import (
+        AutoLogConfigForTest,
+        basic_log_setup,
+        build_scope_tree_from_iter,
+    )
+
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    config = AutoLogConfigForTest()
+    with basic_log_setup(tmpdir, config=config) as setup_info:
+        check = reload(check)
+
+        with log._get_logger_instances() as logger_instances:
+            robo_logger = next(iter(logger_instances))
+        robo_logger.robot_output_impl._max_pending_messages_per_stack = 10
+
+        t = threading.Thread(target=check.recurse_some_method)
+        t.start()
+        t.join()
+
+        t = threading.Thread(target=check.some_method)
+        t.start()
+        t.join()
+
+    tree = build_scope_tree_from_iter(
+        iter_decoded_log_format_from_log_html(setup_info.log_target)
     )
+    (task,) = [node for node in tree.children if node.msg["message_type"] == "ST"]
+    nodes = [node for node in task.children if node.msg["message_type"] in ("SE", "L")]
+    # The element with too many messages is dropped (the other is still
+    # logged).
+    assert len(nodes) == 2
+    assert nodes[0].msg["message_type"] == "L"
+    assert nodes[0].msg["level"] == "W"
+    assert "were dropped" in nodes[0].msg["message"]
+    assert nodes[1].msg["name"] == "some_method"
@@ -40,12 +40,12 @@ def test_log_api(tmpdir, str_regression) -> None:
                     # This one will appear in both
                     log.critical("msg-critical")
 
-            # Calls from thread won't appear in the auto-logging right now.
+            # Calls from threads are also logged (each thread has its own stack).
             t = threading.Thread(target=check.some_method, args=())
             t.start()
             t.join(10)
 
-            t = threading.Thread(target=log.info, args=("SHOULD NOT APPEAR",))
+            t = threading.Thread(target=log.info, args=("Message from thread",))
             t.start()
             t.join(10)
 
@@ -95,3 +95,65 @@ def test_log_api_without_with_statments(tmpdir) -> None:
         verify_log_messages_from_log_html(log_target, [dict(message_type="SE")], [])
     finally:
         ctx.__exit__(None, None, None)
+
+
+def test_log_is_enabled(tmpdir) -> None:
+    from robocorp import log
+
+    class NotExpectedToBeConverted:
+        def __str__(self):
+            raise AssertionError("Message should not be formatted.")
+
+    # No log output and only critical is shown in the output by default.
+    assert not log.is_enabled("debug")
+    assert not log.is_enabled(log.FilterLogLevel.INFO)
+    assert log.is_enabled("critical")
+    assert not log.is_enabled("none")
+
+    # The message must not be formatted if it's not accepted anywhere.
+    log.debug(NotExpectedToBeConverted())
+
+    with log.add_in_memory_log_output(lambda msg: None):
+        assert log.is_enabled("debug")
+
+        with log.setup_log(log_level="warn"):
+            assert not log.is_enabled("debug")
+            assert not log.is_enabled("info")
+            assert log.is_enabled("warn")
+            log.info(NotExpectedToBeConverted())
+
+            with log.setup_log(output_log_level="info"):
+                assert log.is_enabled("info")
+
+    assert not log.is_enabled("debug")
+
+
+def test_log_bounded_value_memo(tmpdir) -> None:
+    from pathlib import Path
+
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_stream
+
+    messages = ["message a", "message b", "message c", "message a", "message c"]
+    with log.add_log_output(tmpdir, max_value_memo_size=2):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        for message in messages:
+            log.info(message)
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    with Path(tmpdir.join("output.robolog")).open("r") as stream:
+        contents = stream.read()
+        stream.seek(0)
+        found = [
+            msg["message"]
+            for msg in iter_decoded_log_format_from_stream(stream)
+            if msg["message_type"] == "L"
+        ]
+    assert found == messages
+
+    # "message a" was forgotten (so, it's written again) and "message c"
+    # was still in the memo.
+    assert contents.count('"message a"') == 2
+    assert contents.count('"message c"') == 1
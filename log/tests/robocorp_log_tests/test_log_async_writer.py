@@ -0,0 +1,75 @@
+from pathlib import Path
+
+
+def _iter_messages(tmpdir):
+    from robocorp.log import iter_decoded_log_format_from_stream
+
+    for f in sorted(Path(tmpdir).glob("*.robolog")):
+        with f.open("r") as stream:
+            yield from iter_decoded_log_format_from_stream(stream)
+
+
+def test_log_async_writer(tmpdir) -> None:
+    from robocorp import log
+
+    with log.add_log_output(tmpdir, async_writer=True):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        for i in range(100):
+            log.info(f"message {i}")
+
+        try:
+            raise RuntimeError("some error")
+        except RuntimeError:
+            log.exception()
+
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    # All the contents must be written when the output is closed.
+    messages = list(_iter_messages(tmpdir))
+    log_messages = [m["message"] for m in messages if m["message_type"] == "L"]
+    assert log_messages[:100] == [f"message {i}" for i in range(100)]
+
+    message_types = [m["message_type"] for m in messages]
+    assert message_types.index("STB") > message_types.index("ST")
+    assert message_types.index("STB") < message_types.index("ET")
+    assert message_types[-2:] == ["ET", "ER"]
+
+
+def test_log_async_writer_drop(tmpdir) -> None:
+    from robocorp import log
+    from robocorp.log._robo_output_async import _AsyncRoboOutputImpl
+
+    with log.add_log_output(
+        tmpdir,
+        async_writer=True,
+        async_max_queue_size=1,
+        async_overflow_policy="drop",
+    ):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+
+        with log._get_logger_instances() as logger_instances:
+            robo_logger = next(iter(logger_instances))
+        impl = robo_logger.robot_output_impl
+        assert isinstance(impl, _AsyncRoboOutputImpl)
+
+        # Hold the lock so that the writer can't consume the queue.
+        with impl._impl_lock:
+            for i in range(10):
+                log.info(f"message {i}")
+            log.end_task("my_task", "task_mod", "PASS", "Ok")
+
+        log.end_run("Root Suite", "PASS")
+
+    messages = list(_iter_messages(tmpdir))
+    message_types = [m["message_type"] for m in messages]
+
+    # The end task must not be dropped.
+    assert "ET" in message_types
+    assert "ER" in message_types
+
+    log_messages = [m["message"] for m in messages if m["message_type"] == "L"]
+    assert len(log_messages) < 11
+    assert any("were dropped" in m for m in log_messages)
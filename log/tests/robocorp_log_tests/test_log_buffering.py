@@ -0,0 +1,79 @@
+import time
+from pathlib import Path
+
+
+def _read_contents(tmpdir) -> str:
+    return Path(tmpdir.join("output.robolog")).read_text("utf-8")
+
+
+def test_log_buffering_flush_threshold(tmpdir) -> None:
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_stream
+
+    with log.add_log_output(tmpdir, flush_threshold="1MB"):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        log.info("some message")
+
+        # Just the initial contents (flushed when the file is initially created).
+        assert "some message" not in _read_contents(tmpdir)
+
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+
+        # Ending a task forces a flush.
+        assert "some message" in _read_contents(tmpdir)
+
+        log.start_task("my_task2", "task_mod", __file__, 0)
+        log.info("another message")
+        assert "another message" not in _read_contents(tmpdir)
+
+    # Closing must flush everything.
+    contents = _read_contents(tmpdir)
+    assert "another message" in contents
+
+    with Path(tmpdir.join("output.robolog")).open("r") as stream:
+        message_types = [
+            msg["message_type"]
+            for msg in iter_decoded_log_format_from_stream(stream)
+        ]
+    assert message_types.count("ST") == 2
+    assert message_types.count("ET") == 1
+
+
+def test_log_buffering_flush_interval(tmpdir) -> None:
+    from robocorp import log
+
+    with log.add_log_output(tmpdir, flush_threshold="1MB", flush_interval=0.05):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        log.info("some message")
+
+        timeout_at = time.time() + 5
+        while "some message" not in _read_contents(tmpdir):
+            assert time.time() < timeout_at, "Contents not flushed by timer."
+            time.sleep(0.02)
+
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+
+def test_log_buffering_rotation(tmpdir) -> None:
+    from robocorp import log
+
+    with log.add_log_output(
+        tmpdir,
+        max_file_size="10kb",
+        max_files=3,
+        min_messages_per_file=10,
+        flush_threshold="4kb",
+    ):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        for i in range(2000):
+            log.info(f"message {i}")
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    files = sorted(Path(tmpdir).glob("*.robolog"))
+    assert len(files) == 3, f"Found: {files}"
+    assert any("message 1999" in f.read_text("utf-8") for f in files)
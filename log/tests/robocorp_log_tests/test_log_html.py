@@ -0,0 +1,256 @@
+import base64
+import zlib
+from ast import literal_eval
+from pathlib import Path
+
+
+def _get_chunks(log_html: Path) -> list:
+    txt = log_html.read_text(encoding="utf-8")
+    i = txt.find("let chunks = [")
+    j = txt.find("];", i)
+    return literal_eval(txt[i + len("let chunks = ") : j + 1])
+
+
+def test_log_html_single_stream_per_file(tmpdir) -> None:
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    log_target = Path(tmpdir.join("log.html"))
+    with log.add_log_output(
+        tmpdir,
+        max_file_size="10kb",
+        max_files=3,
+        min_messages_per_file=10,
+        log_html=log_target,
+    ):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        for i in range(2000):
+            log.info(f"message {i}")
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    # i.e.: output_13.robolog, output_14.robolog, output_15.robolog
+    files = sorted(
+        Path(tmpdir).glob("*.robolog"), key=lambda p: int(p.stem.split("_")[-1])
+    )
+    assert len(files) == 3
+
+    chunks = _get_chunks(log_target)
+    assert len(chunks) == 3
+    for file_chunks, f in zip(chunks, files):
+        decompressor = zlib.decompressobj()
+        contents = b"".join(
+            decompressor.decompress(base64.b64decode(c)) for c in file_chunks
+        )
+        assert decompressor.eof
+        assert contents == f.read_bytes()
+
+    messages = [
+        msg["message"]
+        for msg in iter_decoded_log_format_from_log_html(log_target)
+        if msg["message_type"] == "L"
+    ]
+    assert messages[-1] == "message 1999"
+
+
+def test_log_html_read_independent_chunks(tmpdir) -> None:
+    # The log.html from older versions had each chunk compressed independently.
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    contents = b'V 0.0.2\nM a:"Root Suite"\nSR a|0.1\nM b:"PASS"\nER b|0.2\n'
+    chunks = [
+        base64.b64encode(zlib.compress(contents[:20])).decode("ascii"),
+        base64.b64encode(zlib.compress(contents[20:])).decode("ascii"),
+    ]
+    log_target = Path(tmpdir.join("log.html"))
+    log_target.write_text(
+        "<script>\nlet chunks = [" + ",".join(f'"{c}"' for c in chunks) + "];\n"
+    )
+
+    message_types = [
+        msg["message_type"] for msg in iter_decoded_log_format_from_log_html(log_target)
+    ]
+    assert message_types == ["V", "SR", "ER"]
+
+
+def test_log_html_incremental(tmpdir) -> None:
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    def get_log_messages():
+        return [
+            msg["message"]
+            for msg in iter_decoded_log_format_from_log_html(log_target)
+            if msg["message_type"] == "L"
+        ]
+
+    log_target = Path(tmpdir.join("log.html"))
+    with log.add_log_output(
+        tmpdir,
+        max_file_size="10kb",
+        max_files=2,
+        min_messages_per_file=10,
+        log_html=log_target,
+        log_html_refresh_interval=0,
+    ):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        log.info("message in task 1")
+        assert not log_target.exists()
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+
+        # The log.html must be available after the task finishes.
+        assert get_log_messages() == ["message in task 1"]
+
+        log.start_task("my_task2", "task_mod", __file__, 0)
+        for i in range(1000):
+            log.info(f"message {i}")
+
+        # Some rotations happened: the log.html is updated on rotation.
+        messages = get_log_messages()
+        assert "message in task 1" not in messages  # Removed (max_files=2).
+        assert len(messages) > 10
+        last_message_on_rotation = messages[-1]
+
+        log.end_task("my_task2", "task_mod", "PASS", "Ok")
+        messages = get_log_messages()
+        assert messages[-1] == "message 999"
+        assert last_message_on_rotation in messages
+
+        log.end_run("Root Suite", "PASS")
+
+    assert get_log_messages()[-1] == "message 999"
+    assert not list(Path(tmpdir).glob("*.tmp"))
+
+
+def test_log_html_refresh_timer(tmpdir) -> None:
+    import time
+
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    def get_log_messages():
+        return [
+            msg["message"]
+            for msg in iter_decoded_log_format_from_log_html(log_target)
+            if msg["message_type"] == "L"
+        ]
+
+    log_target = Path(tmpdir.join("log.html"))
+    with log.add_log_output(
+        tmpdir,
+        log_html=log_target,
+        log_html_refresh_interval=0.05,
+    ):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        log.info("message in task")
+
+        # The task didn't finish, but the log.html is updated by the timer.
+        timeout_at = time.time() + 5
+        while not log_target.exists() or get_log_messages() != ["message in task"]:
+            assert time.time() < timeout_at, "log.html not updated by the timer."
+            time.sleep(0.05)
+
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    assert get_log_messages() == ["message in task"]
+
+
+def test_log_html_incremental_binary(tmpdir) -> None:
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    log_target = Path(tmpdir.join("log.html"))
+    with log.add_log_output(
+        tmpdir,
+        log_html=log_target,
+        log_html_refresh_interval=0,
+        output_format="binary",
+    ):
+        log.start_run("Root Suite")
+        for i in range(3):
+            log.start_task(f"my_task{i}", "task_mod", __file__, 0)
+            log.info(f"message {i}")
+            log.end_task(f"my_task{i}", "task_mod", "PASS", "Ok")
+
+            messages = [
+                msg["message"]
+                for msg in iter_decoded_log_format_from_log_html(log_target)
+                if msg["message_type"] == "L"
+            ]
+            assert messages == [f"message {j}" for j in range(i + 1)]
+        log.end_run("Root Suite", "PASS")
+
+
+def test_create_log_html(tmpdir) -> None:
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    robolog_files = []
+    for i in range(2):
+        output_dir = Path(tmpdir.join(f"output_{i}"))
+        with log.add_log_output(output_dir):
+            log.start_run(f"Run {i}")
+            log.start_task(f"my_task{i}", "task_mod", __file__, 0)
+            log.info(f"message {i}")
+            log.end_task(f"my_task{i}", "task_mod", "PASS", "Ok")
+            log.end_run(f"Run {i}", "PASS")
+        robolog_files.append(output_dir / "output.robolog")
+
+    log_target = Path(tmpdir.join("log.html"))
+    log.create_log_html(log_target, robolog_files)
+
+    assert len(_get_chunks(log_target)) == 2
+    messages = [
+        (msg["message_type"], msg["message"] if "message" in msg else msg["name"])
+        for msg in iter_decoded_log_format_from_log_html(log_target)
+        if msg["message_type"] in ("SR", "L")
+    ]
+    assert messages == [
+        ("SR", "Run 0"),
+        ("L", "message 0"),
+        ("SR", "Run 1"),
+        ("L", "message 1"),
+    ]
+
+
+def test_log_html_compression_options(tmpdir) -> None:
+    import pytest
+
+    from robocorp import log
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    with pytest.raises(ValueError):
+        log.add_log_output(tmpdir, log_html_compression_level=10)
+
+    with pytest.raises(ValueError):
+        log.add_log_output(tmpdir, log_html_chunk_size="0")
+
+    log_target = Path(tmpdir.join("log.html"))
+    with log.add_log_output(
+        tmpdir,
+        log_html=log_target,
+        log_html_compression_level=0,
+        log_html_chunk_size="1kb",
+    ):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        for i in range(200):
+            log.info(f"message {i}")
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    (robolog,) = Path(tmpdir).glob("*.robolog")
+    (file_chunks,) = _get_chunks(log_target)
+    # Level 0 means no compression (stored blocks).
+    assert sum(len(base64.b64decode(c)) for c in file_chunks) > robolog.stat().st_size
+
+    messages = [
+        msg["message"]
+        for msg in iter_decoded_log_format_from_log_html(log_target)
+        if msg["message_type"] == "L"
+    ]
+    assert messages[-1] == "message 199"
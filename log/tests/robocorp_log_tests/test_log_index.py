@@ -0,0 +1,155 @@
+import pytest
+
+
+def _log_element(name: str, message: str) -> None:
+    from robocorp import log
+
+    with log._get_logger_instances() as logger_instances:
+        for robo_logger in logger_instances:
+            robo_logger.start_element(
+                name, "element_mod", __file__, 0, "METHOD", "", []
+            )
+
+    log.info(message)
+
+    with log._get_logger_instances() as logger_instances:
+        for robo_logger in logger_instances:
+            robo_logger.end_method("METHOD", name, "element_mod", "PASS")
+
+
+@pytest.mark.parametrize("output_format", ["text", "binary"])
+def test_log_index(tmpdir, output_format) -> None:
+    from pathlib import Path
+
+    from robocorp import log
+
+    with log.add_log_output(
+        tmpdir,
+        max_file_size="10kb",
+        max_files=100,
+        min_messages_per_file=10,
+        output_format=output_format,
+        write_index=True,
+    ):
+        log.start_run("Root Suite")
+        for task_i in range(4):
+            log.start_task(f"task_{task_i}", "task_mod", __file__, 0)
+            for i in range(200):
+                _log_element(f"element_{i}", f"task {task_i} message {i}")
+            log.end_task(f"task_{task_i}", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    robolog_files = list(Path(tmpdir).glob("*.robolog"))
+    assert len(robolog_files) > 4
+
+    index = log.load_log_index(tmpdir)
+    assert len(index) == len(robolog_files)
+    assert [i["part"] for i in index] == list(range(1, len(robolog_files) + 1))
+
+    prev_end = 0.0
+    for file_index in index:
+        assert file_index["start_time_delta"] >= prev_end
+        assert file_index["end_time_delta"] >= file_index["start_time_delta"]
+        prev_end = file_index["start_time_delta"]
+
+    # Tasks spanning multiple files appear in each of those files.
+    task_1_files = [i for i in index if any(t["name"] == "task_1" for t in i["tasks"])]
+    assert len(task_1_files) > 1
+    assert any(t["restarted"] for t in task_1_files[-1]["tasks"])
+
+    messages = list(log.iter_decoded_log_format_from_index(tmpdir, task_name="task_1"))
+    log_messages = [m["message"] for m in messages if m["message_type"] == "L"]
+    assert log_messages == [f"task 1 message {i}" for i in range(200)]
+    assert messages[-1]["message_type"] == "ET"
+
+    # Time windows.
+    last_task_start = index[-1]["tasks"][-1]["time_delta"]
+    messages = list(
+        log.iter_decoded_log_format_from_index(tmpdir, start_time_delta=last_task_start)
+    )
+    assert messages[-1]["message_type"] == "ER"
+    log_messages = [m["message"] for m in messages if m["message_type"] == "L"]
+    assert "task 3 message 199" in log_messages
+    assert "task 0 message 0" not in log_messages
+
+
+def test_log_index_rotated_files_removed(tmpdir) -> None:
+    from pathlib import Path
+
+    from robocorp import log
+
+    with log.add_log_output(
+        tmpdir,
+        max_file_size="10kb",
+        max_files=2,
+        min_messages_per_file=10,
+        write_index=True,
+    ):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        for i in range(1000):
+            _log_element("element", f"message {i}")
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    assert len(list(Path(tmpdir).glob("*.robolog"))) == 2
+    assert len(list(Path(tmpdir).glob("*.robolog.index"))) == 2
+    assert len(log.load_log_index(tmpdir)) == 2
+
+
+def test_log_index_not_written_by_default(tmpdir) -> None:
+    from pathlib import Path
+
+    from robocorp import log
+
+    with log.add_log_output(tmpdir):
+        log.start_run("Root Suite")
+        log.start_task("my_task", "task_mod", __file__, 0)
+        _log_element("element", "message")
+        log.end_task("my_task", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    assert len(list(Path(tmpdir).glob("*.robolog"))) == 1
+    assert not list(Path(tmpdir).glob("*.robolog.index"))
+
+
+def test_log_index_reads_only_memo_before_offset(tmpdir) -> None:
+    from pathlib import Path
+
+    from robocorp import log
+
+    with log.add_log_output(tmpdir, write_index=True):
+        log.start_run("Root Suite")
+        for task_i in range(2):
+            log.start_task(f"task_{task_i}", "task_mod", __file__, 0)
+            for i in range(5):
+                _log_element(f"element_{i}", f"task {task_i} message {i}")
+            log.end_task(f"task_{task_i}", "task_mod", "PASS", "Ok")
+        log.end_run("Root Suite", "PASS")
+
+    (index,) = log.load_log_index(tmpdir)
+    task_1_offset = index["tasks"][1]["offset"]
+
+    # Make everything before the task which isn't a memo message unreadable
+    # (the memo messages are at the ranges in the index and the other
+    # contents must not be read at all).
+    robolog = Path(index["robolog_path"])
+    contents = bytearray(robolog.read_bytes())
+    keep = bytearray(len(contents))
+    for start, end in index["memo_ranges"]:
+        keep[start:end] = b"\x01" * (end - start)
+    for i in range(task_1_offset):
+        if not keep[i]:
+            contents[i] = ord("x")
+    robolog.write_bytes(bytes(contents))
+
+    messages = list(log.iter_decoded_log_format_from_index(tmpdir, task_name="task_1"))
+    assert not [m for m in messages if "error" in m]
+    assert messages[0]["message_type"] == "ST"
+    assert messages[0]["name"] == "task_1"
+    log_messages = [m["message"] for m in messages if m["message_type"] == "L"]
+    assert log_messages == [f"task 1 message {i}" for i in range(5)]
+    element_names = [m["name"] for m in messages if m["message_type"] == "SE"]
+    assert element_names == [f"element_{i}" for i in range(5)]
+    assert messages[-1]["message_type"] == "ET"
+    assert messages[-1]["status"] == "PASS"
@@ -58,3 +58,40 @@ def test_rotate_logs(tmpdir, str_regression) -> None:
 
     # Depending on the times printed it may break a bit different.
     # str_regression.check(pretty_format_logs_from_log_html(log_target))
+
+
+def test_rotate_logs_locations_rewritten(tmpdir) -> None:
+    from imp import reload
+    from pathlib import Path
+
+    from robocorp_log_tests._resources import check
+
+    from robocorp import log as robolog
+    from robocorp.log import iter_decoded_log_format_from_stream
+
+    with robolog.setup_auto_logging():
+        check = reload(check)
+
+        with robolog.add_log_output(
+            tmpdir, max_file_size="10kb", max_files=3, min_messages_per_file=10
+        ):
+            robolog.start_run("Root Suite")
+            robolog.start_task("my_task", "task_mod", __file__, 0)
+
+            check.recurse_some_method()
+
+            robolog.end_task("my_task", "task_mod", "PASS", "Ok")
+            robolog.end_run("Root Suite", "PASS")
+
+    files = tuple(Path(tmpdir).glob("*.robolog"))
+    assert len(files) == 3, f"Found: {files}"
+
+    # The location of the (auto-logged) methods is cached by the output, so,
+    # check that each file has the locations it references.
+    for f in files:
+        names = set()
+        with f.open("r") as stream:
+            for msg in iter_decoded_log_format_from_stream(stream):
+                if msg["message_type"] == "SE":
+                    names.add(msg["name"])
+        assert "call_another_method" in names, f"Found: {names} in {f.name}"
@@ -0,0 +1,120 @@
+import collections
+
+import pytest
+
+
+def test_bounded_repr_same_as_repr():
+    from robocorp.log._obj_info_repr import bounded_repr
+
+    recursive_list: list = [1]
+    recursive_list.append(recursive_list)
+    recursive_dict: dict = {}
+    recursive_dict["a"] = recursive_dict
+
+    for obj in [
+        1,
+        "a",
+        "it's",
+        b"x",
+        bytearray(b"xy"),
+        (),
+        (1,),
+        (1, "2"),
+        [],
+        [1, "a", (2,), None, True, 1.5],
+        {},
+        {"a": [1, {2}]},
+        set(),
+        {1},
+        frozenset(),
+        frozenset({1}),
+        recursive_list,
+        recursive_dict,
+        collections.OrderedDict(a=1),
+    ]:
+        assert bounded_repr(obj, 1000) == repr(obj)
+
+
+def test_bounded_repr_clipped():
+    from robocorp.log._obj_info_repr import bounded_repr
+
+    assert bounded_repr("x" * 100, 10) == "'xxxxxxxxx <clipped 92 chars>"
+    assert bounded_repr(b"x" * 100, 10) == "b'xxxxxxxx <clipped 93 chars>"
+    assert bounded_repr(list(range(100)), 10) == "[0, 1, 2,  <clipped>"
+    assert bounded_repr({"a": "b" * 100}, 10) == "{'a': 'bbb <clipped 99 chars>"
+    assert bounded_repr(["b" * 100, "c" * 100], 10) == "['bbbbbbbb <clipped>"
+
+    class Big:
+        def __repr__(self):
+            return "y" * 100
+
+    assert bounded_repr(Big(), 10) == "yyyyyyyyyy <clipped 90 chars>"
+
+
+def test_bounded_repr_does_not_create_full_repr():
+    from robocorp.log._obj_info_repr import bounded_repr
+
+    class NoRepr:
+        def __repr__(self):
+            raise AssertionError("Should not be called.")
+
+    # The items after the max size aren't visited.
+    assert bounded_repr([1, 2, NoRepr()], 5) == "[1, 2 <clipped>"
+
+
+def test_register_type_repr():
+    from robocorp.log import _obj_info_repr
+    from robocorp.log._obj_info_repr import bounded_repr, register_type_repr
+
+    class Custom:
+        pass
+
+    def write_custom(obj, writer):
+        writer.write("Custom(")
+        writer.write_repr([1, 2])
+        writer.write(")")
+
+    register_type_repr(Custom, write_custom)
+    try:
+        assert bounded_repr(Custom(), 100) == "Custom([1, 2])"
+        assert bounded_repr([Custom()], 100) == "[Custom([1, 2])]"
+    finally:
+        del _obj_info_repr._type_to_repr[Custom]
+        _obj_info_repr._resolved_type_to_repr.clear()
+
+
+def test_get_obj_type_and_repr_cache():
+    from robocorp.log._obj_info_repr import get_obj_type_and_repr
+
+    repr_cache: dict = {}
+    big = "x" * 1000
+    assert get_obj_type_and_repr(big, repr_cache) == ("str", repr(big))
+    assert len(repr_cache) == 1
+    assert get_obj_type_and_repr(big, repr_cache) == ("str", repr(big))
+
+    # Mutable objects are not cached.
+    big_list = list(range(1000))
+    get_obj_type_and_repr(big_list, repr_cache)
+    assert len(repr_cache) == 1
+
+
+def test_numpy_repr_summarized():
+    numpy = pytest.importorskip("numpy")
+    from robocorp.log._obj_info_repr import bounded_repr
+
+    arr = numpy.arange(100_000)
+    with numpy.printoptions(threshold=10_000_000):
+        r = bounded_repr(arr, 10_000)
+    assert "..." in r
+    assert len(r) < 1000
+
+
+def test_pandas_repr_summarized():
+    pandas = pytest.importorskip("pandas")
+    from robocorp.log._obj_info_repr import bounded_repr
+
+    df = pandas.DataFrame({"a": range(10_000), "b": range(10_000)})
+    with pandas.option_context("display.max_rows", None):
+        r = bounded_repr(df, 100_000)
+    assert "..." in r
+    assert len(r) < 5000
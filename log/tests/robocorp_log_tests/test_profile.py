@@ -0,0 +1,146 @@
+import json
+from pathlib import Path
+
+
+def _find(entries, name):
+    for entry in entries:
+        if entry["name"] == name:
+            return entry
+    raise AssertionError(f"{name} not found in {entries}")
+
+
+def test_profile_output(tmpdir):
+    from imp import reload
+
+    from robocorp_log_tests._resources import check, check_iterators
+    from robocorp_log_tests.fixtures import AutoLogConfigForTest
+
+    from robocorp import log
+
+    output_dir = Path(str(tmpdir.join("profile")))
+    with log.setup_auto_logging(AutoLogConfigForTest()):
+        # Note: no log output is needed for the profile to be collected.
+        with log.add_profile_output(output_dir, max_slowest_calls=2):
+            check = reload(check)
+            check_iterators = reload(check_iterators)
+
+            log.start_task("my task", "task_mod", __file__, 0)
+            for _i in range(3):
+                check.some_method()
+            check_iterators.main()
+            log.end_task("my task", "task_mod", "PASS", "Ok")
+
+        # Not collected after the profile output is removed.
+        log.start_task("other task", "task_mod", __file__, 0)
+        check.some_method()
+        log.end_task("other task", "task_mod", "PASS", "Ok")
+
+    assert [p.name for p in output_dir.iterdir()] == ["task_mod.my_task.profile.json"]
+    summary = json.loads(
+        (output_dir / "task_mod.my_task.profile.json").read_text("utf-8")
+    )
+    assert summary["task"] == {
+        "name": "my task",
+        "libname": "task_mod",
+        "status": "PASS",
+    }
+
+    functions = summary["functions"]
+    some_method = _find(functions, "some_method")
+    assert some_method["calls"] == 3
+    assert some_method["total_time"] >= some_method["self_time"] >= 0
+    assert _find(functions, "call_another_method")["calls"] == 3
+
+    # The generator is counted once (even though it's suspended/resumed).
+    assert _find(functions, "iterate_entries_in_project")["calls"] == 1
+    assert _find(functions, "call_in_main")["calls"] == 10
+
+    call_tree = summary["call_tree"]
+    node = _find(call_tree, "some_method")
+    assert node["calls"] == 3
+    assert [child["name"] for child in node["children"]] == ["call_another_method"]
+    main_node = _find(call_tree, "main")
+    assert sorted(child["name"] for child in main_node["children"]) == [
+        "call_in_main",
+        "iterate_entries_in_project",
+    ]
+
+    slowest_calls = summary["slowest_calls"]
+    assert len(slowest_calls) == 2
+    assert slowest_calls[0]["time"] >= slowest_calls[1]["time"]
+    for call in slowest_calls:
+        if call["name"] == "call_another_method":
+            assert call["args"][0] == ["param0", "int", "1"]
+
+
+def test_profile_output_args_repr_calls_logged_function(tmpdir):
+    import threading
+    from imp import reload
+
+    from robocorp_log_tests._resources import check_profile_repr
+    from robocorp_log_tests.fixtures import AutoLogConfigForTest
+
+    from robocorp import log
+
+    output_dir = Path(str(tmpdir.join("profile")))
+    with log.setup_auto_logging(AutoLogConfigForTest()):
+        with log.add_profile_output(output_dir):
+            check_profile_repr = reload(check_profile_repr)
+
+            def run():
+                log.start_task("my task", "task_mod", __file__, 0)
+                check_profile_repr.main()
+                log.end_task("my task", "task_mod", "PASS", "Ok")
+
+            # The `__repr__` of the argument calls an auto-logged function
+            # (which must not deadlock when the slowest calls are collected).
+            t = threading.Thread(target=run, daemon=True)
+            t.start()
+            t.join(10)
+            assert not t.is_alive(), "Deadlock computing the repr of the args."
+
+    summary = json.loads(
+        (output_dir / "task_mod.my_task.profile.json").read_text("utf-8")
+    )
+    functions = summary["functions"]
+    assert _find(functions, "receive_arg")["calls"] == 3
+    # The repr is also computed for the args of the auto-logged call (and that
+    # call is profiled), but the calls done to compute the repr for the slowest
+    # calls of the profile aren't.
+    assert _find(functions, "compute_repr_contents")["calls"] == 3
+
+    call = _find(summary["slowest_calls"], "receive_arg")
+    assert call["args"][0][2] == "ReprCallsLoggedFunction(contents)"
+
+
+def test_profile_output_async(tmpdir):
+    from imp import reload
+
+    from robocorp_log_tests._resources import check_profile_async
+    from robocorp_log_tests.fixtures import AutoLogConfigForTest
+
+    from robocorp import log
+
+    output_dir = Path(str(tmpdir.join("profile")))
+    with log.setup_auto_logging(AutoLogConfigForTest()):
+        with log.add_profile_output(output_dir):
+            check_profile_async = reload(check_profile_async)
+
+            log.start_task("my task", "task_mod", __file__, 0)
+            check_profile_async.run_main()
+            log.end_task("my task", "task_mod", "PASS", "Ok")
+
+    summary = json.loads(
+        (output_dir / "task_mod.my_task.profile.json").read_text("utf-8")
+    )
+    functions = summary["functions"]
+
+    # The time a coroutine is suspended in an `await` isn't its self time.
+    work = _find(functions, "work")
+    assert work["calls"] == 5
+    assert work["total_time"] >= work["self_time"] >= 0
+    assert work["self_time"] < 0.1
+
+    main = _find(functions, "main")
+    assert main["total_time"] >= main["self_time"] >= 0
+    assert main["self_time"] < 0.1
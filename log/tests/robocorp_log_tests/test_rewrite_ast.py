@@ -249,7 +249,7 @@ def method():
 
     unparsed = ast.unparse(mod)
     str_regression.check(unparsed)
-    assert "MethodLifecycleContext(('METHOD'" in unparsed
+    assert "MethodLocation('METHOD'" in unparsed
     if not rewrite_assigns:
         assert "after_assign" not in unparsed
     else:
@@ -295,7 +295,7 @@ def method():
 
     unparsed = ast.unparse(mod)
     str_regression.check(unparsed)
-    assert unparsed.count("MethodLifecycleContext(('GENERATOR'") == 1
+    assert unparsed.count("MethodLocation('GENERATOR'") == 1
     assert unparsed.count("before_yield_from") == 2
     assert unparsed.count("after_yield_from") == 2
     assert unparsed.count("after_assign") == 1
@@ -325,10 +325,7 @@ def method():
 
     unparsed = ast.unparse(mod)
     str_regression.check(unparsed)
-    assert (
-        unparsed.count("MethodLifecycleContextCallerInProject(('UNTRACKED_GENERATOR'")
-        == 1
-    )
+    assert unparsed.count("MethodLocation('UNTRACKED_GENERATOR'") == 1
 
 
 def test_handle_yield_from_on_log_project_call(tmpdir, str_regression):
@@ -355,10 +352,7 @@ def method():
 
     unparsed = ast.unparse(mod)
     str_regression.check(unparsed)
-    assert (
-        unparsed.count("MethodLifecycleContextCallerInProject(('UNTRACKED_GENERATOR'")
-        == 1
-    )
+    assert unparsed.count("MethodLocation('UNTRACKED_GENERATOR'") == 1
 
 
 def test_rewrite_yield_multiple(tmpdir, str_regression):
@@ -513,8 +507,6 @@ def foo():
 
 
 def test_rewrite_await(tmpdir, str_regression):
-    # On await it should just skip the function.
-
     config = AutoLogConfigForTest()
 
     target = Path(tmpdir)
@@ -539,6 +531,38 @@ def a():
     str_regression.check(unparsed)
 
 
+def test_rewrite_async(tmpdir, str_regression):
+    config = AutoLogConfigForTest()
+
+    target = Path(tmpdir)
+    target /= "check.py"
+    target.write_text(
+        """
+async def method(a):
+    await call()
+    b = await call(a)
+    for i in range(2):
+        await call(i)
+    async for c in gen():
+        pass
+    return await call(b, c)
+
+async def gen():
+    await call()
+    yield 1
+
+async def not_rewritten_gen():
+    call((yield 1))
+"""
+    )
+
+    mod = _rewrite(target, config, filter_kind=FilterKind.full_log)[2]
+    import ast
+
+    unparsed = ast.unparse(mod)
+    str_regression.check(unparsed)
+
+
 def test_rewrite_if(tmpdir, str_regression):
     config = AutoLogConfigForTest()
 
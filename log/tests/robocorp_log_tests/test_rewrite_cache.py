@@ -0,0 +1,178 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from robocorp_log_tests.fixtures import AutoLogConfigForTest
+
+from robocorp.log._config import DefaultAutoLogConfig, FilterKind
+
+
+def _create_cache(tmpdir, max_size=10_000_000):
+    from robocorp.log._rewrite_cache import RewriteCache
+
+    return RewriteCache(Path(str(tmpdir.join("cache"))), max_size)
+
+
+def test_rewrite_cache_key():
+    from robocorp.log._rewrite_cache import RewriteCache
+
+    cache = RewriteCache(Path("unused"), 1000)
+    config = AutoLogConfigForTest()
+
+    key = cache.compute_key(b"a = 1", "/mod.py", FilterKind.full_log, config)
+    assert key == cache.compute_key(b"a = 1", "/mod.py", FilterKind.full_log, config)
+
+    assert key != cache.compute_key(b"a = 2", "/mod.py", FilterKind.full_log, config)
+    assert key != cache.compute_key(b"a = 1", "/mod2.py", FilterKind.full_log, config)
+    assert key != cache.compute_key(
+        b"a = 1", "/mod.py", FilterKind.log_on_project_call, config
+    )
+    assert key != cache.compute_key(
+        b"a = 1",
+        "/mod.py",
+        FilterKind.full_log,
+        DefaultAutoLogConfig(rewrite_assigns=False),
+    )
+
+
+def test_rewrite_cache_key_optimize_level(monkeypatch):
+    from types import SimpleNamespace
+
+    from robocorp.log._rewrite_cache import RewriteCache
+
+    cache = RewriteCache(Path("unused"), 1000)
+    config = AutoLogConfigForTest()
+
+    key = cache.compute_key(b"assert a", "/mod.py", FilterKind.full_log, config)
+
+    # Code compiled with `python -O` (no asserts) must not be shared.
+    monkeypatch.setattr(sys, "flags", SimpleNamespace(optimize=sys.flags.optimize + 1))
+    assert key != cache.compute_key(b"assert a", "/mod.py", FilterKind.full_log, config)
+
+
+def test_rewrite_cache_put_get(tmpdir):
+    cache = _create_cache(tmpdir)
+
+    co = compile("a = 1", "mod.py", "exec")
+    assert cache.get("ab12") is None
+    assert cache.put("ab12", co)
+    assert cache.get("ab12") == co
+
+    # Invalid contents are ignored.
+    Path(str(tmpdir.join("cache", "ab", "12.pyc"))).write_bytes(b"invalid")
+    assert cache.get("ab12") is None
+
+
+def test_rewrite_cache_evict_least_recently_used(tmpdir):
+    cache = _create_cache(tmpdir)
+
+    co = compile("a = 1", "mod.py", "exec")
+    keys = [f"{i:04}" for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.put(key, co)
+        # Make sure the mtimes are different (the first key is the oldest).
+        os.utime(cache._get_path(key), (1000 + i, 1000 + i))
+
+    # Using the entry makes it the most recently used.
+    assert cache.get(keys[0]) is not None
+
+    entry_size = cache._get_path(keys[0]).stat().st_size
+    cache.max_size = entry_size * 5
+    assert cache.evict() == 6
+
+    assert cache.get(keys[0]) is not None
+    for key in keys[1:7]:
+        assert cache.get(key) is None
+    for key in keys[7:]:
+        assert cache.get(key) is not None
+
+
+def test_rewrite_hook_uses_shared_cache(tmpdir, monkeypatch):
+    from importlib import import_module
+
+    from robocorp.log import _rewrite_importhook
+    from robocorp.log._rewrite_importhook import RewriteHook
+
+    cache = _create_cache(tmpdir)
+
+    src_dir = tmpdir.join("src")
+    src_dir.mkdir()
+    src_dir.join("check_shared_cache.py").write_text(
+        "def method():\n    return 1\n", "utf-8"
+    )
+
+    # Simulate a read-only directory (the pyc isn't written in the __pycache__).
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(src_dir))
+
+    hook = RewriteHook(AutoLogConfigForTest(), cache)
+    sys.meta_path.insert(0, hook)
+    try:
+        mod = import_module("check_shared_cache")
+        assert mod.method() == 1
+        assert not os.path.exists(str(src_dir.join("__pycache__")))
+        assert len(cache._list_entries()) == 1
+
+        del sys.modules["check_shared_cache"]
+
+        def _rewrite_source(*args, **kwargs):
+            raise AssertionError("The shared cache should've been used.")
+
+        monkeypatch.setattr(_rewrite_importhook, "_rewrite_source", _rewrite_source)
+        mod = import_module("check_shared_cache")
+        assert mod.method() == 1
+    finally:
+        sys.modules.pop("check_shared_cache", None)
+        sys.meta_path.remove(hook)
+
+
+def test_prewarm_rewrite_cache(tmpdir):
+    from robocorp.log._rewrite_cache import iter_modules_to_rewrite, prewarm
+
+    cache = _create_cache(tmpdir)
+
+    src_dir = tmpdir.join("src")
+    src_dir.join("check_pkg", "__init__.py").write_text("", "utf-8", ensure=True)
+    src_dir.join("check_pkg", "mod.py").write_text("a = 1", "utf-8")
+    src_dir.join("check_pkg", "check_error.py").write_text("a = ", "utf-8")
+    src_dir.join("excluded.py").write_text("a = 1", "utf-8")
+    src_dir.join("dist-info", "check_other.py").write_text(
+        "a = 1", "utf-8", ensure=True
+    )
+
+    config = AutoLogConfigForTest()
+    found = sorted(
+        module_name
+        for module_name, _path, _kind in iter_modules_to_rewrite(config, [str(src_dir)])
+    )
+    assert found == ["check_pkg", "check_pkg.check_error", "check_pkg.mod"]
+
+    errors = []
+
+    def on_error(*args):
+        errors.append(args)
+
+    assert prewarm(cache, config, [str(src_dir)], on_error) == 2
+    assert len(errors) == 1
+    assert errors[0][0].name == "check_error.py"
+    assert len(cache._list_entries()) == 2
+
+    # Entries already in the cache aren't rewritten again.
+    assert prewarm(cache, config, [str(src_dir)]) == 2
+    assert len(cache._list_entries()) == 2
+
+
+@pytest.mark.parametrize("max_size, enabled", [("0", False), ("1MB", True)])
+def test_default_rewrite_cache(tmpdir, monkeypatch, max_size, enabled):
+    from robocorp.log._rewrite_cache import get_default_rewrite_cache
+
+    monkeypatch.setenv("RC_LOG_REWRITE_CACHE_DIR", str(tmpdir))
+    monkeypatch.setenv("RC_LOG_REWRITE_CACHE_MAX_SIZE", max_size)
+    cache = get_default_rewrite_cache()
+    if not enabled:
+        assert cache is None
+    else:
+        assert cache is not None
+        assert cache.cache_dir == Path(str(tmpdir))
+        assert cache.max_size == 1_000_000
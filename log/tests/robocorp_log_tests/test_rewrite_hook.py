@@ -12,15 +12,13 @@ class _SetupCallback:
         self.check = None  # To be set by the test function
         self.found = []
 
-    def before_method(
-        self, method_type: LogElementType, mod_name, filename, name, lineno, args_dict
-    ):
+    def before_method(self, location, arg_values):
         check = self.check
         if check:
-            assert filename == check.__file__
-            assert mod_name == check.__name__
-            assert lineno > 0
-        self.found.append(("before", name, args_dict))
+            assert location.filename == check.__file__
+            assert location.mod_name == check.__name__
+            assert location.lineno > 0
+        self.found.append(("before", location.name, location.get_args_dict(arg_values)))
 
     def after_method(
         self, method_type: LogElementType, mod_name, filename, name, lineno
@@ -112,6 +110,71 @@ def test_rewrite_hook_basic(config):
         sys.meta_path.remove(hook)
 
 
+def test_rewrite_hook_disabled_without_logger():
+    import sys
+    from imp import reload
+
+    from robocorp_log_tests._resources import check
+
+    from robocorp import log
+    from robocorp.log import _lifecycle_hooks
+    from robocorp.log._rewrite_importhook import RewriteHook
+
+    hook = RewriteHook(AutoLogConfigForTest())
+    sys.meta_path.insert(0, hook)
+
+    _lifecycle_hooks.set_enable_only_with_logger_instances(True)
+    try:
+        check = reload(check)
+        with _setup_test_callbacks() as setup_callback:
+            # No logger: the original code is run without the hooks.
+            assert not _lifecycle_hooks.enabled
+            assert check.some_method() == 22
+            assert check.increment_counter() == 1
+            assert setup_callback.found == []
+
+            with log.add_in_memory_log_output(lambda msg: None):
+                assert _lifecycle_hooks.enabled
+                assert check.increment_counter() == 2
+                assert setup_callback.found == [
+                    ("before", "increment_counter", {}),
+                    ("return", "increment_counter", 2),
+                    ("after", "increment_counter"),
+                ]
+            assert not _lifecycle_hooks.enabled
+    finally:
+        _lifecycle_hooks.set_enable_only_with_logger_instances(False)
+        sys.meta_path.remove(hook)
+
+
+def test_rewrite_hook_stats():
+    import sys
+    from imp import reload
+
+    from robocorp_log_tests._resources import check
+
+    from robocorp.log._config import FilterKind
+    from robocorp.log._rewrite_importhook import RewriteHook
+
+    hook = RewriteHook(AutoLogConfigForTest())
+    sys.meta_path.insert(0, hook)
+    try:
+        reload(check)
+    finally:
+        sys.meta_path.remove(hook)
+
+    stats = hook.stats
+    assert stats.find_spec_calls >= 1
+    (module_stats,) = [m for m in stats.modules if m.module_name == check.__name__]
+    assert module_stats.filter_kind == FilterKind.full_log
+    assert module_stats.code_source in ("pycache", "rewrite")
+    assert module_stats.load_time >= 0
+
+    report = stats.get_report()
+    assert "find_spec: " in report
+    assert check.__name__ in report
+
+
 def test_rewrite_hook_except():
     import sys
     from imp import reload
@@ -186,3 +249,36 @@ def test_rewrite_hook_log_on_project_call():
                 ]
     finally:
         sys.meta_path.remove(hook)
+
+
+@pytest.fixture
+def restore_sensitive_names():
+    import copy
+
+    from robocorp import log
+
+    original = log._sensitive_names
+    log._sensitive_names = copy.deepcopy(original)
+    try:
+        yield
+    finally:
+        log._sensitive_names = original
+
+
+def test_method_location_sensitive_args(restore_sensitive_names):
+    from robocorp import log
+    from robocorp.log._lifecycle_hooks import MethodLocation
+
+    location = MethodLocation(
+        "METHOD", "mod", "mod.py", "func", 1, ("user", "password", "location_key")
+    )
+    assert location.get_sensitive_args() == (False, True, False)
+    assert location.get_args_dict((1, 2, 3)) == {
+        "user": 1,
+        "password": 2,
+        "location_key": 3,
+    }
+
+    # The cached mask must be recomputed when a new sensitive name is added.
+    log.add_sensitive_variable_name("location_key")
+    assert location.get_sensitive_args() == (False, True, True)
@@ -44,7 +44,7 @@ try..except as well as leveraging a main `with` statement in the method.
 
 import pytest
 
-from robocorp.log._lifecycle_hooks import MethodLifecycleContext
+from robocorp.log._lifecycle_hooks import MethodLifecycleContext, MethodLocation
 
 
 @pytest.fixture
@@ -71,7 +71,7 @@ def test_rewrite_strategy_simple_for_iter(in_memory_log, str_regression):
 
     def user_method():
         with MethodLifecycleContext(
-            ("METHOD", __name__, "filename", "user_method", 1, {})
+            MethodLocation("METHOD", __name__, "filename", "user_method", 1, ()), ()
         ) as ctx:
             ctx.report_for_start(
                 1, ("FOR", __name__, "filename", "for a in range(2)", 2)
@@ -104,7 +104,7 @@ def test_rewrite_strategy_for_iter_exception(in_memory_log, str_regression):
 
     def user_method():
         with MethodLifecycleContext(
-            ("METHOD", __name__, "filename", "user_method", 1, {})
+            MethodLocation("METHOD", __name__, "filename", "user_method", 1, ()), ()
         ) as ctx:
             ctx.report_for_start(
                 1, ("FOR", __name__, "filename", "for a in range(2)", 2)
@@ -138,7 +138,7 @@ def test_rewrite_strategy_for_iter_exception_and_try(in_memory_log, str_regressi
 
     def user_method():
         with MethodLifecycleContext(
-            ("METHOD", __name__, "filename", "user_method", 1, {})
+            MethodLocation("METHOD", __name__, "filename", "user_method", 1, ()), ()
         ) as ctx:
             try:
                 ctx.report_for_start(
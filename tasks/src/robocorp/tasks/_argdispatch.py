@@ -79,6 +79,14 @@ class _ArgDispatcher:
             default="1MB",
         )
 
+        run_parser.add_argument(
+            "--log-html-refresh-interval",
+            dest="log_html_refresh_interval",
+            type=float,
+            help="The interval (in seconds) at which the log.html is updated during the run, so that it's available even if the process is killed (a value < 0 means that it's only written when the run finishes -- default is 5).",
+            default=5,
+        )
+
         run_parser.add_argument(
             "--console-colors",
             help="""Define how the console messages shown should be color encoded.
@@ -109,6 +117,29 @@ class _ArgDispatcher:
             action="store_true",
         )
 
+        run_parser.add_argument(
+            "--profile",
+            help="When set, a sampling profiler is used to profile each task (the collapsed stacks are written to the output dir and a summary is added to the log).",
+            dest="profile",
+            action="store_true",
+        )
+
+        run_parser.add_argument(
+            "--profile-interval",
+            help="The interval (in seconds) between each sample of the profiler (default is 0.01).",
+            dest="profile_interval",
+            type=float,
+            default=0.01,
+        )
+
+        run_parser.add_argument(
+            "--workers",
+            help="The maximum number of processes used to run the tasks (when > 1 each task is run in a separate process and the log output of all the processes is combined in a single log.html).",
+            dest="workers",
+            type=int,
+            default=1,
+        )
+
         # List tasks
         list_parser = subparsers.add_parser(
             "list",
@@ -121,6 +152,36 @@ class _ArgDispatcher:
             default=".",
         )
 
+        # Prewarm the cache
+        prewarm_parser = subparsers.add_parser(
+            "prewarm-cache",
+            help="Rewrites the modules which would be automatically logged and stores them in the shared cache (i.e.: to be used when building an image with a read-only site-packages).",
+        )
+        prewarm_parser.add_argument(
+            dest="path",
+            help="The directory or file with the tasks (used to find the pyproject.toml with the configuration -- default is the current directory).",
+            nargs="?",
+            default=".",
+        )
+
+        # Daemon
+        daemon_parser = subparsers.add_parser(
+            "daemon",
+            help="Loads the project once and then waits for requests to run tasks in a unix domain socket (each run is done in a process forked from the daemon, so, it starts with everything already imported).",
+        )
+        daemon_parser.add_argument(
+            dest="path",
+            help="The directory or file with the tasks (default is the current directory).",
+            nargs="?",
+            default=".",
+        )
+        daemon_parser.add_argument(
+            "--socket",
+            dest="socket_path",
+            help="The path of the unix domain socket to listen to (if not given a socket is created in a new temporary directory). The socket is only accessible by the current user.",
+            default=None,
+        )
+
         return parser
 
     def process_args(self, args: List[str]) -> int:
@@ -0,0 +1,370 @@
+"""
+Collects the tasks without importing the modules (used by
+`python -m robocorp.tasks list`).
+
+The source of each module is parsed (with `ast`) and the functions decorated
+with `@task` (imported from `robocorp.tasks`) are provided. Modules where the
+tasks can't be found statically (i.e.: `task` is called directly, used in a
+nested scope, imported with `*` or from some other module) are still
+imported (as done when running the tasks).
+
+The result for each module is stored in a persistent cache (keyed by the
+mtime/size of the module), so, the modules which didn't change don't even
+need to be parsed again.
+"""
+import ast
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+# Must be changed whenever the information collected changes (so that the
+# entries of the cache are no longer used).
+_CACHE_VERSION = 1
+
+_TASKS_MODULE = "robocorp.tasks"
+
+
+def get_default_cache_dir() -> Path:
+    """
+    Returns:
+        The directory where the tasks collected are cached (may be customized
+        with the `RC_TASKS_LIST_CACHE_DIR` environment variable).
+    """
+    cache_dir = os.environ.get("RC_TASKS_LIST_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return Path(base) / "robocorp" / "tasks_list_cache"
+
+
+class _TaskDecoratorFinder:
+    """
+    Finds the functions decorated with `@task` in the given module (or
+    marks the module as dynamic if that's not possible).
+    """
+
+    def __init__(self, module: ast.Module):
+        self._module = module
+
+        # Names bound to `robocorp.tasks.task` (i.e.: `from robocorp.tasks import task`).
+        self._task_names: Set[str] = set()
+
+        # Names bound to `robocorp.tasks` (i.e.: `import robocorp.tasks as tasks`).
+        self._module_names: Set[str] = set()
+
+        self.dynamic = False
+
+    def _collect_imports(self) -> None:
+        for node in ast.walk(self._module):
+            if isinstance(node, ast.ImportFrom):
+                if node.level:
+                    continue
+
+                if node.module == _TASKS_MODULE:
+                    for alias in node.names:
+                        if alias.name == "*":
+                            self.dynamic = True
+                        elif alias.name == "task":
+                            self._task_names.add(alias.asname or alias.name)
+
+                elif node.module == "robocorp":
+                    for alias in node.names:
+                        if alias.name == "tasks":
+                            self._module_names.add(alias.asname or alias.name)
+
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name == _TASKS_MODULE:
+                        # i.e.: import robocorp.tasks (as tasks)
+                        self._module_names.add(alias.asname or alias.name)
+
+    def _get_dotted_name(self, node: ast.AST) -> Optional[str]:
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute):
+            value = self._get_dotted_name(node.value)
+            if value is not None:
+                return f"{value}.{node.attr}"
+        return None
+
+    def _is_task_decorator(self, node: ast.AST) -> bool:
+        if isinstance(node, ast.Name):
+            return node.id in self._task_names
+
+        if isinstance(node, ast.Attribute) and node.attr == "task":
+            return self._get_dotted_name(node.value) in self._module_names
+        return False
+
+    def _looks_like_task_decorator(self, node: ast.AST) -> bool:
+        # i.e.: `@task` or `@lib.task` from some other module (which may be a
+        # re-export of `robocorp.tasks.task`).
+        if isinstance(node, ast.Name):
+            return node.id == "task"
+        if isinstance(node, ast.Attribute):
+            return node.attr == "task"
+        return False
+
+    def find_tasks(self) -> List[Union[ast.FunctionDef, ast.AsyncFunctionDef]]:
+        self._collect_imports()
+        if self.dynamic:
+            return []
+
+        found: List[Union[ast.FunctionDef, ast.AsyncFunctionDef]] = []
+        static_references: Set[int] = set()
+
+        for stmt in self._module.body:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                for decorator in stmt.decorator_list:
+                    if self._is_task_decorator(decorator):
+                        if decorator is not stmt.decorator_list[-1]:
+                            # The task would be what some other decorator
+                            # returns (which isn't known statically).
+                            self.dynamic = True
+                            return []
+
+                        static_references.add(id(decorator))
+                        if isinstance(decorator, ast.Attribute):
+                            # Also skip the `robocorp.tasks` part.
+                            for child in ast.walk(decorator):
+                                static_references.add(id(child))
+                        found.append(stmt)
+
+        for node in ast.walk(self._module):
+            if id(node) in static_references:
+                continue
+
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                for decorator in node.decorator_list:
+                    if id(decorator) not in static_references:
+                        if self._looks_like_task_decorator(decorator):
+                            self.dynamic = True
+                            return []
+
+            if self._is_task_decorator(node):
+                # Used in some other way (i.e.: `task(func)`, in a nested
+                # scope, etc.).
+                self.dynamic = True
+                return []
+
+            if isinstance(node, ast.Name) and node.id in self._module_names:
+                if not isinstance(node.ctx, ast.Load):
+                    self.dynamic = True
+                    return []
+
+        return found
+
+
+def collect_tasks_from_source(
+    source: Union[str, bytes], filename: str
+) -> Optional[List[dict]]:
+    """
+    Args:
+        source: The contents of the module.
+        filename: The filename of the module.
+
+    Returns:
+        A list with the tasks found (in the same format provided by
+        `python -m robocorp.tasks list`) or None if the tasks can't be
+        found statically (in which case the module needs to be imported).
+
+    Raises:
+        SyntaxError if the module can't be parsed.
+    """
+    module = ast.parse(source, filename)
+
+    finder = _TaskDecoratorFinder(module)
+    functions = finder.find_tasks()
+    if finder.dynamic:
+        return None
+
+    tasks = []
+    for function in functions:
+        # Note: the line of the code object of decorated functions is
+        # the line of the first decorator.
+        lineno = function.lineno
+        if function.decorator_list:
+            lineno = min(lineno, function.decorator_list[0].lineno)
+
+        tasks.append(
+            {
+                "name": function.name,
+                "line": lineno,
+                "file": filename,
+                "docs": ast.get_docstring(function, clean=False) or "",
+            }
+        )
+    return tasks
+
+
+class TasksListCache:
+    """
+    Persistent cache with the tasks found statically in each module (keyed
+    by the mtime/size of the module).
+
+    A file is used for each root from where the tasks are collected and the
+    entries of modules which are no longer found are removed when it's saved.
+    """
+
+    def __init__(self, cache_dir: Path, root: Path) -> None:
+        key = hashlib.sha256(str(root).encode("utf-8")).hexdigest()[:24]
+        self._cache_file = cache_dir / f"{key}.json"
+
+        self._entries: Dict[str, dict] = {}
+        self._new_entries: Dict[str, dict] = {}
+        self._changed = False
+
+        try:
+            with open(self._cache_file, "r", encoding="utf-8") as stream:
+                contents = json.load(stream)
+            if contents.get("version") == _CACHE_VERSION:
+                self._entries = contents["entries"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass  # Missing or corrupted: start a new one.
+
+    def get(self, filename: str, stat: os.stat_result) -> Optional[dict]:
+        entry = self._entries.get(filename)
+        if entry is None:
+            return None
+
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            return None
+
+        self._new_entries[filename] = entry
+        return entry
+
+    def put(self, filename: str, stat: os.stat_result, tasks: Optional[List[dict]]):
+        self._new_entries[filename] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            # None means that the module must be imported.
+            "tasks": tasks,
+        }
+        self._changed = True
+
+    def save(self) -> None:
+        if not self._changed and len(self._new_entries) == len(self._entries):
+            return
+
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and then rename (so that concurrent
+            # processes never see a partially written file).
+            tmp = self._cache_file.with_name(
+                f"{self._cache_file.name}.{os.getpid()}.tmp"
+            )
+            with open(tmp, "w", encoding="utf-8") as stream:
+                json.dump(
+                    {"version": _CACHE_VERSION, "entries": self._new_entries}, stream
+                )
+            os.replace(tmp, self._cache_file)
+        except OSError:
+            pass  # i.e.: read-only: just don't cache.
+
+
+def _iter_module_paths(path: Path) -> Iterator[Tuple[Path, Path]]:
+    """
+    Provides the modules (and the root used to compute their module names)
+    just as `collect_tasks` does.
+    """
+    from ._exceptions import RobocorpTasksCollectError
+
+    if path.is_dir():
+        for path_with_task in path.rglob("*task*.py"):
+            yield path_with_task, path
+
+    elif path.is_file():
+        yield path, path.parent
+
+    else:
+        if not path.exists():
+            raise RobocorpTasksCollectError(f"Path: {path} does not exist")
+
+        raise RobocorpTasksCollectError(
+            f"Expected {path} to map to a directory or file."
+        )
+
+
+def _import_and_collect(module_path: Path, root: Path) -> List[dict]:
+    from robocorp.tasks import _hooks
+    from robocorp.tasks._collect_tasks import import_path
+    from robocorp.tasks._task import Task
+
+    methods_marked_as_tasks_found: List[Callable] = []
+
+    _hooks.on_task_func_found.register(methods_marked_as_tasks_found.append)
+    try:
+        module = import_path(module_path, root=root)
+    finally:
+        _hooks.on_task_func_found.unregister(methods_marked_as_tasks_found.append)
+
+    tasks = []
+    for method in methods_marked_as_tasks_found:
+        task = Task(module, method)
+        tasks.append(
+            {
+                "name": task.name,
+                "line": task.lineno,
+                "file": task.filename,
+                "docs": getattr(task.method, "__doc__") or "",
+            }
+        )
+    return tasks
+
+
+def collect_tasks_static(
+    path: Path, cache_dir: Optional[Path] = None
+) -> Iterator[dict]:
+    """
+    Collects the tasks in the given path (file or directory) without
+    importing the modules (whenever possible).
+
+    Args:
+        path: The path from where the tasks should be collected.
+        cache_dir: The directory where the cache should be stored (if not
+            given `get_default_cache_dir()` is used).
+
+    Returns:
+        An iterator with the tasks found (in the same format provided by
+        `python -m robocorp.tasks list`).
+    """
+    path = path.absolute()
+    if cache_dir is None:
+        cache_dir = get_default_cache_dir()
+
+    cache = TasksListCache(cache_dir, path)
+    try:
+        for module_path, root in _iter_module_paths(path):
+            filename = str(module_path)
+            try:
+                stat = module_path.stat()
+            except OSError:
+                continue
+
+            tasks: Optional[List[dict]]
+            entry = cache.get(filename, stat)
+            if entry is not None:
+                tasks = entry["tasks"]
+            else:
+                try:
+                    source = module_path.read_bytes()
+                    tasks = collect_tasks_from_source(source, filename)
+                except SyntaxError:
+                    # Let the import provide the actual error.
+                    tasks = None
+                cache.put(filename, stat, tasks)
+
+            if tasks is None:
+                tasks = _import_and_collect(module_path, root)
+
+            yield from tasks
+    finally:
+        cache.save()
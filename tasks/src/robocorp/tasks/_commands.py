@@ -1,12 +1,12 @@
 import json
 import os
 import sys
+import threading
 import traceback
 from pathlib import Path
-from typing import List, Sequence, Union
+from typing import List, Optional, Sequence, Union
 
 from ._argdispatch import arg_dispatch as _arg_dispatch
-import threading
 
 
 # Note: the args must match the 'dest' on the configured argparser.
@@ -29,11 +29,15 @@ def list_tasks(
 
     Args:
         path: The path (file or directory) from where tasks should be collected.
+
+    Note: the modules are parsed to find the tasks (and are only imported if
+    the tasks can't be found statically). The tasks found are cached based on
+    the mtime/size of the modules (in the directory specified by the
+    `RC_TASKS_LIST_CACHE_DIR` environment variable or in the user cache dir).
     """
     from contextlib import redirect_stdout
 
-    from robocorp.tasks._collect_tasks import collect_tasks
-    from robocorp.tasks._protocols import ITask
+    from robocorp.tasks._collect_tasks_static import collect_tasks_static
     from robocorp.tasks._task import Context
 
     p = Path(path)
@@ -44,23 +48,92 @@ def list_tasks(
 
     original_stdout = sys.stdout
     with redirect_stdout(sys.stderr):
-        task: ITask
-        tasks_found = []
-        for task in collect_tasks(p):
-            tasks_found.append(
-                {
-                    "name": task.name,
-                    "line": task.lineno,
-                    "file": task.filename,
-                    "docs": getattr(task.method, "__doc__") or "",
-                }
-            )
+        tasks_found = list(collect_tasks_static(p))
 
         original_stdout.write(json.dumps(tasks_found))
         original_stdout.flush()
     return 0
 
 
+# Note: the args must match the 'dest' on the configured argparser.
+@_arg_dispatch.register(name="prewarm-cache")
+def prewarm_cache(
+    path: str,
+) -> int:
+    """
+    Rewrites the modules which would be automatically logged when running
+    the tasks at a given path and stores the rewritten code in the shared
+    cache of `robocorp.log` (meant to be used when building an image where
+    the `site-packages` is read-only so that the modules don't need to be
+    rewritten again on each run).
+
+    Args:
+        path: The path (file or directory) with the tasks (used to find
+            the `pyproject.toml` with the logging configuration).
+    """
+    from robocorp import log
+    from robocorp.tasks._toml_settings import read_pyproject_toml
+
+    from ._log_auto_setup import read_robocorp_log_config
+    from ._task import Context
+
+    p = Path(path).absolute()
+    context = Context()
+    if not p.exists():
+        context.show_error(f"Path: {path} does not exist")
+        return 1
+
+    config: log.AutoLogConfigBase
+    pyproject_path_and_contents = read_pyproject_toml(p)
+    if pyproject_path_and_contents is None:
+        config = log.DefaultAutoLogConfig()
+    else:
+        config = read_robocorp_log_config(context, pyproject_path_and_contents)
+
+    project_dir = p if p.is_dir() else p.parent
+
+    def on_error(filename, exception):
+        context.show(f"Unable to rewrite: {filename} ({exception})")
+
+    count = log.prewarm_rewrite_cache(
+        config, [str(project_dir)] + sys.path, on_error=on_error
+    )
+    context.show(f"Cached the rewritten code of {count} modules.")
+    return 0
+
+
+# Note: the args must match the 'dest' on the configured argparser.
+@_arg_dispatch.register()
+def daemon(
+    path: str,
+    socket_path: Optional[str] = None,
+) -> int:
+    """
+    Loads the project (the `pyproject.toml`, the auto-logging setup and the
+    modules with the tasks) and waits for requests to run tasks in a unix
+    domain socket (only accessible by the current user). Each request is run
+    in a process forked from the daemon (so, the startup of each run is much
+    faster as everything is already imported).
+
+    See: `robocorp.tasks._daemon` for the protocol used.
+
+    Args:
+        path: The path (file or directory) with the tasks.
+        socket_path: The path of the socket to listen to (if not given a
+            socket is created in a new temporary directory).
+    """
+    from ._daemon import serve
+    from ._task import Context
+
+    p = Path(path).absolute()
+    context = Context()
+    if not p.exists():
+        context.show_error(f"Path: {path} does not exist")
+        return 1
+
+    return serve(context, p, Path(socket_path) if socket_path else None)
+
+
 # Note: the args must match the 'dest' on the configured argparser.
 @_arg_dispatch.register()
 def run(
@@ -72,6 +145,10 @@ def run(
     console_colors: str = "auto",
     log_output_to_stdout: str = "",
     no_status_rc: bool = False,
+    profile: bool = False,
+    profile_interval: float = 0.01,
+    workers: int = 1,
+    log_html_refresh_interval: float = 5,
 ) -> int:
     """
     Runs a task.
@@ -94,6 +171,21 @@ def run(
         no_status_rc:
             Set to True so that if running tasks has an error inside the task
             the return code of the process is 0.
+        profile:
+            Set to True so that each task is profiled with a sampling profiler
+            (the collapsed stacks are written to the output dir -- which may be
+            used to generate a flamegraph -- and a summary of the frames where
+            most time was spent is added to the log).
+        profile_interval:
+            The interval (in seconds) between each sample of the profiler.
+        workers:
+            The maximum number of processes used to run the tasks (if > 1 each
+            task is run in a separate process and the log output of each process
+            is combined in a single log.html).
+        log_html_refresh_interval:
+            The interval (in seconds) at which the log.html is updated during
+            the run (so that it's available even if the process is killed). If
+            < 0 the log.html is only written when the run finishes.
 
     Returns:
         0 if everything went well.
@@ -130,6 +222,16 @@ def run(
         context.show_error(f"Path: {path} does not exist")
         return 1
 
+    if workers < 1:
+        context.show_error(f"Expected workers to be >= 1. Found: {workers}")
+        return 1
+
+    if profile and profile_interval <= 0:
+        context.show_error(
+            f"Expected profile interval to be > 0. Found: {profile_interval}"
+        )
+        return 1
+
     from robocorp import log
 
     task_names: Sequence[str]
@@ -144,6 +246,27 @@ def run(
         task_name = ", ".join(str(x) for x in task_names)
         task_or_tasks = "task" if len(task_names) == 1 else "tasks"
 
+    if workers > 1:
+        from ._workers import run_in_workers
+
+        worker_args = [
+            f"--max-log-files={max_log_files}",
+            f"--max-log-file-size={max_log_file_size}",
+            f"--console-colors={console_colors}",
+            f"--log-html-refresh-interval={log_html_refresh_interval}",
+        ]
+        if log_output_to_stdout:
+            worker_args.append(f"--log-output-to-stdout={log_output_to_stdout}")
+        if no_status_rc:
+            worker_args.append("--no-status-rc")
+        if profile:
+            worker_args.append("--profile")
+            worker_args.append(f"--profile-interval={profile_interval}")
+
+        return run_in_workers(
+            context, p, Path(output_dir), task_names, workers, worker_args
+        )
+
     config: log.AutoLogConfigBase
     pyproject_path_and_contents = read_pyproject_toml(p)
     pyproject_toml_contents: dict
@@ -164,6 +287,9 @@ def run(
         log_output_to_stdout,
         no_status_rc,
         pyproject_toml_contents,
+        profile,
+        profile_interval,
+        log_html_refresh_interval,
     )
 
     with set_config(run_config), setup_cli_auto_logging(
@@ -174,7 +300,12 @@ def run(
         output_dir=Path(output_dir),
         max_files=max_log_files,
         max_file_size=max_log_file_size,
-    ), setup_log_output_to_port(), context.register_lifecycle_prints():
+        log_html_refresh_interval=(
+            log_html_refresh_interval if log_html_refresh_interval >= 0 else None
+        ),
+    ), setup_log_output_to_port(), context.register_lifecycle_prints(), _setup_profiling(
+        run_config
+    ):
         run_status = "PASS"
         setup_message = ""
 
@@ -270,6 +401,17 @@ def run(
             t.start()
 
 
+def _setup_profiling(run_config):
+    if not run_config.profile:
+        from contextlib import nullcontext
+
+        return nullcontext()
+
+    from ._sampling_profiler import setup_sampling_profiler
+
+    return setup_sampling_profiler(run_config.output_dir, run_config.profile_interval)
+
+
 def _dump_threads(stream=None, message="Threads found"):
     if stream is None:
         stream = sys.stderr
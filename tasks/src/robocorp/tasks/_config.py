@@ -14,6 +14,9 @@ class RunConfig:
         log_output_to_stdout: str,
         no_status_rc: bool,
         pyproject_contents: dict,
+        profile: bool = False,
+        profile_interval: float = 0.01,
+        log_html_refresh_interval: float = 5,
     ):
         """
         Args:
@@ -36,6 +39,13 @@ class RunConfig:
                 the return code of the process is 0.
             pyproject_contents:
                 The contents loaded from pyproject.toml.
+            profile:
+                Set to True so that each task is profiled with a sampling profiler.
+            profile_interval:
+                The interval (in seconds) between each sample of the profiler.
+            log_html_refresh_interval:
+                The interval (in seconds) at which the log.html is updated during
+                the run (< 0 means that it's only written when the run finishes).
         """
         self.output_dir = output_dir
         self.path = path
@@ -46,6 +56,9 @@ class RunConfig:
         self.log_output_to_stdout = log_output_to_stdout
         self.no_status_rc = no_status_rc
         self.pyproject_contents = pyproject_contents
+        self.profile = profile
+        self.profile_interval = profile_interval
+        self.log_html_refresh_interval = log_html_refresh_interval
 
 
 class _GlobalConfig:
@@ -0,0 +1,600 @@
+"""
+Pre-forked (warm) daemon to run tasks (used by `python -m robocorp.tasks daemon`).
+
+The daemon loads the project once (reads the `pyproject.toml`, sets up the
+auto-logging and imports the modules with the tasks -- along with the
+dependencies they import) and then accepts requests to run tasks in a unix
+domain socket. Each request is run in a process forked from the daemon, so,
+it starts with everything already imported (and the state of a run is never
+seen by another run).
+
+As a request runs arbitrary code, the socket is only accessible by the user
+running the daemon (it's created with `0600` permissions and, if a path isn't
+given, inside a directory created with `0700` permissions).
+
+Protocol (each message is a json object in a single line):
+
+    Request (client -> daemon):
+        {"args": ["run", "-t", "task_name", ...], "cwd": "/optional/cwd"}
+
+        Where `args` are the same arguments passed to `python -m robocorp.tasks`.
+
+    Responses (daemon -> client):
+        {"output": "..."}  (the stdout/stderr of the run -- any number of times)
+        {"returncode": 0}  (when the run finishes, after which the connection is closed)
+
+Note: only available on platforms which support `os.fork()` (and unix domain
+sockets).
+"""
+
+import codecs
+import json
+import os
+import selectors
+import signal
+import socket
+import stat
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ._task import Context
+
+# The time (in seconds) to wait for a request after a client connects.
+_REQUEST_TIMEOUT = 10
+
+# The maximum size (in bytes) of a request.
+_MAX_REQUEST_SIZE = 1024 * 1024
+
+# The maximum size (in bytes) of the output which may be waiting to be sent to
+# a client (when reached, the output of the process isn't read until the
+# client reads what's pending, so, a client which doesn't read its output
+# only blocks its own run).
+_MAX_PENDING_OUTPUT = 1024 * 1024
+
+
+class _PendingRequest:
+    def __init__(self, conn: socket.socket, deadline: float):
+        self.conn = conn
+        self.deadline = deadline
+        self.buffer = b""
+
+
+class _RunningChild:
+    def __init__(self, pid: int, conn: socket.socket, output_fd: int):
+        self.pid = pid
+        # Set to None when the client disconnects (the run still finishes).
+        self.conn: Optional[socket.socket] = conn
+        # Set to None when the output is closed (note that the process may
+        # finish before its output is closed if it spawned a process which
+        # inherited it).
+        self.output_fd: Optional[int] = output_fd
+        self.decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+        # The messages which still need to be sent to the client.
+        self.pending_output = bytearray()
+        # Set when the return code is added to the pending output (the
+        # connection is closed when everything is sent).
+        self.finished = False
+
+
+def _encode_message(msg: dict) -> bytes:
+    return (json.dumps(msg) + "\n").encode("utf-8")
+
+
+def _raise_keyboard_interrupt(*_args) -> None:
+    raise KeyboardInterrupt()
+
+
+def _parse_request(data: bytes) -> dict:
+    request = json.loads(data.decode("utf-8"))
+    args = request["args"]
+    if not isinstance(args, list) or not all(isinstance(a, str) for a in args):
+        raise ValueError(f"Expected 'args' to be a list of str. Found: {args}")
+    cwd = request.get("cwd")
+    if cwd is not None and not isinstance(cwd, str):
+        raise ValueError(f"Expected 'cwd' to be a str. Found: {cwd}")
+    return request
+
+
+class _Daemon:
+    def __init__(
+        self,
+        context: Context,
+        server: socket.socket,
+        on_fork: Callable[[], None],
+    ):
+        """
+        Args:
+            context: Used to show messages to the user.
+            server: The socket which accepts the requests.
+            on_fork: Called in the forked process before running the request.
+        """
+        self._context = context
+        self._server = server
+        self._on_fork = on_fork
+        self._selector = selectors.DefaultSelector()
+        self._pending: Dict[int, _PendingRequest] = {}  # conn fd -> request
+        self._output_fd_to_child: Dict[int, _RunningChild] = {}
+        self._conn_fd_to_child: Dict[int, _RunningChild] = {}
+        self._running: Dict[int, _RunningChild] = {}  # pid -> child
+
+        # Written (by the signal module) when a SIGCHLD is received.
+        self._wakeup_read_fd, self._wakeup_write_fd = os.pipe()
+
+    def serve_forever(self) -> None:
+        """
+        Serves the requests (must be called in the main thread as it handles
+        `SIGCHLD` to know when a child process finishes).
+        """
+        selector = self._selector
+        selector.register(self._server, selectors.EVENT_READ)
+
+        os.set_blocking(self._wakeup_read_fd, False)
+        os.set_blocking(self._wakeup_write_fd, False)
+        selector.register(self._wakeup_read_fd, selectors.EVENT_READ)
+
+        # A handler must be set for the wakeup fd to be written (the exit of
+        # the children is detected by the `SIGCHLD` and not by the EOF of
+        # their output, which may be kept open by a process they spawned).
+        signal.signal(signal.SIGCHLD, lambda *_args: None)
+        signal.set_wakeup_fd(self._wakeup_write_fd)
+
+        # On SIGTERM exit gracefully (so that the socket is removed).
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+        try:
+            while True:
+                timeout = None
+                if self._pending:
+                    deadline = min(p.deadline for p in self._pending.values())
+                    timeout = max(0, deadline - time.monotonic())
+
+                for key, _events in selector.select(timeout):
+                    # Note: the handlers may unregister the other fds in
+                    # this batch, so, fds which are no longer tracked are
+                    # skipped (and all the reads/writes are non-blocking).
+                    fd = key.fd
+                    if key.fileobj is self._server:
+                        self._accept()
+                    elif fd == self._wakeup_read_fd:
+                        self._on_wakeup()
+                    elif fd in self._pending:
+                        self._on_request_data(self._pending[fd])
+                    elif fd in self._output_fd_to_child:
+                        self._read_child_output(self._output_fd_to_child[fd])
+                    elif fd in self._conn_fd_to_child:
+                        self._flush_output(self._conn_fd_to_child[fd])
+
+                self._check_pending_timeouts()
+                # Note: checked in every iteration (and not only when woken
+                # up by a SIGCHLD) as signals may be coalesced.
+                self._reap_children()
+        finally:
+            self._restore_signals()
+
+    def _restore_signals(self) -> None:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    def _accept(self) -> None:
+        conn, _addr = self._server.accept()
+
+        # The request is read when it's available (so, a client which is
+        # slow to send its request doesn't block other clients or the
+        # output of the running processes). Note: the connection is never
+        # set back to blocking (the output is sent when the client is
+        # ready to receive it).
+        conn.setblocking(False)
+        self._pending[conn.fileno()] = _PendingRequest(
+            conn, time.monotonic() + _REQUEST_TIMEOUT
+        )
+        self._selector.register(conn, selectors.EVENT_READ)
+
+    def _finish_pending(self, pending: _PendingRequest) -> None:
+        self._selector.unregister(pending.conn)
+        del self._pending[pending.conn.fileno()]
+
+    def _reject(self, pending: _PendingRequest, error: str) -> None:
+        self._finish_pending(pending)
+        try:
+            # Best effort (the message is small enough to fit in the socket
+            # buffer of a well-behaved client).
+            pending.conn.send(
+                _encode_message({"output": f"Invalid request: {error}\n"})
+                + _encode_message({"returncode": 1})
+            )
+        except OSError:
+            pass
+        pending.conn.close()
+
+    def _check_pending_timeouts(self) -> None:
+        now = time.monotonic()
+        for pending in list(self._pending.values()):
+            if pending.deadline <= now:
+                self._reject(pending, "timed out waiting for the request.")
+
+    def _on_request_data(self, pending: _PendingRequest) -> None:
+        try:
+            data = pending.conn.recv(1024 * 64)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._reject(pending, str(e))
+            return
+
+        if not data:
+            self._reject(pending, "connection closed before the request was sent.")
+            return
+
+        pending.buffer += data
+        line, found, _ = pending.buffer.partition(b"\n")
+        if not found:
+            if len(pending.buffer) > _MAX_REQUEST_SIZE:
+                self._reject(pending, "request too big.")
+            return
+
+        try:
+            request = _parse_request(line)
+        except Exception as e:
+            self._reject(pending, str(e))
+            return
+
+        self._finish_pending(pending)
+        self._fork(request["args"], request.get("cwd"), pending.conn)
+
+    def _fork(self, args: List[str], cwd: Optional[str], conn: socket.socket) -> None:
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Forked process: never returns.
+            os.close(read_fd)
+            self._run_in_fork(args, cwd, write_fd, conn)
+
+        os.close(write_fd)
+        os.set_blocking(read_fd, False)
+        child = _RunningChild(pid, conn, read_fd)
+        self._running[pid] = child
+        self._output_fd_to_child[read_fd] = child
+        self._conn_fd_to_child[conn.fileno()] = child
+        self._update_registration(child)
+
+    def _update_registration(self, child: _RunningChild) -> None:
+        """
+        Registers the output of the process to be read while the output
+        pending to be sent to the client is below the limit and the
+        connection to be written while there's output pending.
+        """
+        if child.output_fd is not None:
+            self._set_registered(
+                child.output_fd,
+                len(child.pending_output) < _MAX_PENDING_OUTPUT,
+                selectors.EVENT_READ,
+            )
+        if child.conn is not None:
+            self._set_registered(
+                child.conn, bool(child.pending_output), selectors.EVENT_WRITE
+            )
+
+    def _set_registered(self, fileobj, register: bool, events: int) -> None:
+        registered = fileobj in self._selector.get_map()
+        if register and not registered:
+            self._selector.register(fileobj, events)
+        elif not register and registered:
+            self._selector.unregister(fileobj)
+
+    def _queue_message(self, child: _RunningChild, msg: dict) -> None:
+        if child.conn is None:
+            return  # i.e.: the client disconnected (the output is discarded).
+        child.pending_output += _encode_message(msg)
+        self._flush_output(child)
+
+    def _flush_output(self, child: _RunningChild) -> None:
+        conn = child.conn
+        if conn is None:
+            return
+
+        while child.pending_output:
+            try:
+                sent = conn.send(child.pending_output)
+            except BlockingIOError:
+                break
+            except OSError:
+                # i.e.: the client disconnected (the run still finishes).
+                self._close_client(child)
+                return
+            del child.pending_output[:sent]
+
+        if child.finished and not child.pending_output:
+            self._close_client(child)
+        else:
+            self._update_registration(child)
+
+    def _close_client(self, child: _RunningChild) -> None:
+        conn = child.conn
+        if conn is None:
+            return
+        self._set_registered(conn, False, selectors.EVENT_WRITE)
+        del self._conn_fd_to_child[conn.fileno()]
+        conn.close()
+        child.conn = None
+        child.pending_output.clear()
+        # The output is still read (and discarded), so that the process
+        # isn't blocked writing it.
+        self._update_registration(child)
+
+    def _read_child_output(self, child: _RunningChild) -> bool:
+        """
+        Returns:
+            True if some output was read and False if there's nothing to be
+            read right now (or if the output was closed).
+        """
+        assert child.output_fd is not None
+        try:
+            data = os.read(child.output_fd, 1024 * 64)
+        except BlockingIOError:
+            return False
+
+        if not data:
+            # All the processes with the output closed it (the process may
+            # still be running, in which case the return code is sent when
+            # it's reaped).
+            self._close_child_output(child)
+            return False
+
+        output = child.decoder.decode(data)
+        if output:
+            self._queue_message(child, {"output": output})
+        return True
+
+    def _close_child_output(self, child: _RunningChild) -> None:
+        if child.output_fd is not None:
+            self._set_registered(child.output_fd, False, selectors.EVENT_READ)
+            del self._output_fd_to_child[child.output_fd]
+            os.close(child.output_fd)
+            child.output_fd = None
+
+            output = child.decoder.decode(b"", final=True)
+            if output:
+                self._queue_message(child, {"output": output})
+
+    def _on_wakeup(self) -> None:
+        try:
+            while os.read(self._wakeup_read_fd, 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _reap_children(self) -> None:
+        while self._running:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            child = self._running.pop(pid, None)
+            if child is None:
+                continue
+
+            if os.WIFEXITED(status):
+                returncode = os.WEXITSTATUS(status)
+            else:
+                returncode = 1
+
+            # Send what the process already wrote (a process it spawned
+            # may keep the output open, so, don't wait for the EOF -- and
+            # don't keep reading if it keeps on writing).
+            drained = 0
+            while drained < _MAX_PENDING_OUTPUT and child.output_fd is not None:
+                if not self._read_child_output(child):
+                    break
+                drained += 1024 * 64
+            self._close_child_output(child)
+
+            child.finished = True
+            self._queue_message(child, {"returncode": returncode})
+
+    def _run_in_fork(
+        self, args: List[str], cwd: Optional[str], output_fd: int, conn: socket.socket
+    ) -> None:
+        returncode = 1
+        try:
+            self._restore_signals()
+
+            # The file descriptors of the daemon must not be kept open.
+            self._selector.close()
+            self._server.close()
+            conn.close()
+            os.close(self._wakeup_read_fd)
+            os.close(self._wakeup_write_fd)
+            for pending in self._pending.values():
+                pending.conn.close()
+            for output_fd in self._output_fd_to_child:
+                os.close(output_fd)
+            for child in self._conn_fd_to_child.values():
+                if child.conn is not None:
+                    child.conn.close()
+
+            os.dup2(output_fd, 1)
+            os.dup2(output_fd, 2)
+            os.close(output_fd)
+
+            if cwd:
+                os.chdir(cwd)
+
+            self._on_fork()
+
+            from robocorp.tasks.cli import main
+
+            returncode = main(args, exit=False)
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(returncode)
+
+
+def _create_server(socket_path: Path) -> socket.socket:
+    try:
+        if stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+            # i.e.: left over from a daemon which was killed.
+            os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        # The socket must never be accessible by other users (not even for
+        # a moment before the `chmod`).
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(str(socket_path))
+        finally:
+            os.umask(old_umask)
+        os.chmod(socket_path, 0o600)
+        server.listen(128)
+    except BaseException:
+        server.close()
+        raise
+    return server
+
+
+def serve(context: Context, path: Path, socket_path: Optional[Path] = None) -> int:
+    """
+    Loads the project at the given path and serves requests to run tasks
+    (until the process is killed).
+
+    Args:
+        context: Used to show messages to the user.
+        path: The path (file or directory) with the tasks.
+        socket_path: The path of the unix domain socket to listen to (if not
+            given, a socket is created in a new temporary directory).
+
+    Returns:
+        1 if it was not possible to start the daemon (otherwise it only
+        returns when interrupted).
+    """
+    import tempfile
+    from contextlib import redirect_stdout
+
+    from robocorp import log
+
+    from ._collect_tasks import collect_tasks
+    from ._log_auto_setup import read_robocorp_log_config
+    from ._toml_settings import read_pyproject_toml
+
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        context.show_error(
+            "The daemon is only available on platforms with os.fork() and unix domain sockets."
+        )
+        return 1
+
+    config: log.AutoLogConfigBase
+    pyproject_path_and_contents = read_pyproject_toml(path)
+    if pyproject_path_and_contents is None:
+        config = log.DefaultAutoLogConfig()
+    else:
+        config = read_robocorp_log_config(context, pyproject_path_and_contents)
+
+    # The modules must be imported with the auto-logging in place (so that
+    # they're rewritten just as in a regular run).
+    auto_logging = log.setup_auto_logging(config)
+
+    def on_fork():
+        # Each run sets up the auto-logging again (modules which are already
+        # imported keep the code rewritten with the config used here).
+        auto_logging.__exit__(None, None, None)
+
+    try:
+        with redirect_stdout(sys.stderr):
+            count = len(list(collect_tasks(path)))
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+    temp_dir: Optional[str] = None
+    if socket_path is None:
+        # Note: `mkdtemp` creates the directory with `0700` permissions.
+        temp_dir = tempfile.mkdtemp(prefix="robocorp_tasks_daemon_")
+        socket_path = Path(temp_dir) / "daemon.sock"
+
+    try:
+        try:
+            server = _create_server(socket_path)
+        except OSError as e:
+            context.show_error(f"Unable to listen at: {socket_path} ({e}).")
+            return 1
+
+        context.show(
+            f"Loaded {count} tasks from: {path}\n"
+            f"Waiting for run requests at: {socket_path}",
+            flush=True,
+        )
+
+        try:
+            _Daemon(context, server, on_fork).serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            try:
+                os.unlink(socket_path)
+            except OSError:
+                pass
+        return 0
+    finally:
+        if temp_dir is not None:
+            try:
+                os.rmdir(temp_dir)
+            except OSError:
+                pass
+
+
+def request_run(
+    socket_path: Path,
+    args: Sequence[str],
+    cwd: Optional[str] = None,
+    on_output: Optional[Callable[[str], None]] = None,
+) -> int:
+    """
+    Requests a run to a daemon listening at the given unix domain socket.
+
+    Args:
+        socket_path: The path of the socket where the daemon is listening.
+        args: The arguments for the run (as passed to `python -m robocorp.tasks`).
+        cwd: The working dir of the run (if not given, the one from the daemon
+            is used).
+        on_output: Called with the output of the run (if not given, the
+            output is written to the stdout).
+
+    Returns:
+        The return code of the run.
+    """
+    if on_output is None:
+        on_output = sys.stdout.write
+
+    request: dict = {"args": list(args)}
+    if cwd:
+        request["cwd"] = cwd
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(str(socket_path))
+        conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with conn.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                msg = json.loads(line)
+                if "output" in msg:
+                    on_output(msg["output"])
+                elif "returncode" in msg:
+                    return msg["returncode"]
+
+    raise RuntimeError("Connection closed before receiving the return code.")
@@ -1,6 +1,6 @@
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from robocorp import log
 from robocorp.tasks._protocols import PyProjectInfo
@@ -11,14 +11,17 @@ from ._protocols import IContextErrorReport, ITask
 def read_robocorp_log_config(
     context: IContextErrorReport, pyproject: PyProjectInfo
 ) -> log.AutoLogConfigBase:
-    from ._toml_settings import read_section_from_toml
     from robocorp.log import FilterKind
 
+    from ._toml_settings import read_section_from_toml
+
     if not pyproject.toml_contents:
         log.DefaultAutoLogConfig()
 
     obj: Any = pyproject.toml_contents
     filters: List[log.Filter] = []
+    loop_log_policies: List[log.LoopLogPolicy] = []
+    assign_log_policies: List[log.AssignLogPolicy] = []
 
     default_library_filter_kind = FilterKind.log_on_project_call
 
@@ -30,6 +33,12 @@ def read_robocorp_log_config(
 
         if isinstance(obj, dict):
             filters = _load_filters(obj, context, pyproject.pyproject)
+            loop_log_policies = _load_loop_log_policies(
+                obj, context, pyproject.pyproject
+            )
+            assign_log_policies = _load_assign_log_policies(
+                obj, context, pyproject.pyproject
+            )
             kind = obj.get("default_library_filter_kind")
 
             if kind is not None:
@@ -47,10 +56,105 @@ def read_robocorp_log_config(
                         default_library_filter_kind = f
 
     return log.DefaultAutoLogConfig(
-        filters=filters, default_library_filter_kind=default_library_filter_kind
+        filters=filters,
+        default_library_filter_kind=default_library_filter_kind,
+        loop_log_policies=loop_log_policies,
+        assign_log_policies=assign_log_policies,
+    )
+
+
+def _load_loop_log_policies(
+    obj: dict, context: IContextErrorReport, pyproject: Path
+) -> List[log.LoopLogPolicy]:
+    # Each policy is a dict in a structure such as:
+    # {name = "my_module", loop = "for row in *", first = 10, last = 5}
+    expected_types = {
+        "name": str,
+        "loop": str,
+        "first": int,
+        "last": int,
+        "every": int,
+        "only_failing": bool,
+    }
+    return _load_policies(
+        obj,
+        context,
+        pyproject,
+        "loop_log_policies",
+        expected_types,
+        log.LoopLogPolicy,
+    )
+
+
+def _load_assign_log_policies(
+    obj: dict, context: IContextErrorReport, pyproject: Path
+) -> List[log.AssignLogPolicy]:
+    # Each policy is a dict in a structure such as:
+    # {name = "my_module", function = "process_*", max_per_call = 20}
+    expected_types = {
+        "name": str,
+        "function": str,
+        "max_per_call": int,
+        "max_per_second": int,
+        "only_on_change": bool,
+    }
+    return _load_policies(
+        obj,
+        context,
+        pyproject,
+        "assign_log_policies",
+        expected_types,
+        log.AssignLogPolicy,
     )
 
 
+def _load_policies(
+    obj: dict,
+    context: IContextErrorReport,
+    pyproject: Path,
+    setting: str,
+    expected_types: Dict[str, type],
+    create_policy: Callable[..., Any],
+) -> list:
+    policies: list = []
+    list_obj = obj.get(setting)
+    if not list_obj:
+        return policies
+
+    if not isinstance(list_obj, list):
+        context.show_error(
+            f"Expected 'tool.robocorp.log.{setting}' to be a list in {pyproject}."
+        )
+        return policies
+
+    for policy in list_obj:
+        if not isinstance(policy, dict):
+            context.show_error(
+                f"Expected policy: {policy} from 'tool.robocorp.log.{setting}' to be a dict in {pyproject}."
+            )
+            continue
+
+        kwargs = {}
+        for key, value in policy.items():
+            expected_type = expected_types.get(key)
+            if expected_type is None:
+                context.show_error(
+                    f"Policy from 'tool.robocorp.log.{setting}' ({policy}) has unexpected key: >>{key}<< in {pyproject}."
+                )
+                break
+
+            # Note: bool is a subclass of int, so, check the type directly.
+            if type(value) is not expected_type:
+                context.show_error(
+                    f"Expected policy: {policy} from 'tool.robocorp.log.{setting}' to have '{key}' as a {expected_type.__name__} in {pyproject}."
+                )
+                break
+            kwargs[key] = value
+        else:
+            policies.append(create_policy(**kwargs))
+    return policies
+
+
 def _load_filters(
     obj: dict, context: IContextErrorReport, pyproject: Path
 ) -> List[log.Filter]:
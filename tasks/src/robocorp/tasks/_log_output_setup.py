@@ -10,6 +10,7 @@ def setup_log_output(
     max_file_size: str = "1MB",
     max_files: int = 5,
     log_name: str = "log.html",
+    log_html_refresh_interval: Optional[float] = None,
 ):
     from robocorp import log
 
@@ -20,6 +21,7 @@ def setup_log_output(
         max_file_size=max_file_size,
         max_files=max_files,
         log_html=output_dir / log_name,
+        log_html_refresh_interval=log_html_refresh_interval,
     )
 
 
@@ -0,0 +1,313 @@
+"""
+A low-overhead sampling profiler (used when `--profile` is passed to
+`python -m robocorp.tasks run`).
+
+A daemon thread periodically walks the frames of the threads (with
+`sys._current_frames()`) and aggregates the collapsed stacks of the task
+which is currently running (the thread running the task is always sampled,
+whereas other threads are only sampled while doing some work -- idle threads
+and the internal threads of `robocorp.log` are skipped). When the task
+finishes the stacks are written to a file in the output dir (in the
+collapsed format used by `flamegraph.pl`, `speedscope`, `inferno`, etc.)
+and a summary with the frames where most of the time was spent is added to
+the log.
+"""
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ._protocols import ITask
+
+DEFAULT_PROFILE_INTERVAL = 0.01
+
+# The number of frames shown in the summary added to the log.
+_TOP_FRAMES = 15
+
+# (file basename, function name) of the frames where a thread waits without
+# doing any work (other than the one running the task, threads whose current
+# frame is one of those are not sampled).
+_IDLE_FRAMES = frozenset(
+    [
+        ("threading.py", "wait"),
+        ("threading.py", "join"),
+        ("threading.py", "_wait_for_tstate_lock"),
+        ("queue.py", "get"),
+        ("selectors.py", "select"),
+    ]
+)
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = DEFAULT_PROFILE_INTERVAL):
+        """
+        Args:
+            interval: The interval (in seconds) between each sample.
+        """
+        if interval <= 0:
+            raise ValueError(f"Expected interval to be > 0. Found: {interval}.")
+
+        self.interval = interval
+
+        # Collapsed stack ("frame;frame;frame") -> number of samples.
+        # When None, samples are not collected (no task is running).
+        self._stacks: Optional[Dict[str, int]] = None
+        # The id of the thread running the task.
+        self._task_thread_id: Optional[int] = None
+        self._code_to_label: Dict[object, str] = {}
+        self._code_to_is_idle: Dict[object, bool] = {}
+
+        from robocorp import log
+
+        # The threads started by `robocorp.log` (i.e.: to write the log.html)
+        # are not sampled.
+        self._log_package_dir = os.path.dirname(log.__file__) + os.sep
+
+        self._lock = threading.Lock()
+        self._finish = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._finish.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="robocorp.tasks sampling profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+
+        self._finish.set()
+        thread.join()
+        self._thread = None
+
+    def start_task(self) -> None:
+        """
+        Starts collecting samples (must be called in the thread running the
+        task).
+        """
+        with self._lock:
+            self._stacks = {}
+            self._task_thread_id = threading.get_ident()
+
+    def end_task(self) -> Dict[str, int]:
+        """
+        Returns:
+            The collapsed stacks (and the number of samples of each) collected
+            since `start_task()`.
+        """
+        with self._lock:
+            stacks = self._stacks
+            self._stacks = None
+            self._task_thread_id = None
+        return stacks if stacks is not None else {}
+
+    def _run(self) -> None:
+        interval = self.interval
+        wait = self._finish.wait
+        while not wait(interval):
+            try:
+                self._sample()
+            except Exception:
+                # Never break the run because of the profiler (just stop
+                # collecting samples).
+                import traceback
+
+                traceback.print_exc()
+                return
+
+    def _get_label(self, code) -> str:
+        try:
+            return self._code_to_label[code]
+        except KeyError:
+            pass
+
+        # Note: ';' is the separator of the frames in the collapsed format.
+        label = (
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+            f"{code.co_firstlineno})"
+        ).replace(";", ":")
+        self._code_to_label[code] = label
+        return label
+
+    def _is_idle(self, code) -> bool:
+        try:
+            return self._code_to_is_idle[code]
+        except KeyError:
+            pass
+
+        is_idle = (
+            os.path.basename(code.co_filename),
+            code.co_name,
+        ) in _IDLE_FRAMES
+        self._code_to_is_idle[code] = is_idle
+        return is_idle
+
+    def _sample(self) -> None:
+        if self._stacks is None:
+            return
+
+        current_thread_id = threading.get_ident()
+        task_thread_id = self._task_thread_id
+        thread_id_to_name = {}
+        for t in threading.enumerate():
+            thread_id_to_name[t.ident] = t.name
+
+        threading_file = threading.__file__
+        log_package_dir = self._log_package_dir
+
+        collapsed_stacks = []
+        get_label = self._get_label
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == current_thread_id:
+                continue
+
+            if thread_id != task_thread_id and self._is_idle(frame.f_code):
+                continue
+
+            labels = []
+            # The first frame of the thread which isn't in `threading.py`
+            # (i.e.: the target of the thread).
+            entry_filename = ""
+            f = frame
+            while f is not None:
+                code = f.f_code
+                labels.append(get_label(code))
+                if code.co_filename != threading_file:
+                    entry_filename = code.co_filename
+                f = f.f_back
+
+            if thread_id != task_thread_id and entry_filename.startswith(
+                log_package_dir
+            ):
+                continue  # An internal thread of `robocorp.log`.
+
+            thread_name = thread_id_to_name.get(thread_id, str(thread_id))
+            labels.append(f"Thread: {thread_name}".replace(";", ":"))
+            labels.reverse()
+            collapsed_stacks.append(";".join(labels))
+
+        with self._lock:
+            stacks = self._stacks
+            if stacks is None:
+                return
+            for collapsed in collapsed_stacks:
+                stacks[collapsed] = stacks.get(collapsed, 0) + 1
+
+
+def write_collapsed_stacks(target: Path, stacks: Dict[str, int]) -> None:
+    """
+    Writes the stacks in the collapsed format (one `frame;frame;frame count`
+    per line).
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target, "w", encoding="utf-8") as stream:
+        for collapsed, count in sorted(stacks.items()):
+            stream.write(f"{collapsed} {count}\n")
+
+
+def compute_top_frames(
+    stacks: Dict[str, int], top: int = _TOP_FRAMES
+) -> List[Tuple[str, int, int]]:
+    """
+    Returns:
+        A list with `(frame, self samples, total samples)` sorted by the
+        samples where the frame was the one executing (self samples).
+    """
+    self_samples: Dict[str, int] = {}
+    total_samples: Dict[str, int] = {}
+
+    for collapsed, count in stacks.items():
+        labels = collapsed.split(";")[1:]  # The first one is the thread name.
+        if not labels:
+            continue
+        leaf = labels[-1]
+        self_samples[leaf] = self_samples.get(leaf, 0) + count
+
+        # Recursive calls must be counted only once per stack.
+        for label in set(labels):
+            total_samples[label] = total_samples.get(label, 0) + count
+
+    top_frames = sorted(self_samples.items(), key=lambda item: (-item[1], item[0]))
+    top_frames = top_frames[:top]
+    return [(label, count, total_samples[label]) for label, count in top_frames]
+
+
+def format_summary(
+    task_name: str,
+    stacks: Dict[str, int],
+    interval: float,
+    collapsed_stacks_file: Optional[Path] = None,
+) -> str:
+    total = sum(stacks.values())
+    lines = [f"Profile of task: {task_name} ({total} samples, interval: {interval}s)."]
+
+    top_frames = compute_top_frames(stacks)
+    if top_frames:
+        lines.append("")
+        lines.append(f"{'self %':>8} {'total %':>8} {'samples':>8}  frame")
+        for label, self_count, total_count in top_frames:
+            lines.append(
+                f"{self_count * 100 / total:>7.1f}% {total_count * 100 / total:>7.1f}%"
+                f" {self_count:>8}  {label}"
+            )
+
+    if collapsed_stacks_file is not None:
+        lines.append("")
+        lines.append(f"Collapsed stacks written to: {collapsed_stacks_file}")
+    return "\n".join(lines)
+
+
+def get_collapsed_stacks_file(output_dir: Path, task_name: str) -> Path:
+    name = re.sub(r"[^\w.-]", "_", task_name)
+    return output_dir / f"profile_{name}.collapsed"
+
+
+@contextmanager
+def setup_sampling_profiler(
+    output_dir: Path, interval: float = DEFAULT_PROFILE_INTERVAL
+) -> Iterator[SamplingProfiler]:
+    """
+    Profiles each task run while in this context (the collapsed stacks are
+    written to the output dir and a summary is logged before the task ends).
+
+    Note: must be called after the logging is setup so that the summary is
+    logged before the task is finished in the log (`after_task_run` is
+    called in the reversed registry order).
+    """
+    from robocorp import log
+
+    from ._hooks import after_task_run, before_task_run
+
+    output_dir = output_dir.absolute()
+    profiler = SamplingProfiler(interval)
+
+    def on_before_task_run(task: ITask):
+        profiler.start_task()
+
+    def on_after_task_run(task: ITask):
+        stacks = profiler.end_task()
+        target: Optional[Path] = get_collapsed_stacks_file(output_dir, task.name)
+        try:
+            write_collapsed_stacks(target, stacks)
+        except Exception:
+            log.exception(f"Unable to write the profile of task: {task.name}.")
+            target = None
+        log.info(format_summary(task.name, stacks, interval, target))
+
+    profiler.start()
+    try:
+        with before_task_run.register(on_before_task_run), after_task_run.register(
+            on_after_task_run
+        ):
+            yield profiler
+    finally:
+        profiler.stop()
@@ -0,0 +1,226 @@
+"""
+Runs tasks in parallel (used when `--workers N` is passed to
+`python -m robocorp.tasks run`).
+
+Each task is run in a new `python -m robocorp.tasks run` process (at most
+`N` processes at the same time) which writes its log output to its own
+subdirectory of the output dir (`<output_dir>/workers/<task_name>`). The
+output of each process is shown in the console prefixed by the task name
+and when all the tasks finish, the `.robolog` files of all the processes
+are combined in a single `<output_dir>/log.html`.
+
+The parent process doesn't import the modules with the tasks (the names of
+the tasks are collected with `python -m robocorp.tasks list` in a separate
+process) and writes its own `<output_dir>/output.robolog` with just the
+start/end of the run (which provides the run info in the log.html).
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from ._task import Context
+
+
+def get_worker_output_dir(output_dir: Path, task_name: str) -> Path:
+    return output_dir / "workers" / task_name
+
+
+def _collect_task_names(path: Path, task_names: Sequence[str]) -> List[str]:
+    """
+    Collects the names of the tasks in a separate process (the modules with
+    the tasks are imported in each worker, so, they shouldn't be imported
+    in this process too -- note that `list` only imports the modules where
+    the tasks can't be found statically).
+
+    Raises:
+        RobocorpTasksCollectError if the tasks couldn't be collected.
+    """
+    from ._exceptions import RobocorpTasksCollectError
+
+    result = subprocess.run(
+        [sys.executable, "-m", "robocorp.tasks", "list", str(path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RobocorpTasksCollectError(
+            f"Unable to collect tasks from: {path}\n"
+            f"{result.stderr.decode('utf-8', 'replace')}"
+        )
+
+    found = [task["name"] for task in json.loads(result.stdout)]
+    if task_names:
+        found = [name for name in found if name in task_names]
+    return list(dict.fromkeys(found))
+
+
+def _get_robolog_files(output_dir: Path) -> List[Path]:
+    def part(robolog: Path) -> int:
+        # output.robolog, output_2.robolog, output_3.robolog, ...
+        _, _, entry = robolog.stem.partition("_")
+        return int(entry) if entry.isdigit() else 1
+
+    return sorted(output_dir.glob("*.robolog"), key=part)
+
+
+class _WorkersRunner:
+    def __init__(
+        self,
+        context: Context,
+        path: Path,
+        output_dir: Path,
+        worker_args: Sequence[str],
+    ):
+        self._context = context
+        self._path = path
+        self._output_dir = output_dir
+        self._worker_args = worker_args
+        self._console_lock = threading.Lock()
+
+        self._env = os.environ.copy()
+        # Each worker would connect to the listener with a different stream.
+        self._env.pop("ROBOCORP_TASKS_LOG_LISTENER_PORT", None)
+
+    def _show(self, task_name: str, line: str) -> None:
+        context = self._context
+        with self._console_lock:
+            context.show(f"[{task_name}] ", end="", kind=context.KIND_TASK_NAME)
+            context.show(line, end="", flush=True)
+
+    def run_task(self, task_name: str) -> int:
+        worker_output_dir = get_worker_output_dir(self._output_dir, task_name)
+
+        worker_output_dir.mkdir(parents=True, exist_ok=True)
+
+        # The `.robolog` files of a previous run must not be combined in the
+        # log.html.
+        for robolog in _get_robolog_files(worker_output_dir):
+            robolog.unlink()
+
+        args = [
+            sys.executable,
+            "-m",
+            "robocorp.tasks",
+            "run",
+            str(self._path),
+            "-t",
+            task_name,
+            "-o",
+            str(worker_output_dir),
+        ] + list(self._worker_args)
+
+        try:
+            process = subprocess.Popen(
+                args,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env=self._env,
+            )
+        except Exception:
+            self._show(task_name, traceback.format_exc())
+            return 1
+
+        assert process.stdout is not None
+        with process.stdout:
+            for line in iter(process.stdout.readline, b""):
+                self._show(task_name, line.decode("utf-8", "replace"))
+        return process.wait()
+
+
+def run_in_workers(
+    context: Context,
+    path: Path,
+    output_dir: Path,
+    task_names: Sequence[str],
+    workers: int,
+    worker_args: Sequence[str],
+) -> int:
+    """
+    Runs each task in a separate process (with at most `workers` processes
+    running at the same time).
+
+    Args:
+        context: Used to show messages to the user.
+        path: The path (file or directory) with the tasks.
+        output_dir: The directory where the output should be put.
+        task_names: The names of the tasks to run (if empty all the tasks
+            found are run).
+        workers: The maximum number of processes running at the same time.
+        worker_args: Additional arguments passed to `robocorp.tasks run` in
+            each process.
+
+    Returns:
+        0 if all the processes finished with a 0 return code and 1 otherwise.
+    """
+    from robocorp import log
+
+    from ._exceptions import RobocorpTasksCollectError
+
+    run_name = os.path.basename(path)
+    if task_names:
+        run_name += f" - {', '.join(task_names)}"
+
+    # Note: the tasks are collected here just to know which tasks are
+    # available (the actual collection/run is done in each process).
+    try:
+        task_names = _collect_task_names(path, task_names)
+        if not task_names:
+            raise RobocorpTasksCollectError(f"Did not find any tasks in: {path}")
+    except RobocorpTasksCollectError as e:
+        context.show_error(str(e))
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+    runner = _WorkersRunner(context, path, output_dir, worker_args)
+
+    # The `.robolog` of a previous run must not be combined in the log.html.
+    for robolog in _get_robolog_files(output_dir):
+        robolog.unlink()
+
+    context.show(
+        f"\nRunning {len(task_names)} tasks in {min(workers, len(task_names))} workers."
+    )
+    with log.add_log_output(output_dir, max_files=1):
+        log.start_run(run_name)
+        run_status = "PASS"
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                returncodes: Dict[str, int] = dict(
+                    zip(task_names, executor.map(runner.run_task, task_names))
+                )
+
+            returncode = 0
+            for task_name, task_returncode in returncodes.items():
+                if task_returncode != 0:
+                    context.show_error(
+                        f"Task: {task_name} finished with return code: {task_returncode}."
+                    )
+                    returncode = 1
+                    run_status = "ERROR"
+        finally:
+            log.end_run(run_name, run_status)
+
+    robolog_files: List[Path] = []
+    for task_name in task_names:
+        robolog_files.extend(
+            _get_robolog_files(get_worker_output_dir(output_dir, task_name))
+        )
+    # Note: the run info in the log.html (name, start and finish time) is
+    # taken from the last run found, so, the run of this process must be the
+    # last one.
+    robolog_files.extend(_get_robolog_files(output_dir))
+
+    log_html = output_dir / "log.html"
+    log.create_log_html(log_html, robolog_files)
+
+    context.show(f"\nRobocorp Log (html): {log_html.absolute()}")
+    return returncode
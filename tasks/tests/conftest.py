@@ -1,4 +1,38 @@
+import os
+
+import pytest
+
 pytest_plugins = [
     "devutils.fixtures",
     "tasks_tests.fixtures",
 ]
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _rewrite_cache_dir(tmp_path_factory):
+    # The rewritten code must not be cached in the cache dir of the user
+    # (the environment variable is also seen by subprocesses).
+    original = os.environ.get("RC_LOG_REWRITE_CACHE_DIR")
+    os.environ["RC_LOG_REWRITE_CACHE_DIR"] = str(
+        tmp_path_factory.mktemp("log_rewrite_cache")
+    )
+    yield
+    if original is None:
+        del os.environ["RC_LOG_REWRITE_CACHE_DIR"]
+    else:
+        os.environ["RC_LOG_REWRITE_CACHE_DIR"] = original
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _tasks_list_cache_dir(tmp_path_factory):
+    # The tasks found by `list` must not be cached in the cache dir of the
+    # user (the environment variable is also seen by subprocesses).
+    original = os.environ.get("RC_TASKS_LIST_CACHE_DIR")
+    os.environ["RC_TASKS_LIST_CACHE_DIR"] = str(
+        tmp_path_factory.mktemp("tasks_list_cache")
+    )
+    yield
+    if original is None:
+        del os.environ["RC_TASKS_LIST_CACHE_DIR"]
+    else:
+        os.environ["RC_TASKS_LIST_CACHE_DIR"] = original
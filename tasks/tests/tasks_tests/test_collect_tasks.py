@@ -1,5 +1,6 @@
 import json
 import os
+from pathlib import Path
 
 from devutils.fixtures import robocorp_tasks_run
 
@@ -24,6 +25,27 @@ def test_colect_tasks(datadir):
     assert len(tasks) == 0
 
 
+def test_collect_tasks_static(datadir, tmpdir):
+    from robocorp.tasks._collect_tasks import collect_tasks
+    from robocorp.tasks._collect_tasks_static import collect_tasks_static
+
+    expected = [
+        {
+            "name": task.name,
+            "line": task.lineno,
+            "file": task.filename,
+            "docs": getattr(task.method, "__doc__") or "",
+        }
+        for task in collect_tasks(datadir)
+    ]
+    assert len(expected) == 3
+
+    cache_dir = Path(tmpdir) / "cache"
+    # The 2nd time it's loaded from the cache.
+    for _i in range(2):
+        assert list(collect_tasks_static(datadir, cache_dir)) == expected
+
+
 def test_collect_tasks_integrated_error(tmpdir):
     result = robocorp_tasks_run(
         ["run", "dir_not_there", "-t=main"], returncode=1, cwd=str(tmpdir)
@@ -121,4 +143,7 @@ def test_error_in_stdout(datadir, tmpdir):
         ],
     )
 
-    assert str(msgs).count("STB") == 1, "Only one Start Traceback message expected."
+    # Note: check the message type (the contents of the thread dump of the
+    # teardown may also have "STB" in the values of some variable).
+    message_types = [msg["message_type"] for msg in msgs]
+    assert message_types.count("STB") == 1, "Only one Start Traceback message expected."
@@ -0,0 +1,206 @@
+from pathlib import Path
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        """
+from robocorp.tasks import task
+
+@task
+def my_task():
+    pass
+""",
+        """
+from robocorp.tasks import task as robo_task
+
+@robo_task
+def my_task():
+    pass
+""",
+        """
+import robocorp.tasks
+
+@robocorp.tasks.task
+def my_task():
+    pass
+""",
+        """
+from robocorp import tasks
+
+@tasks.task
+def my_task():
+    pass
+""",
+        """
+import robocorp.tasks as rt
+
+@some_other_decorator
+@rt.task
+async def my_task():
+    pass
+""",
+    ],
+)
+def test_collect_tasks_from_source(source) -> None:
+    from robocorp.tasks._collect_tasks_static import collect_tasks_from_source
+
+    tasks = collect_tasks_from_source(source, "tasks.py")
+    assert tasks is not None
+    assert [(t["name"], t["file"]) for t in tasks] == [("my_task", "tasks.py")]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        # Task called directly.
+        """
+from robocorp.tasks import task
+
+def my_task():
+    pass
+
+task(my_task)
+""",
+        # Task in a nested scope.
+        """
+from robocorp.tasks import task
+
+if True:
+    @task
+    def my_task():
+        pass
+""",
+        # Star import.
+        """
+from robocorp.tasks import *
+
+@task
+def my_task():
+    pass
+""",
+        # Task imported from some other module.
+        """
+from my_lib import task
+
+@task
+def my_task():
+    pass
+""",
+        # Task isn't the innermost decorator.
+        """
+from robocorp.tasks import task
+
+@task
+@some_other_decorator
+def my_task():
+    pass
+""",
+    ],
+)
+def test_collect_tasks_from_source_dynamic(source) -> None:
+    from robocorp.tasks._collect_tasks_static import collect_tasks_from_source
+
+    assert collect_tasks_from_source(source, "tasks.py") is None
+
+
+def test_collect_tasks_from_source_info() -> None:
+    from robocorp.tasks._collect_tasks_static import collect_tasks_from_source
+
+    source = '''from robocorp.tasks import task
+
+
+def not_a_task():
+    pass
+
+
+@task
+def task_at_line_8():
+    """
+    Task docstring.
+    """
+
+
+@other_decorator
+@task
+def task_at_line_15():
+    pass
+'''
+    assert collect_tasks_from_source(source, "tasks.py") == [
+        {
+            "name": "task_at_line_8",
+            "line": 8,
+            "file": "tasks.py",
+            "docs": "\n    Task docstring.\n    ",
+        },
+        {"name": "task_at_line_15", "line": 15, "file": "tasks.py", "docs": ""},
+    ]
+
+
+def test_collect_tasks_static_cache(tmpdir) -> None:
+    from robocorp.tasks._collect_tasks_static import collect_tasks_static
+
+    tmp = Path(tmpdir)
+    cache_dir = tmp / "cache"
+    project = tmp / "project"
+    project.mkdir()
+
+    # The module must not be imported.
+    static_tasks = project / "static_tasks.py"
+    static_tasks.write_text(
+        """
+from robocorp.tasks import task
+
+raise AssertionError("Module imported")
+
+@task
+def static_task():
+    pass
+"""
+    )
+
+    # The module must be imported (task is called directly).
+    dynamic_tasks = project / "dynamic_tasks.py"
+    dynamic_tasks.write_text(
+        """
+from robocorp.tasks import task
+
+def dynamic_task():
+    pass
+
+task(dynamic_task)
+"""
+    )
+
+    def collect():
+        return sorted(t["name"] for t in collect_tasks_static(project, cache_dir))
+
+    assert collect() == ["dynamic_task", "static_task"]
+    cache_files = list(cache_dir.glob("*.json"))
+    assert len(cache_files) == 1
+    cache_contents = cache_files[0].read_text("utf-8")
+
+    # Cached: the contents are the same.
+    assert collect() == ["dynamic_task", "static_task"]
+    assert cache_files[0].read_text("utf-8") == cache_contents
+
+    # Changed (size is different): must be parsed again.
+    static_tasks.write_text(
+        """
+from robocorp.tasks import task
+
+raise AssertionError("Module imported")
+
+@task
+def static_task_renamed():
+    pass
+"""
+    )
+    assert collect() == ["dynamic_task", "static_task_renamed"]
+
+    # Removed: the entry is removed from the cache.
+    dynamic_tasks.unlink()
+    assert collect() == ["static_task_renamed"]
+    assert "dynamic_tasks.py" not in cache_files[0].read_text("utf-8")
@@ -290,3 +290,195 @@ def test_receive_at_socket(datadir, server_socket) -> None:
             },
         ],
     )
+
+
+def test_profile(datadir) -> None:
+    pyproject: Path = datadir / "pyproject.toml"
+    # The busy loop must not be logged (otherwise the time would be spent
+    # writing the log).
+    pyproject.write_text(
+        """
+[tool.robocorp.log]
+log_filter_rules = [
+    {name = "main_profile", kind = "exclude"}
+]
+"""
+    )
+    from robocorp.log import verify_log_messages_from_log_html
+
+    result = robocorp_tasks_run(
+        ["run", "--profile", "--profile-interval=0.005", "main_profile.py"],
+        returncode=0,
+        cwd=str(datadir),
+    )
+
+    decoded = result.stderr.decode("utf-8", "replace")
+    assert not decoded.strip()
+
+    collapsed_stacks_file = datadir / "output" / "profile_task_to_profile.collapsed"
+    assert collapsed_stacks_file.exists()
+    lines = collapsed_stacks_file.read_text("utf-8").splitlines()
+    assert lines
+    for line in lines:
+        collapsed, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert collapsed.startswith("Thread: ")
+
+    assert any(
+        line.startswith("Thread: MainThread;")
+        and "task_to_profile (main_profile.py:12);busy_wait_in_profile" in line
+        for line in lines
+    ), "\n".join(lines)
+
+    log_target = datadir / "output" / "log.html"
+    msgs = verify_log_messages_from_log_html(
+        log_target,
+        [{"message_type": "ET", "status": "PASS"}],
+    )
+    profile_msgs = [
+        (i, msg)
+        for i, msg in enumerate(msgs)
+        if msg["message_type"] == "L"
+        and msg["message"].startswith("Profile of task: task_to_profile (")
+    ]
+    assert len(profile_msgs) == 1, msgs
+    i, msg = profile_msgs[0]
+    assert "busy_wait_in_profile (main_profile.py:6)" in msg["message"]
+    assert str(collapsed_stacks_file) in msg["message"]
+
+    # Idle threads (such as the ones from robocorp.log which write the
+    # log.html) must not be in the summary.
+    assert "threading.py" not in msg["message"], msg["message"]
+    assert "busy_wait_in_profile (main_profile.py:6)" in msg["message"].splitlines()[3]
+
+    # The summary must be logged inside the task.
+    message_types = [msg["message_type"] for msg in msgs]
+    start_task = [
+        j
+        for j, msg in enumerate(msgs)
+        if msg["message_type"] == "ST" and msg["name"] == "task_to_profile"
+    ][0]
+    assert start_task < i < message_types.index("ET", start_task)
+
+
+def test_workers(datadir) -> None:
+    pyproject: Path = datadir / "pyproject.toml"
+    pyproject.write_text("")
+    from robocorp.log import verify_log_messages_from_log_html
+
+    result = robocorp_tasks_run(
+        ["run", "--workers=2", "--console-colors=plain", "main_workers.py"],
+        returncode=0,
+        cwd=str(datadir),
+    )
+
+    decoded = result.stderr.decode("utf-8", "replace")
+    assert not decoded.strip()
+    decoded = result.stdout.decode("utf-8", "replace")
+    assert "Running 2 tasks in 2 workers." in decoded
+    assert "[worker_task_1] In worker task 1" in decoded
+    assert "[worker_task_2] In worker task 2" in decoded
+    assert "Robocorp Log (html)" in decoded
+    # The module is only imported in the workers (not in the parent process).
+    assert decoded.count("Module main_workers imported") == 2
+
+    for task_name in ("worker_task_1", "worker_task_2"):
+        worker_output_dir = datadir / "output" / "workers" / task_name
+        assert (worker_output_dir / "output.robolog").exists()
+
+    # The log.html must have the contents of both processes.
+    log_target = datadir / "output" / "log.html"
+    verify_log_messages_from_log_html(
+        log_target,
+        [
+            {"message_type": "ST", "name": "worker_task_1"},
+            {"message_type": "ST", "name": "worker_task_2"},
+            {"message_type": "C", "message": "In worker task 1"},
+            {"message_type": "C", "message": "In worker task 2"},
+        ],
+    )
+
+    # The run info shown in the log.html is the one from the last run (which
+    # must be the run of the parent process, spanning all the workers).
+    import datetime
+
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    runs = []
+    for msg in iter_decoded_log_format_from_log_html(log_target):
+        if msg["message_type"] == "T":
+            start = datetime.datetime.fromisoformat(msg["time"])
+        elif msg["message_type"] == "SR":
+            runs.append({"name": msg["name"], "start": start})
+        elif msg["message_type"] == "ER":
+            runs[-1]["end"] = start + datetime.timedelta(
+                seconds=msg["time_delta_in_seconds"]
+            )
+
+    assert len(runs) == 3
+    last_run = runs[-1]
+    assert last_run["name"] == "main_workers.py"
+    for run in runs[:-1]:
+        assert run["name"].startswith("main_workers.py - worker_task_")
+        assert last_run["start"] <= run["start"]
+        assert last_run["end"] >= run["end"]
+
+    # An error in any task makes the return code 1.
+    robocorp_tasks_run(
+        ["run", "--workers=2", "expected_error_in_task.py"],
+        returncode=1,
+        cwd=str(datadir),
+    )
+
+
+def test_log_html_available_when_killed(datadir) -> None:
+    import os
+    import subprocess
+    import sys
+    import time
+
+    from robocorp.log import iter_decoded_log_format_from_log_html
+
+    pyproject: Path = datadir / "pyproject.toml"
+    pyproject.write_text("")
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join([x for x in sys.path if x])
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "robocorp.tasks",
+            "run",
+            "--log-html-refresh-interval=0.1",
+            "main_killed.py",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        cwd=str(datadir),
+    )
+
+    def get_console_messages():
+        try:
+            return [
+                msg["message"]
+                for msg in iter_decoded_log_format_from_log_html(log_target)
+                if msg["message_type"] == "C"
+            ]
+        except FileNotFoundError:
+            return []
+
+    log_target = datadir / "output" / "log.html"
+    try:
+        timeout_at = time.time() + 20
+        while "Started slow task" not in "".join(get_console_messages()):
+            assert time.time() < timeout_at, "log.html not written during the run."
+            assert process.poll() is None
+            time.sleep(0.1)
+    finally:
+        process.kill()
+        process.wait()
+
+    # Killed in the middle of the task: the log.html is still there.
+    assert "Started slow task" in "".join(get_console_messages())
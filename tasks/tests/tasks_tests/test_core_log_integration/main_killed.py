@@ -0,0 +1,9 @@
+import time
+
+from robocorp.tasks import task
+
+
+@task
+def slow_task():
+    print("Started slow task")
+    time.sleep(30)
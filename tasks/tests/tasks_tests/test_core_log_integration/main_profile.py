@@ -0,0 +1,14 @@
+import time
+
+from robocorp.tasks import task
+
+
+def busy_wait_in_profile(timeout):
+    initial_time = time.time()
+    while time.time() - initial_time < timeout:
+        pass
+
+
+@task
+def task_to_profile():
+    busy_wait_in_profile(0.5)
@@ -0,0 +1,13 @@
+from robocorp.tasks import task
+
+print("Module main_workers imported")
+
+
+@task
+def worker_task_1():
+    print("In worker task 1")
+
+
+@task
+def worker_task_2():
+    print("In worker task 2")
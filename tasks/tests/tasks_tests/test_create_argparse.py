@@ -37,6 +37,36 @@ def test_argparse():
     assert parsed.max_log_files == 5
     assert parsed.max_log_file_size == "2MB"
 
+    parsed = parser.parse_args(["run", "target_dir"])
+    assert not parsed.profile
+    assert parsed.profile_interval == 0.01
+    assert parsed.workers == 1
+    assert parsed.log_html_refresh_interval == 5
+
+    parsed = parser.parse_args(
+        ["run", "target_dir", "--profile", "--profile-interval=0.005"]
+    )
+    assert parsed.profile
+    assert parsed.profile_interval == 0.005
+
+    parsed = parser.parse_args(["run", "target_dir", "--workers=4"])
+    assert parsed.workers == 4
+
+    parsed = parser.parse_args(["run", "target_dir", "--log-html-refresh-interval=-1"])
+    assert parsed.log_html_refresh_interval == -1
+
+    parsed = parser.parse_args(["prewarm-cache", "target_dir"])
+    assert parsed.command == "prewarm-cache"
+    assert parsed.path == "target_dir"
+
+    parsed = parser.parse_args(["daemon", "target_dir"])
+    assert parsed.socket_path is None
+
+    parsed = parser.parse_args(["daemon", "target_dir", "--socket=/tmp/daemon.sock"])
+    assert parsed.command == "daemon"
+    assert parsed.path == "target_dir"
+    assert parsed.socket_path == "/tmp/daemon.sock"
+
 
 def test_argparse_command_invalid():
     from robocorp.tasks.cli import main
@@ -0,0 +1,132 @@
+import json
+import os
+import signal
+import socket
+import stat
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork().")
+def test_daemon(datadir) -> None:
+    from robocorp.log import verify_log_messages_from_log_html
+
+    from robocorp.tasks._daemon import _REQUEST_TIMEOUT, request_run
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join([x for x in sys.path if x])
+    process = subprocess.Popen(
+        [sys.executable, "-m", "robocorp.tasks", "daemon", "."],
+        stdout=subprocess.PIPE,
+        env=env,
+        cwd=str(datadir),
+    )
+    try:
+        assert process.stdout is not None
+        socket_path = None
+        for line in iter(process.stdout.readline, b""):
+            decoded = line.decode("utf-8").strip()
+            if decoded.startswith("Waiting for run requests at: "):
+                socket_path = Path(decoded.split(": ", 1)[1])
+                break
+        assert socket_path is not None, "Daemon did not start."
+
+        # Only the current user may request runs.
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(socket_path.parent).st_mode) == 0o700
+
+        # Each run must be done with the modules already imported (and must
+        # not see the state of the previous runs).
+        for _i in range(2):
+            output = []
+            returncode = request_run(
+                socket_path,
+                ["run", "-t", "check_warm", "--console-colors=plain"],
+                cwd=str(datadir),
+                on_output=output.append,
+            )
+            assert returncode == 0, "".join(output)
+            assert "Imported in daemon: True" in "".join(output)
+            assert "Runs in process: 1" in "".join(output)
+
+            verify_log_messages_from_log_html(
+                datadir / "output" / "log.html",
+                [{"message_type": "ST", "name": "check_warm"}],
+            )
+
+        output = []
+        returncode = request_run(
+            socket_path,
+            ["run", "-t", "fail", "--console-colors=plain"],
+            cwd=str(datadir),
+            on_output=output.append,
+        )
+        assert returncode == 1
+        assert "Failed in task" in "".join(output)
+
+        # A client which doesn't send its request must not block other runs.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle_conn:
+            idle_conn.connect(str(socket_path))
+
+            initial_time = time.monotonic()
+            output = []
+            returncode = request_run(
+                socket_path,
+                ["run", "-t", "spawn_and_exit", "--console-colors=plain"],
+                cwd=str(datadir),
+                on_output=output.append,
+            )
+            # The return code is sent when the process finishes (even if
+            # the process it spawned keeps its output open).
+            assert returncode == 0, "".join(output)
+            assert time.monotonic() - initial_time < _REQUEST_TIMEOUT
+
+        spawned_pid = int("".join(output).split("Spawned pid: ")[1].split()[0])
+        os.kill(spawned_pid, signal.SIGTERM)
+
+        # A client which doesn't read its output must not block other runs.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as not_reading_conn:
+            not_reading_conn.connect(str(socket_path))
+            request = {
+                "args": ["run", "-t", "write_a_lot", "-o", "output_not_read"],
+                "cwd": str(datadir),
+            }
+            not_reading_conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+
+            result = []
+
+            def run_while_not_reading():
+                result.append(
+                    request_run(
+                        socket_path,
+                        ["run", "-t", "fail", "--console-colors=plain"],
+                        cwd=str(datadir),
+                        on_output=lambda output: None,
+                    )
+                )
+
+            t = threading.Thread(target=run_while_not_reading, daemon=True)
+            t.start()
+            t.join(30)
+            assert result == [1], "Run blocked by a client which doesn't read."
+
+        # After the client disconnects the daemon still works.
+        returncode = request_run(
+            socket_path,
+            ["run", "-t", "fail", "--console-colors=plain"],
+            cwd=str(datadir),
+            on_output=lambda output: None,
+        )
+        assert returncode == 1
+    finally:
+        process.terminate()
+        process.wait()
+
+    # The socket (and the temporary directory where it was created) is
+    # removed when the daemon exits.
+    assert not socket_path.parent.exists()
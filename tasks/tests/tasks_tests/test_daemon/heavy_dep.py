@@ -0,0 +1,4 @@
+import os
+
+# The pid of the process which imported this module.
+IMPORTED_IN_PID = os.getpid()
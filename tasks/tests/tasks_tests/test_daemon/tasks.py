@@ -0,0 +1,38 @@
+import os
+
+import heavy_dep
+
+from robocorp.tasks import task
+
+runs = []
+
+
+@task
+def check_warm():
+    runs.append(1)
+    print(f"Imported in daemon: {heavy_dep.IMPORTED_IN_PID != os.getpid()}")
+    print(f"Runs in process: {len(runs)}")
+
+
+@task
+def fail():
+    raise RuntimeError("Failed in task")
+
+
+@task
+def spawn_and_exit():
+    import subprocess
+    import sys
+
+    # The spawned process inherits the stdout (and keeps it open after the
+    # task finishes).
+    process = subprocess.Popen([sys.executable, "-c", "import time;time.sleep(60)"])
+    print(f"Spawned pid: {process.pid}")
+
+
+@task
+def write_a_lot():
+    # Written directly to the stdout (without going to the log).
+    data = b"x" * (1024 * 1024)
+    for _i in range(20):
+        os.write(1, data)
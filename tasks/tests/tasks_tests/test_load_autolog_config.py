@@ -56,3 +56,76 @@ default_library_filter_kind = "exclude"
 
     config = read_robocorp_log_config(Ctx(), pyproject_info)
     str_regression.check(str(config))
+
+
+def test_load_autolog_config_loop_log_policies(tmpdir, str_regression) -> None:
+    from pathlib import Path
+    from robocorp.tasks._toml_settings import read_pyproject_toml
+
+    target = tmpdir / "pyproject.toml"
+    target.write_text(
+        """
+[tool.robocorp.log]
+
+loop_log_policies = [
+    {name = "my_module", loop = "for row in *", first = 10, last = 5},
+    {only_failing = true, every = 1000},
+]
+""",
+        "utf-8",
+    )
+    pyproject_info = read_pyproject_toml(Path(target))
+    assert pyproject_info is not None
+
+    from robocorp.tasks._log_auto_setup import read_robocorp_log_config
+
+    class Ctx:
+        def show_error(self, error):
+            raise AssertionError(error)
+
+    config = read_robocorp_log_config(Ctx(), pyproject_info)
+    str_regression.check(str(config))
+
+    policy = config.get_loop_log_policy("my_module", "for row in rows")
+    assert policy is not None
+    assert policy.first == 10
+    policy = config.get_loop_log_policy("other", "for row in rows")
+    assert policy is not None
+    assert policy.only_failing
+
+
+def test_load_autolog_config_assign_log_policies(tmpdir, str_regression) -> None:
+    from pathlib import Path
+    from robocorp.tasks._toml_settings import read_pyproject_toml
+
+    target = tmpdir / "pyproject.toml"
+    target.write_text(
+        """
+[tool.robocorp.log]
+
+assign_log_policies = [
+    {name = "my_module", function = "process_*", max_per_call = 20},
+    {only_on_change = true, max_per_second = 100},
+]
+""",
+        "utf-8",
+    )
+    pyproject_info = read_pyproject_toml(Path(target))
+    assert pyproject_info is not None
+
+    from robocorp.tasks._log_auto_setup import read_robocorp_log_config
+
+    class Ctx:
+        def show_error(self, error):
+            raise AssertionError(error)
+
+    config = read_robocorp_log_config(Ctx(), pyproject_info)
+    str_regression.check(str(config))
+
+    policy = config.get_assign_log_policy("my_module", "process_rows")
+    assert policy is not None
+    assert policy.max_per_call == 20
+    policy = config.get_assign_log_policy("my_module", "other")
+    assert policy is not None
+    assert policy.only_on_change
+    assert policy.max_per_second == 100